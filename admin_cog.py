@@ -1,12 +1,18 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+from world_map import WorldMap
+from monsters import MonsterRegistry
+from recipes import RecipeBook
 
 # main.py에서 필요한 함수나 변수를 가져오기 위한 import
 # 순환 참조를 피하기 위해 타입 체킹 중에만 사용하거나 함수 내에서 import합니다.
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
-    from main import get_db_connection, update_chat_log, update_game_status
+    from main import update_chat_log, update_game_status
+
+# 역할 멤버 중 가입한 플레이어를 찾을 때 IN (...) 하나에 넣는 최대 id 수 (SQLite 변수 개수 제한)
+_MEMBER_CHUNK = 400
 
 class AdminCog(commands.Cog):
     # 그룹을 Cog 클래스의 속성으로 정의합니다.
@@ -18,7 +24,7 @@ class AdminCog(commands.Cog):
 
     @admin_group.command(name="게임시작", description="게임 시스템을 설정합니다.")
     async def start_game(self, interaction: discord.Interaction):
-        from main import get_db_connection, update_chat_log, update_game_status
+        from main import update_chat_log, update_game_status
 
         if interaction.channel_id != self.bot.game_channel_id:
             await interaction.response.send_message("게임 채널에서만 사용 가능합니다.", ephemeral=True)
@@ -28,12 +34,10 @@ class AdminCog(commands.Cog):
         temp_chat_msg = await interaction.channel.send("채팅창 초기화 중...")
         temp_status_msg = await interaction.channel.send("상태창 초기화 중...")
         
-        conn = get_db_connection()
-        c = conn.cursor()
-        c.execute("UPDATE game_state SET chat_message_id = ?, status_message_id = ? WHERE id = 1", (temp_chat_msg.id, temp_status_msg.id))
-        c.execute("DELETE FROM chat_logs")
-        conn.commit()
-        conn.close()
+        await self.bot.db.execute_batch([
+            ("UPDATE game_state SET chat_message_id = ?, status_message_id = ? WHERE id = 1", (temp_chat_msg.id, temp_status_msg.id)),
+            ("DELETE FROM chat_ring", ()),
+        ])
         
         self.bot.chat_log_message = temp_chat_msg
         self.bot.game_status_message = temp_status_msg
@@ -91,5 +95,100 @@ class AdminCog(commands.Cog):
             await interaction.followup.send(f"명령어 새로고침 중 오류가 발생했습니다: {e}")
             print(f"명령어 동기화 오류: {e}")
 
+    @admin_group.command(name="아이템새로고침", description="items/recipes 테이블을 다시 읽어 아이템과 레시피 정보를 갱신합니다.")
+    async def reload_items(self, interaction: discord.Interaction):
+        game_cog = self.bot.get_cog("GameCog")
+        if game_cog is None:
+            return await interaction.response.send_message("게임 Cog가 로드되지 않았습니다.", ephemeral=True)
+        await interaction.response.defer(ephemeral=True)
+        try:
+            previous, catalog = await game_cog.item_manager.reload(self.bot.db)
+            # 레시피가 그대로면 같은 RecipeBook을 유지하므로 계산해 둔 제작 계획도 유지됩니다.
+            self.bot.recipes = await RecipeBook.load(self.bot.db, self.bot.recipes)
+        except Exception as e:
+            print(f"아이템 카탈로그 새로고침 오류: {e}")
+            return await interaction.followup.send(f"아이템 새로고침 중 오류가 발생했습니다: {e}")
+        # 진행 중인 전투는 기존 카탈로그를 계속 사용하고, 새 전투부터 새 카탈로그를 사용합니다.
+        await interaction.followup.send(f"아이템 정보를 갱신했습니다. (버전 {previous.version} → {catalog.version}, {len(catalog)}개, 레시피 {len(self.bot.recipes.recipes)}개)")
+        print(f"아이템 카탈로그 버전 {catalog.version}을(를) 불러왔습니다. ({len(catalog)}개)")
+
+    @admin_group.command(name="아이템지급", description="역할을 가진 모든 플레이어에게 아이템을 지급합니다.")
+    @app_commands.describe(item_name="지급할 아이템 이름", quantity="1인당 수량", role="받을 플레이어의 역할")
+    async def grant_items(self, interaction: discord.Interaction, item_name: str, quantity: app_commands.Range[int, 1, 999], role: discord.Role):
+        game_cog = self.bot.get_cog("GameCog")
+        if game_cog is None:
+            return await interaction.response.send_message("게임 Cog가 로드되지 않았습니다.", ephemeral=True)
+        catalog = game_cog.item_manager.catalog # 이름 확인과 지급에 같은 카탈로그를 사용합니다.
+        if not catalog.get_item_by_name(item_name):
+            return await interaction.response.send_message(f"'{item_name}' 아이템을 찾을 수 없습니다.", ephemeral=True)
+        await interaction.response.defer(ephemeral=True)
+
+        member_ids = [member.id for member in role.members]
+        if not member_ids:
+            return await interaction.followup.send("해당 역할을 가진 멤버가 없습니다.")
+        player_ids = []
+        for start in range(0, len(member_ids), _MEMBER_CHUNK):
+            chunk = member_ids[start:start + _MEMBER_CHUNK]
+            rows = await self.bot.db.fetchall(
+                f"SELECT user_id FROM players WHERE user_id IN ({', '.join('?' * len(chunk))})", chunk)
+            player_ids.extend(row['user_id'] for row in rows)
+        # 모든 플레이어의 지급이 한 번의 UPSERT 배치로 저장됩니다.
+        results = await game_cog.grant_items_bulk({user_id: {item_name: quantity} for user_id in player_ids}, catalog)
+
+        granted = sum(result.granted.get(item_name, 0) for result in results.values())
+        overflowed = sum(1 for result in results.values() if result.overflow)
+        await interaction.followup.send(f"{len(results)}명에게 {item_name} 총 {granted}개를 지급했습니다."
+                                        + (f" ({overflowed}명은 보관 한도 때문에 일부만 받았습니다.)" if overflowed else ""))
+
+    @admin_group.command(name="지도새로고침", description="장소, 이동 경로, 몬스터 출현 표를 다시 읽어 새로 계산합니다.")
+    async def reload_map(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+        try:
+            world_map = await WorldMap.load(self.bot.db)
+            monsters = await MonsterRegistry.load(self.bot.db)
+        except Exception as e:
+            print(f"지도 새로고침 오류: {e}")
+            return await interaction.followup.send(f"지도 새로고침 중 오류가 발생했습니다: {e}")
+        # 진행 중인 전투는 기존 몬스터 템플릿을 계속 참조합니다.
+        self.bot.world_map = world_map
+        self.bot.monsters = monsters
+        await interaction.followup.send(f"지도를 갱신했습니다. (장소 {len(world_map.locations)}곳, 몬스터 {len(monsters.by_id)}종)")
+
+    @admin_group.command(name="db상태", description="DB 연결 풀과 그룹 커밋 작성자의 현황을 확인합니다.")
+    async def db_status(self, interaction: discord.Interaction):
+        stats = self.bot.db.stats()
+        embed = discord.Embed(title="🗄️ DB 현황", color=discord.Color.dark_grey())
+        embed.add_field(name="연결 수", value=f"{stats['size']} / {stats['max_size']} (유휴 {stats['idle']})", inline=False)
+        embed.add_field(name="체크아웃 횟수", value=f"{stats['checkouts']}", inline=True)
+        embed.add_field(name="평균 대기", value=f"{stats['avg_wait_ms']:.2f}ms", inline=True)
+        embed.add_field(name="p95 대기", value=f"{stats['p95_wait_ms']:.2f}ms", inline=True)
+        embed.add_field(name="최대 대기", value=f"{stats['max_wait_ms']:.2f}ms", inline=True)
+        embed.add_field(name="그룹 커밋", value=f"{stats['write_batches']}회 / 쓰기 {stats['writes']}건 (실패 {stats['failed_writes']})", inline=False)
+        embed.add_field(name="배치 크기", value=f"평균 {stats['avg_batch']:.1f} / 최대 {stats['max_batch']}", inline=True)
+        effects = self.bot.effects.stats()
+        embed.add_field(name="효과 스케줄러", value=f"버프 {effects['buffs']} / 상태 이상 {effects['statuses']} (대기 {effects['heap']}건, 처리 {effects['ticks']}회)", inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @admin_group.command(name="인증상태", description="비밀번호 해시/검증 처리 시간을 확인합니다.")
+    async def auth_status(self, interaction: discord.Interaction):
+        stats = self.bot.password_hasher.stats()
+        embed = discord.Embed(title="🔐 인증 처리 현황", color=discord.Color.dark_grey())
+        for label, key in (("회원가입 (해시)", "hash"), ("로그인 (검증)", "verify")):
+            s = stats[key]
+            embed.add_field(name=label, value=f"{s['count']}회 | p50 {s['p50_ms']:.0f}ms / p95 {s['p95_ms']:.0f}ms / 최대 {s['max_ms']:.0f}ms", inline=False)
+        embed.add_field(name="중복 요청 거절", value=f"{stats['rejected']}회", inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @admin_group.command(name="잠금상태", description="플레이어별 명령 대기 시간을 확인합니다.")
+    async def lock_status(self, interaction: discord.Interaction):
+        stats = self.bot.player_locks.stats()
+        wait = stats['wait']
+        embed = discord.Embed(title="🔒 플레이어 명령 잠금 현황", color=discord.Color.dark_grey())
+        embed.add_field(name="잠금 획득", value=f"{wait['count']}회 | p50 {wait['p50_ms']:.1f}ms / p95 {wait['p95_ms']:.1f}ms / 최대 {wait['max_ms']:.1f}ms", inline=False)
+        embed.add_field(name="대기 발생", value=f"{stats['contended']}회", inline=True)
+        embed.add_field(name="대기열 초과 거절", value=f"{stats['rejected']}회", inline=True)
+        embed.add_field(name="진행 중", value=f"잠금 {stats['locked']}명 / 행동 {stats['activities']}명", inline=True)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(AdminCog(bot))
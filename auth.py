@@ -0,0 +1,94 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from metrics import LatencyStats
+
+# 새로 만드는 해시에 사용할 방식. 바꾸면 기존 사용자는 다음 로그인 때 자동으로 다시 해시됩니다.
+PASSWORD_HASH_METHOD = "scrypt:32768:8:1"
+
+def needs_rehash(password_hash, method=PASSWORD_HASH_METHOD):
+    """저장된 해시가 현재 설정과 다른 방식/파라미터로 만들어졌는지 확인합니다."""
+    return password_hash.split('$', 1)[0] != method
+
+# --- 작업 프로세스에서 실행되는 함수 (피클 가능하도록 모듈 최상위에 둡니다) ---
+def _hash_password(password, method):
+    return generate_password_hash(password, method=method)
+
+def _verify_password(password_hash, password, method):
+    if not check_password_hash(password_hash, password):
+        return False, None
+    if needs_rehash(password_hash, method):
+        return True, generate_password_hash(password, method=method)
+    return True, None
+
+class AuthBusyError(Exception):
+    """같은 사용자의 인증 요청이 이미 처리 중이거나, 처리 중인 인증 작업이 한도(max_pending)에 찼을 때 발생합니다."""
+
+class PasswordHasher:
+    """scrypt 해시 생성/검증을 프로세스 풀에서 실행합니다.
+
+    CPU와 메모리를 많이 쓰는 scrypt가 이벤트 루프를 막지 않도록 하고, 동시에 처리할 수 있는 작업 수(max_pending)와
+    사용자별 동시 요청 수를 제한합니다. 한도를 넘는 요청은 기다리지 않고 AuthBusyError로 거절합니다.
+
+    작업 프로세스는 spawn으로 만듭니다. 시작할 때 이미 DB 스레드와 웹 서버 스레드가 돌고 있어서,
+    fork하면 다른 스레드가 잡고 있던 잠금이 복사되어 작업 프로세스가 멈출 수 있습니다.
+    """
+
+    def __init__(self, max_workers=2, max_pending=8, per_user_limit=1, method=PASSWORD_HASH_METHOD):
+        self.max_workers = max_workers
+        self.per_user_limit = per_user_limit
+        self.method = method
+        self.hash_stats = LatencyStats()
+        self.verify_stats = LatencyStats()
+        self.rejected = 0
+        self._pending = asyncio.Semaphore(max_pending)
+        self._in_flight = {} # user_id -> 처리 중인 요청 수
+        self._executor = None
+
+    async def start(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    async def close(self):
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown, True)
+
+    async def _submit(self, user_id, stats, func, *args):
+        if self._executor is None:
+            raise RuntimeError("PasswordHasher가 아직 시작되지 않았습니다.")
+        if self._in_flight.get(user_id, 0) >= self.per_user_limit or self._pending.locked():
+            self.rejected += 1
+            raise AuthBusyError()
+        self._in_flight[user_id] = self._in_flight.get(user_id, 0) + 1
+        started = time.perf_counter()
+        try:
+            async with self._pending:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            # 대기열에서 기다린 시간까지 포함한 전체 인증 지연 시간을 기록합니다.
+            stats.record(time.perf_counter() - started)
+            remaining = self._in_flight[user_id] - 1
+            if remaining:
+                self._in_flight[user_id] = remaining
+            else:
+                del self._in_flight[user_id]
+
+    async def hash(self, user_id, password):
+        return await self._submit(user_id, self.hash_stats, _hash_password, password, self.method)
+
+    async def verify(self, user_id, password_hash, password):
+        """(일치 여부, 새 해시 또는 None)을 반환합니다. 해시 파라미터가 바뀌었으면 새 해시를 함께 돌려줍니다."""
+        return await self._submit(user_id, self.verify_stats, _verify_password, password_hash, password, self.method)
+
+    def stats(self):
+        return {
+            "hash": self.hash_stats.snapshot(),
+            "verify": self.verify_stats.snapshot(),
+            "rejected": self.rejected,
+        }
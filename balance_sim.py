@@ -0,0 +1,127 @@
+"""전투 밸런스 시뮬레이터
+
+combat.py의 규칙으로 몬스터마다 수많은 전투를 한꺼번에 계산해 승률, 처치까지 걸린 턴 수,
+분당 골드/경험치를 출력합니다. 게임 실행에는 필요 없는 도구이므로 numpy는 선택 의존성입니다.
+
+    pip install numpy
+    python balance_sim.py --fights 1000000 --weapon --buff
+"""
+import argparse
+import random
+import sqlite3
+import time
+from types import SimpleNamespace
+
+try:
+    import numpy as np
+except ImportError: # 시뮬레이터를 쓰지 않으면 numpy가 없어도 됩니다.
+    np = None
+
+from combat import BASE_ATTACK_MIN, BASE_ATTACK_MAX, ATTACK_BUFF_BONUS, POISON_DAMAGE, poison_ticks, resolve_fight
+from database import MONSTERS_DATA, ITEMS_DATA
+
+DEFAULT_PLAYER_HP = 100
+MAX_TURNS = 100
+
+def load_monsters(db_path=None):
+    """시뮬레이션할 몬스터 목록. DB 경로가 없으면 database.py의 초기 데이터를 사용합니다."""
+    rows = MONSTERS_DATA
+    if db_path:
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute("SELECT id, name, hp, attack, gold, exp FROM monsters ORDER BY id").fetchall()
+        finally:
+            conn.close()
+    return [SimpleNamespace(id=r[0], name=r[1], hp=r[2], attack=r[3], gold=r[4], exp=r[5]) for r in rows]
+
+def default_weapon_bonus():
+    # 돌 칼의 공격력 보너스 (items 초기 데이터 기준)
+    for row in ITEMS_DATA:
+        if row[1] == "돌 칼" and row[4] == 'attack_boost':
+            return row[5]
+    return 0
+
+def simulate_fights(monster, fights, seed=None, player_hp=DEFAULT_PLAYER_HP, buffed=False, weapon_bonus=0,
+                    poison_seconds=0, seconds_per_turn=3.0, max_turns=MAX_TURNS):
+    """fights번의 전투를 numpy 배열로 한꺼번에 계산합니다. (승리 여부 배열, 턴 수 배열)을 반환합니다."""
+    if np is None:
+        raise RuntimeError("시뮬레이터에는 numpy가 필요합니다. (pip install numpy)")
+    rng = np.random.default_rng(seed)
+    bonus = (ATTACK_BUFF_BONUS if buffed else 0) + weapon_bonus
+
+    player = np.full(fights, player_hp, dtype=np.int64)
+    enemy = np.full(fights, monster.hp, dtype=np.int64)
+    won = np.zeros(fights, dtype=bool)
+    turns = np.full(fights, max_turns, dtype=np.int32)
+    active = np.arange(fights)
+
+    for turn in range(1, max_turns + 1):
+        if active.size == 0:
+            break
+        # resolve_turn()과 같은 순서: 플레이어 공격 -> 독 -> 몬스터 반격
+        enemy[active] -= rng.integers(BASE_ATTACK_MIN, BASE_ATTACK_MAX + 1, size=active.size) + bonus
+        ticks = poison_ticks((turn - 1) * seconds_per_turn, turn * seconds_per_turn, poison_seconds)
+        if ticks:
+            player[active] -= POISON_DAMAGE * ticks
+        killed = enemy[active] <= 0
+        won[active[killed]] = True
+        turns[active[killed]] = turn
+
+        active = active[~killed]
+        player[active] -= monster.attack
+        lost = player[active] <= 0
+        turns[active[lost]] = turn
+        active = active[~lost]
+    return won, turns
+
+def summarize(monster, won, turns, seconds_per_turn, encounter_seconds):
+    fights = len(won)
+    wins = int(won.sum())
+    # 전투 시간 + 다음 전투를 만나기까지의 시간을 모두 플레이 시간으로 봅니다.
+    minutes = (float(turns.sum()) * seconds_per_turn + fights * encounter_seconds) / 60
+    return {
+        "monster": monster.name,
+        "win_rate": wins / fights,
+        "avg_turns_to_kill": float(turns[won].mean()) if wins else float('nan'),
+        "gold_per_minute": wins * monster.gold / minutes,
+        "exp_per_minute": wins * monster.exp / minutes,
+    }
+
+def reference_win_rate(monster, fights, seed=None, **options):
+    """numpy 계산이 실제 규칙(combat.resolve_fight)과 같은지 확인하기 위한 순수 파이썬 버전"""
+    rng = random.Random(seed)
+    player_hp = options.pop('player_hp', DEFAULT_PLAYER_HP)
+    wins = sum(resolve_fight(player_hp, monster, rng, **options)[0] for _ in range(fights))
+    return wins / fights
+
+def main():
+    parser = argparse.ArgumentParser(description="전투 밸런스 몬테카를로 시뮬레이터")
+    parser.add_argument("--fights", type=int, default=1_000_000, help="몬스터당 전투 수")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--db", default=None, help="몬스터 정보를 읽을 DB 경로 (기본: 초기 데이터)")
+    parser.add_argument("--hp", type=int, default=DEFAULT_PLAYER_HP, help="플레이어 HP")
+    parser.add_argument("--buff", action="store_true", help="공격력 강화 물약 효과 적용")
+    parser.add_argument("--weapon", action="store_true", help="돌 칼 장착")
+    parser.add_argument("--poison-seconds", type=float, default=0, help="전투 시작 시 걸린 독의 지속 시간(초). 독 물약은 60초")
+    parser.add_argument("--seconds-per-turn", type=float, default=3.0)
+    parser.add_argument("--encounter-seconds", type=float, default=10.0, help="전투 사이에 걸리는 시간")
+    parser.add_argument("--check", type=int, default=0, help="순수 파이썬 규칙으로 승률을 교차 확인할 전투 수")
+    args = parser.parse_args()
+    if np is None:
+        raise SystemExit("시뮬레이터에는 numpy가 필요합니다. (pip install numpy)")
+
+    options = dict(player_hp=args.hp, buffed=args.buff, weapon_bonus=default_weapon_bonus() if args.weapon else 0,
+                   poison_seconds=args.poison_seconds, seconds_per_turn=args.seconds_per_turn)
+    print(f"{'몬스터':<8} {'승률':>8} {'처치 턴':>8} {'골드/분':>9} {'경험치/분':>9}")
+    for monster in load_monsters(args.db):
+        started = time.perf_counter()
+        won, turns = simulate_fights(monster, args.fights, args.seed, **options)
+        report = summarize(monster, won, turns, args.seconds_per_turn, args.encounter_seconds)
+        line = (f"{report['monster']:<8} {report['win_rate']:>8.2%} {report['avg_turns_to_kill']:>8.2f} "
+                f"{report['gold_per_minute']:>9.2f} {report['exp_per_minute']:>9.2f}  ({time.perf_counter() - started:.2f}s)")
+        if args.check:
+            line += f"  [검증 승률 {reference_win_rate(monster, args.check, args.seed, **options):.2%}]"
+        print(line)
+
+if __name__ == '__main__':
+    main()
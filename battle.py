@@ -0,0 +1,145 @@
+import random
+import sqlite3
+
+from combat import resolve_turn
+from database import SQL_INVENTORY_ENTRY
+from inventory import grant_items, resolve_items, set_durability
+
+WEAPON_NAME = "돌 칼" # 지금은 돌 칼만 사용
+
+class BattleSession:
+    """진행 중인 전투 하나의 상태
+
+    시작할 때 플레이어 상태(캐시)와 무기 보유/내구도를 한 번만 읽어 두고, 턴마다 데미지,
+    내구도, 드롭을 메모리에서 계산합니다. 버프/상태 이상의 만료와 독 데미지는 효과
+    스케줄러가 처리합니다. 한 턴에 생긴 인벤토리 변경은 commit()에서 하나의 트랜잭션으로
+    저장하고, 플레이어 수치는 플레이어 캐시에 반영합니다. 내구도/획득 문구는 저장에
+    성공했을 때만 notes로 내보냅니다.
+    """
+    __slots__ = ('player_id', 'player', 'monster', 'monster_hp', 'catalog', 'weapon', 'weapon_durability',
+                 'overflow', 'notes', '_changes', '_drops', '_notes', '_weapon_dirty')
+
+    def __init__(self, player_id, player, monster, catalog, weapon=None, weapon_durability=None):
+        self.player_id = player_id
+        self.player = player                       # PlayerState (플레이어 캐시와 같은 객체)
+        self.monster = monster                     # 공유 몬스터 템플릿 (변경하지 않습니다)
+        self.monster_hp = monster.hp               # 이 전투에서 몬스터의 남은 HP
+        self.catalog = catalog                     # 전투 시작 시점의 아이템 카탈로그
+        self.weapon = weapon                       # 보유 중인 무기 Item 또는 None
+        self.weapon_durability = weapon_durability # 내구도가 없는 무기면 None
+        self.overflow = {}                         # 마지막 commit()에서 보관 한도 때문에 받지 못한 드롭
+        self.notes = ""                            # 마지막 commit()에서 저장된 내구도/획득 문구
+        self._changes = {}
+        self._drops = []
+        self._notes = []
+        self._weapon_dirty = False
+
+    @classmethod
+    async def start(cls, bot, player_id, monster, catalog):
+        """전투에 필요한 스냅샷을 불러옵니다. 플레이어가 없으면 None"""
+        player = await bot.player_cache.get(player_id)
+        if player is None:
+            return None
+        weapon, durability = catalog.get_item_by_name(WEAPON_NAME), None
+        if weapon:
+            row = await bot.db.fetchone(SQL_INVENTORY_ENTRY, (player_id, weapon.id))
+            if not row or row['quantity'] <= 0:
+                weapon = None
+            elif weapon.max_durability is not None:
+                durability = row['durability'] if row['durability'] is not None else weapon.max_durability
+        return cls(player_id, player, monster, catalog, weapon, durability)
+
+    @property
+    def has_weapon(self):
+        return self.weapon is not None and (self.weapon_durability is None or self.weapon_durability > 0)
+
+    def _wear_weapon(self):
+        """무기 내구도를 1 줄이고 메시지를 반환합니다."""
+        if self.weapon_durability is None:
+            return ""
+        self.weapon_durability -= 1
+        self._weapon_dirty = True
+        if self.weapon_durability > 0:
+            return f"({self.weapon.name}의 내구도가 1 감소했습니다.)"
+        return f"**{self.weapon.name}이(가) 모두 사용되어 부서졌습니다!**"
+
+    def play_turn(self, rng=random):
+        """공격 한 턴을 메모리에서 계산합니다. (전투 로그, 전투 종료 여부)를 반환하며,
+        변경 사항은 commit()을 호출할 때 저장됩니다. 인벤토리 관련 문구는 전투 로그에 넣지 않고 commit()까지 보류합니다."""
+        player = self.player
+        monster = self.monster
+        changes = self._changes
+
+        weapon_bonus = 0
+        durability_message = ""
+        if self.has_weapon:
+            if self.weapon.effect_type == 'attack_boost':
+                weapon_bonus = self.weapon.effect_value
+            durability_message = self._wear_weapon()
+
+        # 수치 계산은 combat.resolve_turn()이 하고, 여기서는 로그와 저장할 변경 사항만 만듭니다.
+        result = resolve_turn(
+            player.hp, self.monster_hp, monster.attack, rng,
+            buffed=bool(player.attack_buff_until), # 만료되면 효과 스케줄러가 0으로 되돌립니다.
+            weapon_bonus=weapon_bonus,
+        )
+
+        battle_log = f"⚔️ {player.nickname}이(가) {monster.name}에게 {result.player_attack}의 데미지를 입혔습니다.\n   (몬스터 남은 HP: {result.monster_hp})\n"
+        if durability_message:
+            self._notes.append("\n" + durability_message)
+
+        self.monster_hp = result.monster_hp
+
+        # --- 몬스터 사망 처리 ---
+        if result.monster_defeated:
+            changes.update(gold=player.gold + monster.gold, exp=player.exp + monster.exp)
+            battle_log += f"\n🎉 {monster.name}을(를) 물리쳤습니다!\n   골드 +{monster.gold}, 경험치 +{monster.exp}을 획득했습니다."
+            for item_name, quantity in monster.loot.roll(rng):
+                self._drops.append((item_name, quantity))
+                self._notes.append(f"\n   ✨ {item_name}을(를) 획득했습니다!")
+            return battle_log, True
+
+        # --- 몬스터 반격 ---
+        # 패배하더라도 최소한의 HP(1)는 남깁니다.
+        changes['hp'] = result.player_hp if result.player_hp > 0 else 1
+        battle_log += f"\n🩸 {monster.name}이(가) {player.nickname}에게 {result.monster_attack}의 데미지를 입혔습니다.\n   (남은 HP: {result.player_hp})"
+        if result.player_defeated:
+            battle_log += f"\n\n☠️ 전투에서 패배했습니다..."
+            return battle_log, True
+        return battle_log, False
+
+    async def commit(self, bot):
+        """이번 턴의 변경 사항을 저장합니다. 인벤토리가 바뀌었으면 True를 반환합니다.
+
+        저장에 실패하면 False를 반환하고, overflow와 notes는 비워 둡니다.
+        """
+        changes, self._changes = self._changes, {}
+        drops, self._drops = self._drops, []
+        notes, self._notes = self._notes, []
+        self.overflow, self.notes = {}, ""
+        if changes:
+            bot.player_cache.update(self.player, **changes)
+
+        quantities = {}
+        for item_name, quantity in drops:
+            quantities[item_name] = quantities.get(item_name, 0) + quantity
+        grants = resolve_items(self.catalog, quantities)
+        weapon_dirty, self._weapon_dirty = self._weapon_dirty, False
+        if not grants and not weapon_dirty:
+            return False
+
+        player_id, weapon, durability = self.player_id, self.weapon, self.weapon_durability
+        def persist_turn(conn):
+            if weapon_dirty:
+                set_durability(conn, player_id, weapon.id, durability)
+            if grants:
+                return grant_items(conn, player_id, grants).overflow
+            return {}
+
+        try:
+            overflow = await bot.db.run(persist_turn) # 한 턴의 인벤토리 변경은 하나의 트랜잭션입니다.
+        except sqlite3.Error as e:
+            print(f"전투 턴 저장 실패 (User: {player_id}): {e}")
+            return False
+        self.overflow, self.notes = overflow, "".join(notes)
+        return True
@@ -0,0 +1,71 @@
+import math
+from dataclasses import dataclass
+
+# --- 전투 규칙 ---
+# 디스코드 없이도 같은 규칙으로 계산할 수 있도록 숫자와 계산을 이곳에 모아 둡니다.
+BASE_ATTACK_MIN = 5
+BASE_ATTACK_MAX = 15
+ATTACK_BUFF_BONUS = 10 # 공격력 강화 물약 효과
+POISON_DAMAGE = 5      # 독 상태일 때 한 번에 받는 데미지
+POISON_TICK_INTERVAL = 3.0 # 독 데미지 간격(초). 효과 스케줄러(effects.py)가 시간에 따라 적용합니다.
+
+@dataclass(frozen=True, slots=True)
+class TurnResult:
+    """공격 한 턴의 결과"""
+    player_attack: int   # 플레이어가 입힌 데미지
+    poison_damage: int   # 이번 턴에 독으로 받은 데미지
+    monster_attack: int  # 몬스터 반격 데미지 (몬스터가 쓰러졌으면 0)
+    player_hp: int       # 턴이 끝난 뒤 플레이어 HP (0 이하일 수 있음)
+    monster_hp: int      # 턴이 끝난 뒤 몬스터 HP (0 이하일 수 있음)
+
+    @property
+    def monster_defeated(self):
+        return self.monster_hp <= 0
+
+    @property
+    def player_defeated(self):
+        return not self.monster_defeated and self.player_hp <= 0
+
+def poison_ticks(start, end, duration):
+    """독에 걸린 뒤 start초 초과 end초 이하 사이에 들어가는 독 데미지 횟수
+
+    효과 스케줄러와 같이 걸린 시점부터 POISON_TICK_INTERVAL마다, 지속 시간(duration초)이 끝나기 전까지 들어갑니다.
+    """
+    last = math.ceil(duration / POISON_TICK_INTERVAL) - 1 # 마지막 독 데미지의 순번
+    def ticks_until(seconds):
+        return max(0, min(math.floor(seconds / POISON_TICK_INTERVAL), last))
+    return ticks_until(end) - ticks_until(start)
+
+def roll_player_attack(rng, buffed=False, weapon_bonus=0):
+    return rng.randint(BASE_ATTACK_MIN, BASE_ATTACK_MAX) + (ATTACK_BUFF_BONUS if buffed else 0) + weapon_bonus
+
+def resolve_turn(player_hp, monster_hp, monster_attack, rng, buffed=False, weapon_bonus=0, poison_ticks=0):
+    """공격 한 턴을 계산합니다. 같은 시드의 rng(random.Random)를 넘기면 항상 같은 결과가 나옵니다.
+
+    순서: 플레이어 공격 -> 독 데미지 -> (몬스터가 살아 있으면) 몬스터 반격
+    게임에서는 독 데미지를 효과 스케줄러가 따로 적용하므로, poison_ticks(이번 턴 동안의 독 데미지 횟수)는 시뮬레이션에서만 씁니다.
+    """
+    player_attack = roll_player_attack(rng, buffed, weapon_bonus)
+    monster_hp -= player_attack
+    poison_damage = POISON_DAMAGE * poison_ticks
+    player_hp -= poison_damage
+    if monster_hp <= 0:
+        return TurnResult(player_attack, poison_damage, 0, player_hp, monster_hp)
+    player_hp -= monster_attack
+    return TurnResult(player_attack, poison_damage, monster_attack, player_hp, monster_hp)
+
+def resolve_fight(player_hp, monster, rng, buffed=False, weapon_bonus=0, poison_seconds=0, seconds_per_turn=3.0, max_turns=100):
+    """전투 하나를 끝까지 계산합니다. (승리 여부, 걸린 턴 수)를 반환합니다.
+
+    전투를 시작할 때 독에 걸렸고 poison_seconds초 동안 지속된다고 보고, 한 턴을 seconds_per_turn초로 계산합니다.
+    """
+    monster_hp = monster.hp
+    for turn in range(1, max_turns + 1):
+        ticks = poison_ticks((turn - 1) * seconds_per_turn, turn * seconds_per_turn, poison_seconds)
+        result = resolve_turn(player_hp, monster_hp, monster.attack, rng, buffed, weapon_bonus, ticks)
+        if result.monster_defeated:
+            return True, turn
+        if result.player_defeated:
+            return False, turn
+        player_hp, monster_hp = result.player_hp, result.monster_hp
+    return False, max_turns
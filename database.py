@@ -1,71 +1,59 @@
+import hashlib
+import json
 import sqlite3
 
-def setup_database():
-    conn = sqlite3.connect('game.db')
-    c = conn.cursor()
-
-    # --- 테이블 구조 변경 및 생성 ---
-
-    # players 테이블에 current_location_id 추가
-    try:
-        c.execute("ALTER TABLE players ADD COLUMN current_location_id INTEGER DEFAULT 1")
-        print("players 테이블에 'current_location_id' 열이 추가되었습니다.")
-    except sqlite3.OperationalError:
-        pass # 이미 열이 존재하는 경우
+# --- 스키마 마이그레이션 ---
+# 적용된 마지막 마이그레이션 번호는 PRAGMA user_version에 기록됩니다.
+# 새로운 스키마 변경은 기존 항목을 고치지 말고 MIGRATIONS 끝에 번호를 하나 늘려 추가합니다.
 
-    # players 테이블에 attack_buff_until 추가
-    try:
-        c.execute("ALTER TABLE players ADD COLUMN attack_buff_until REAL DEFAULT 0") # Unix timestamp
-        print("players 테이블에 'attack_buff_until' 열이 추가되었습니다.")
-    except sqlite3.OperationalError:
-        pass # 이미 열이 존재하는 경우
-
-    # players 테이블에 status_effect, status_effect_end_time, status_effect_value 추가
-    try:
-        c.execute("ALTER TABLE players ADD COLUMN status_effect TEXT DEFAULT NULL")
-        c.execute("ALTER TABLE players ADD COLUMN status_effect_end_time REAL DEFAULT 0")
-        c.execute("ALTER TABLE players ADD COLUMN status_effect_value INTEGER DEFAULT 0")
-        print("players 테이블에 'status_effect', 'status_effect_end_time', 'status_effect_value' 열이 추가되었습니다.")
-    except sqlite3.OperationalError:
-        pass # 이미 열이 존재하는 경우
-
-    # players 테이블에 새로운 스탯 필드 추가
-    try:
-        c.execute("ALTER TABLE players ADD COLUMN strength INTEGER DEFAULT 0")
-        c.execute("ALTER TABLE players ADD COLUMN swordsmanship INTEGER DEFAULT 0")
-        c.execute("ALTER TABLE players ADD COLUMN recovery INTEGER DEFAULT 0")
-        c.execute("ALTER TABLE players ADD COLUMN observation INTEGER DEFAULT 0")
-        c.execute("ALTER TABLE players ADD COLUMN water_magic INTEGER DEFAULT 0")
-        c.execute("ALTER TABLE players ADD COLUMN sight INTEGER DEFAULT 0")
-        print("players 테이블에 새로운 스탯 필드가 추가되었습니다.")
-    except sqlite3.OperationalError:
-        pass # 이미 열이 존재하는 경우
-
-    # items 테이블에 effect_name 추가
-    try:
-        c.execute("ALTER TABLE items ADD COLUMN effect_name TEXT DEFAULT NULL")
-        print("items 테이블에 'effect_name' 열이 추가되었습니다.")
-    except sqlite3.OperationalError:
-        pass # 이미 열이 존재하는 경우
-
-    # items 테이블에 max_durability 추가
-    try:
-        c.execute("ALTER TABLE items ADD COLUMN max_durability INTEGER DEFAULT NULL")
-        print("items 테이블에 'max_durability' 열이 추가되었습니다.")
-    except sqlite3.OperationalError:
-        pass # 이미 열이 존재하는 경우
-
-    # player_inventory 테이블에 durability 추가
-    try:
-        c.execute("ALTER TABLE player_inventory ADD COLUMN durability INTEGER DEFAULT NULL")
-        print("player_inventory 테이블에 'durability' 열이 추가되었습니다.")
-    except sqlite3.OperationalError:
-        pass # 이미 열이 존재하는 경우
+def _add_missing_columns(c, table, columns):
+    existing = {row[1] for row in c.execute(f"PRAGMA table_info({table})")}
+    for name, definition in columns:
+        if name not in existing:
+            c.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+            print(f"{table} 테이블에 '{name}' 열이 추가되었습니다.")
 
-    # 기존 맵 관련 테이블 삭제 (스키마 변경을 위해)
-    c.execute("DROP TABLE IF EXISTS locations")
-    c.execute("DROP TABLE IF EXISTS map_connections")
-    c.execute("DROP TABLE IF EXISTS location_monsters")
+def _migration_1_baseline(c):
+    """기본 스키마. 예전 버전의 DB라면 빠져 있는 열만 추가합니다."""
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS players (
+            user_id INTEGER PRIMARY KEY,
+            login_id TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            nickname TEXT UNIQUE,
+            level INTEGER DEFAULT 1,
+            hp INTEGER DEFAULT 100,
+            mp INTEGER DEFAULT 50,
+            gold INTEGER DEFAULT 0,
+            exp INTEGER DEFAULT 0,
+            current_location_id INTEGER DEFAULT 1,
+            job TEXT DEFAULT '초보자',
+            skp INTEGER DEFAULT 0,
+            attack_buff_until REAL DEFAULT 0, -- Unix timestamp
+            status_effect TEXT DEFAULT NULL,
+            status_effect_end_time REAL DEFAULT 0,
+            status_effect_value INTEGER DEFAULT 0,
+            strength INTEGER DEFAULT 0,
+            swordsmanship INTEGER DEFAULT 0,
+            recovery INTEGER DEFAULT 0,
+            observation INTEGER DEFAULT 0,
+            water_magic INTEGER DEFAULT 0,
+            sight INTEGER DEFAULT 0
+        )
+    ''')
+    _add_missing_columns(c, 'players', [
+        ('current_location_id', 'INTEGER DEFAULT 1'),
+        ('attack_buff_until', 'REAL DEFAULT 0'),
+        ('status_effect', 'TEXT DEFAULT NULL'),
+        ('status_effect_end_time', 'REAL DEFAULT 0'),
+        ('status_effect_value', 'INTEGER DEFAULT 0'),
+        ('strength', 'INTEGER DEFAULT 0'),
+        ('swordsmanship', 'INTEGER DEFAULT 0'),
+        ('recovery', 'INTEGER DEFAULT 0'),
+        ('observation', 'INTEGER DEFAULT 0'),
+        ('water_magic', 'INTEGER DEFAULT 0'),
+        ('sight', 'INTEGER DEFAULT 0'),
+    ])
 
     # locations 테이블 생성
     c.execute('''
@@ -98,25 +86,6 @@ def setup_database():
         )
     ''')
 
-    # 기존 테이블 (players, game_state, chat_logs) 생성 구문은 유지
-    # players 테이블은 current_location_id 필드를 포함하여 재생성/수정합니다.
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS players (
-            user_id INTEGER PRIMARY KEY,
-            login_id TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            nickname TEXT UNIQUE,
-            level INTEGER DEFAULT 1,
-            hp INTEGER DEFAULT 100,
-            mp INTEGER DEFAULT 50,
-            gold INTEGER DEFAULT 0,
-            exp INTEGER DEFAULT 0,
-            current_location_id INTEGER DEFAULT 1,
-            job TEXT DEFAULT '초보자',
-            skp INTEGER DEFAULT 0
-        )
-    ''')
-
     # items 테이블 생성
     c.execute('''
         CREATE TABLE IF NOT EXISTS items (
@@ -132,6 +101,10 @@ def setup_database():
             max_durability INTEGER DEFAULT NULL -- NULL for non-durable items
         )
     ''')
+    _add_missing_columns(c, 'items', [
+        ('effect_name', 'TEXT DEFAULT NULL'),
+        ('max_durability', 'INTEGER DEFAULT NULL'),
+    ])
 
     # player_inventory 테이블 생성
     c.execute('''
@@ -145,6 +118,9 @@ def setup_database():
             FOREIGN KEY (item_id) REFERENCES items(id)
         )
     ''')
+    _add_missing_columns(c, 'player_inventory', [
+        ('durability', 'INTEGER DEFAULT NULL'),
+    ])
 
     c.execute('''
         CREATE TABLE IF NOT EXISTS game_state (
@@ -163,66 +139,335 @@ def setup_database():
         )
     ''')
 
-    # --- 초기 데이터 삽입 ---
-    
-    # locations 데이터
-    locations_data = [
-        (1, '평온한 초원', '부드러운 바람이 불어오는 시작의 장소입니다. 저 멀리 숲이 보입니다.', '["덤불 살피기", "나무 올라가기"]'),
-        (2, '동쪽 숲', '나무가 빽빽하게 들어서 있어 어둡고 습합니다. 약한 몬스터들이 주로 나타납니다.', '["수풀 헤치기", "버섯 채집"]'),
-        (3, '오래된 폐허', '과거에 무슨 일이 있었는지, 스산한 기운이 감도는 곳입니다. 강력한 몬스터가 있다는 소문이 있습니다.', '["문 두드리기", "잔해 뒤지기"]'),
-        (4, '강가', '맑은 물이 흐르는 강가입니다. 물고기가 뛰어노는 모습이 보입니다.', '["낚시하기", "물 마시기"]'),
-        (5, '어두운 동굴', '음침하고 습한 동굴입니다. 위험한 몬스터들이 서식합니다.', '["탐색하기", "광물 채집"]')
-    ]
-    c.executemany("INSERT OR IGNORE INTO locations (id, name, description, actions) VALUES (?, ?, ?, ?)", locations_data)
-
-    # map_connections 데이터
-    connections_data = [
-        (1, 2), # 평온한 초원 -> 동쪽 숲
-        (2, 1), # 동쪽 숲 -> 평온한 초원
-        (2, 3), # 동쪽 숲 -> 오래된 폐허
-        (3, 2),  # 오래된 폐허 -> 동쪽 숲
-        (1, 4), # 평온한 초원 -> 강가
-        (4, 1), # 강가 -> 평온한 초원
-        (3, 5), # 오래된 폐허 -> 어두운 동굴
-        (5, 3)  # 어두운 동굴 -> 오래된 폐허
-    ]
-    c.executemany("INSERT OR IGNORE INTO map_connections (from_location_id, to_location_id) VALUES (?, ?)", connections_data)
-
-    # location_monsters 데이터
-    monsters_data = [
-        (2, '슬라임'),
-        (2, '고블린'),
-        (3, '고블린'),
-        (3, '오크'),
-        (4, '늑대'),
-        (5, '거미'),
-        (5, '오크')
-    ]
-    c.executemany("INSERT OR IGNORE INTO location_monsters (location_id, monster_name) VALUES (?, ?)", monsters_data)
-
-    # items 데이터
-    items_data = [
-        (1, '기초 회복 물약', 'HP를 2 회복시켜주는 물약입니다.', 'consumable', 'hp_recovery', 2, 1, 99, None, None),
-        (2, '명의의 약', 'HP를 10 회복시켜주는 귀한 약입니다.', 'consumable', 'hp_recovery', 10, 1, 99, None, None),
-        (3, '낡은 곡괭이', '오래되어 녹슨 곡괭이입니다. 채광에 사용됩니다.', 'tool', 'none', None, 0, 1, None, 20),
-        (4, '공격력 강화 물약', '공격력을 5분간 증가시켜주는 물약입니다.', 'consumable', 'attack_boost', 300, 0, 1, None, None),
-        (5, '독 물약', '상대에게 독 상태 이상을 부여합니다.', 'consumable', 'status_effect_apply', 60, 0, 1, 'poison', None),
-        (6, '생고기', '익히지 않은 날고기입니다. 요리 재료로 사용됩니다.', 'consumable', 'hp_recovery', 5, 1, 99, None, None), # 임시로 HP 회복 효과 부여
-        (7, '낡은 낚싯대', '금방이라도 부러질 것 같은 낚싯대입니다.', 'tool', 'none', None, 0, 1, None, 15),
-        (8, '돌멩이', '강가에서 흔히 볼 수 있는 돌멩이입니다.', 'material', 'none', None, 1, 99, None, None),
-        (9, '철광석', '제련하면 철을 얻을 수 있는 광석입니다.', 'material', 'none', None, 1, 99, None, None),
-        (10, '송사리', '작고 귀여운 물고기입니다. 먹을 수는 없어 보입니다.', 'material', 'none', None, 1, 99, None, None),
-        (11, '잉어', '제법 살이 오른 잉어입니다. 요리하면 맛있을 것 같습니다.', 'consumable', 'hp_recovery', 10, 1, 99, None, None),
-        (12, '나뭇가지', '가늘고 긴 나뭇가지입니다. 어디에든 쓸모가 있을 것 같습니다.', 'material', 'none', None, 1, 99, None, None),
-        (13, '질긴 나뭇잎', '크고 질긴 나뭇잎입니다. 무언가를 엮는 데 사용될 수 있을 것 같습니다.', 'material', 'none', None, 1, 99, None, None),
-        (14, '튼튼한 낚싯대', '꽤나 튼튼해 보이는 낚싯대입니다. 더 좋은 물고기를 낚을 수 있을 것 같습니다.', 'tool', 'none', None, 0, 1, None, 30),
-        (15, '돌 칼', '돌을 뾰족하게 갈아 만든 칼입니다. 없는 것보다는 낫습니다.', 'equipment', 'attack_boost', 2, 0, 1, None, 20)
-    ]
-    c.executemany("INSERT OR IGNORE INTO items (id, name, description, item_type, effect_type, effect_value, stackable, max_stack, effect_name, max_durability) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", items_data)
-
-    conn.commit()
-    conn.close()
+    # 초기 데이터가 바뀌었는지 확인하기 위한 체크섬 테이블
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS seed_checksums (
+            name TEXT PRIMARY KEY,
+            checksum TEXT NOT NULL
+        )
+    ''')
+
+def _migration_2_inventory_indexes(c):
+    """인벤토리 조회 패턴에 맞춘 인덱스
+
+    (user_id, item_id) 조회는 기본 키 인덱스가, items.name 조회는 UNIQUE 인덱스가 이미 처리합니다.
+    """
+    # "수량이 남아 있는 아이템 id 목록" 조회를 테이블 접근 없이 인덱스만으로 처리합니다.
+    c.execute("CREATE INDEX IF NOT EXISTS idx_player_inventory_user_quantity ON player_inventory (user_id, quantity, item_id)")
+
+# 채팅창에 표시되고 DB에 보관되는 최근 메시지 수
+CHAT_LOG_SIZE = 10
+
+def _migration_3_chat_ring(c):
+    """chat_logs를 고정 크기 링 버퍼(chat_ring)로 교체합니다.
+
+    메시지는 seq % CHAT_LOG_SIZE 슬롯을 덮어쓰므로 테이블은 항상 CHAT_LOG_SIZE행 이하로 유지되고,
+    매번 오래된 메시지를 정렬해 지울 필요가 없습니다.
+    """
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS chat_ring (
+            slot INTEGER PRIMARY KEY,
+            seq INTEGER NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            message TEXT NOT NULL
+        )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_chat_ring_seq ON chat_ring (seq)")
+
+    # 기존 채팅 기록 중 최근 메시지만 옮깁니다.
+    if c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'chat_logs'").fetchone():
+        recent = c.execute("SELECT timestamp, message FROM chat_logs ORDER BY id DESC LIMIT ?", (CHAT_LOG_SIZE,)).fetchall()
+        for seq, (timestamp, message) in enumerate(reversed(recent), start=1):
+            c.execute("INSERT OR REPLACE INTO chat_ring (slot, seq, timestamp, message) VALUES (?, ?, ?, ?)",
+                      (seq % CHAT_LOG_SIZE, seq, timestamp, message))
+        c.execute("DROP TABLE chat_logs")
+
+def _migration_4_monsters(c):
+    """몬스터 정보와 드롭 표를 DB로 옮기고, 지역별 출현 가중치를 추가합니다."""
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS monsters (
+            id INTEGER PRIMARY KEY,
+            name TEXT UNIQUE NOT NULL,
+            hp INTEGER NOT NULL,
+            attack INTEGER NOT NULL,
+            gold INTEGER NOT NULL DEFAULT 0,
+            exp INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS monster_drops (
+            monster_id INTEGER NOT NULL,
+            item_id INTEGER NOT NULL,
+            chance REAL NOT NULL,              -- 0~1, 아이템마다 독립적으로 굴립니다.
+            min_quantity INTEGER NOT NULL DEFAULT 1,
+            max_quantity INTEGER NOT NULL DEFAULT 1,
+            FOREIGN KEY (monster_id) REFERENCES monsters(id),
+            FOREIGN KEY (item_id) REFERENCES items(id),
+            PRIMARY KEY (monster_id, item_id)
+        )
+    ''')
+    _add_missing_columns(c, 'location_monsters', [
+        ('weight', 'REAL NOT NULL DEFAULT 1'), # 같은 지역 몬스터 사이의 상대 출현 가중치
+    ])
+
+def _migration_5_recipes(c):
+    """제작 레시피를 DB로 옮깁니다. 다른 레시피의 완성품을 재료로 쓸 수 있습니다."""
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS recipes (
+            product_id INTEGER NOT NULL,
+            material_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,        -- 완성품 1개당 필요한 재료 수
+            FOREIGN KEY (product_id) REFERENCES items(id),
+            FOREIGN KEY (material_id) REFERENCES items(id),
+            PRIMARY KEY (product_id, material_id)
+        )
+    ''')
+
+MIGRATIONS = [
+    (1, "기본 스키마", _migration_1_baseline),
+    (2, "인벤토리 인덱스", _migration_2_inventory_indexes),
+    (3, "채팅 링 버퍼", _migration_3_chat_ring),
+    (4, "몬스터 정보와 출현 가중치", _migration_4_monsters),
+    (5, "제작 레시피", _migration_5_recipes),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def migrate(conn):
+    """아직 적용되지 않은 마이그레이션만 하나의 트랜잭션으로 적용합니다. 적용한 개수를 반환합니다."""
+    current_version = conn.execute("PRAGMA user_version").fetchone()[0]
+    pending = [m for m in MIGRATIONS if m[0] > current_version]
+    if not pending:
+        return 0
+
+    c = conn.cursor()
+    c.execute("BEGIN IMMEDIATE")
+    try:
+        for version, description, migration in pending:
+            migration(c)
+            print(f"마이그레이션 {version} 적용: {description}")
+        # user_version 변경도 트랜잭션에 포함되므로 실패 시 함께 롤백됩니다.
+        c.execute(f"PRAGMA user_version = {pending[-1][0]}")
+        c.execute("COMMIT")
+    except BaseException:
+        c.execute("ROLLBACK")
+        raise
+    return len(pending)
+
+# --- 자주 실행되는 쿼리 ---
+# 아이템 이름은 ItemManager에서 id로 바꾼 뒤 조회하므로 items.name으로 거르는 쿼리가 없습니다.
+SQL_INVENTORY_HAS_ITEM = "SELECT 1 FROM player_inventory WHERE user_id = ? AND item_id = ? AND quantity > 0"
+SQL_INVENTORY_QUANTITY = "SELECT quantity FROM player_inventory WHERE user_id = ? AND item_id = ?"
+SQL_INVENTORY_ENTRY = "SELECT quantity, durability FROM player_inventory WHERE user_id = ? AND item_id = ?"
+SQL_INVENTORY_TOOL = "SELECT pi.durability, i.max_durability FROM player_inventory pi JOIN items i ON pi.item_id = i.id WHERE pi.user_id = ? AND pi.item_id = ?"
+SQL_INVENTORY_ITEM_IDS = "SELECT item_id FROM player_inventory WHERE user_id = ? AND quantity > 0"
+def sql_inventory_quantities(count):
+    """한 플레이어의 아이템 count개 보유 수량을 한 번에 읽는 쿼리"""
+    return f"SELECT item_id, quantity FROM player_inventory WHERE user_id = ? AND item_id IN ({', '.join('?' * count)})"
+
+def sql_inventory_pairs(count):
+    """(user_id, item_id) count쌍의 보유 수량을 한 번에 읽는 쿼리
+
+    (user_id, item_id) IN (VALUES ...)는 테이블 전체를 훑으므로, VALUES 목록과 조인해 기본 키로 찾습니다.
+    """
+    values = ", ".join("(?, ?)" for _ in range(count))
+    return (f"SELECT pi.user_id, pi.item_id, pi.quantity FROM (VALUES {values}) AS v "
+            "JOIN player_inventory pi ON pi.user_id = v.column1 AND pi.item_id = v.column2")
+
+SQL_INVENTORY_LIST = "SELECT i.name, pi.quantity, pi.durability, i.max_durability FROM player_inventory pi JOIN items i ON pi.item_id = i.id WHERE pi.user_id = ?"
+# 다음 seq를 계산해 해당 슬롯을 덮어씁니다. MAX(seq)는 인덱스의 끝만 읽습니다.
+SQL_CHAT_APPEND = (
+    "INSERT OR REPLACE INTO chat_ring (slot, seq, message) "
+    f"SELECT (COALESCE(MAX(seq), 0) + 1) % {CHAT_LOG_SIZE}, COALESCE(MAX(seq), 0) + 1, ? FROM chat_ring"
+)
+SQL_CHAT_RECENT = f"SELECT message FROM chat_ring ORDER BY seq DESC LIMIT {CHAT_LOG_SIZE}"
+
+HOT_QUERIES = {
+    'inventory_has_item': SQL_INVENTORY_HAS_ITEM,
+    'inventory_quantity': SQL_INVENTORY_QUANTITY,
+    'inventory_entry': SQL_INVENTORY_ENTRY,
+    'inventory_tool': SQL_INVENTORY_TOOL,
+    'inventory_item_ids': SQL_INVENTORY_ITEM_IDS,
+    'inventory_list': SQL_INVENTORY_LIST,
+    'inventory_quantities': sql_inventory_quantities(3),
+    'inventory_pairs': sql_inventory_pairs(2),
+    'chat_append': SQL_CHAT_APPEND,
+    'chat_recent': SQL_CHAT_RECENT,
+}
+
+def check_query_plans(conn, queries=HOT_QUERIES):
+    """EXPLAIN QUERY PLAN으로 자주 실행되는 쿼리가 테이블 전체를 훑거나 임시 정렬을 하지 않는지 확인합니다.
+
+    인덱스 순서대로 읽는 스캔(SCAN ... USING INDEX)은 LIMIT과 함께 쓰이므로 허용하고, 쿼리 안의 VALUES 목록이나
+    서브쿼리 결과를 훑는 것은 테이블 스캔이 아니므로 건너뜁니다. 문제가 발견된 (쿼리 이름, 실행 계획) 목록을 반환합니다.
+    """
+    problems = []
+    for name, sql in queries.items():
+        params = (None,) * sql.count('?')
+        derived = set() # 계획 안에서 만들어진 VALUES 목록/서브쿼리 이름
+        for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params):
+            detail = row[-1]
+            words = detail.split()
+            if words[0] in ('MATERIALIZE', 'CO-ROUTINE') and len(words) > 1:
+                derived.add(words[1])
+                continue
+            table_scan = (words[0] == 'SCAN' and 'USING' not in detail and 'CONSTANT ROW' not in detail
+                          and words[1] not in derived)
+            if table_scan or 'TEMP B-TREE' in detail:
+                problems.append((name, detail))
+    return problems
+
+# --- 초기 데이터 ---
+
+# locations 데이터
+LOCATIONS_DATA = [
+    (1, '평온한 초원', '부드러운 바람이 불어오는 시작의 장소입니다. 저 멀리 숲이 보입니다.', '["덤불 살피기", "나무 올라가기"]'),
+    (2, '동쪽 숲', '나무가 빽빽하게 들어서 있어 어둡고 습합니다. 약한 몬스터들이 주로 나타납니다.', '["수풀 헤치기", "버섯 채집"]'),
+    (3, '오래된 폐허', '과거에 무슨 일이 있었는지, 스산한 기운이 감도는 곳입니다. 강력한 몬스터가 있다는 소문이 있습니다.', '["문 두드리기", "잔해 뒤지기"]'),
+    (4, '강가', '맑은 물이 흐르는 강가입니다. 물고기가 뛰어노는 모습이 보입니다.', '["낚시하기", "물 마시기"]'),
+    (5, '어두운 동굴', '음침하고 습한 동굴입니다. 위험한 몬스터들이 서식합니다.', '["탐색하기", "광물 채집"]')
+]
+
+# map_connections 데이터
+CONNECTIONS_DATA = [
+    (1, 2), # 평온한 초원 -> 동쪽 숲
+    (2, 1), # 동쪽 숲 -> 평온한 초원
+    (2, 3), # 동쪽 숲 -> 오래된 폐허
+    (3, 2),  # 오래된 폐허 -> 동쪽 숲
+    (1, 4), # 평온한 초원 -> 강가
+    (4, 1), # 강가 -> 평온한 초원
+    (3, 5), # 오래된 폐허 -> 어두운 동굴
+    (5, 3)  # 어두운 동굴 -> 오래된 폐허
+]
+
+# monsters 데이터 (id, 이름, HP, 공격력, 골드, 경험치)
+MONSTERS_DATA = [
+    (1, '슬라임', 20, 5, 2, 3),
+    (2, '고블린', 35, 8, 5, 7),
+    (3, '오크', 50, 12, 10, 12),
+    (4, '늑대', 25, 7, 3, 5),
+    (5, '거미', 15, 4, 1, 2),
+]
+
+# monster_drops 데이터 (몬스터 id, 아이템 id, 확률, 최소 수량, 최대 수량)
+MONSTER_DROPS_DATA = [
+    (1, 1, 0.3, 1, 1),  # 슬라임: 기초 회복 물약
+    (1, 6, 0.5, 1, 1),  # 슬라임: 생고기
+    (2, 1, 0.2, 1, 1),  # 고블린: 기초 회복 물약
+    (2, 5, 0.1, 1, 1),  # 고블린: 독 물약
+    (3, 4, 0.1, 1, 1),  # 오크: 공격력 강화 물약
+    (3, 6, 0.7, 1, 1),  # 오크: 생고기
+    (4, 6, 0.8, 1, 1),  # 늑대: 생고기
+    (5, 5, 0.05, 1, 1), # 거미: 독 물약
+]
+
+# recipes 데이터 (완성품 id, 재료 id, 수량)
+RECIPES_DATA = [
+    (7, 12, 5),  # 낡은 낚싯대: 나뭇가지 5
+    (7, 13, 2),  # 낡은 낚싯대: 질긴 나뭇잎 2
+    (14, 12, 10), # 튼튼한 낚싯대: 나뭇가지 10
+    (14, 13, 5), # 튼튼한 낚싯대: 질긴 나뭇잎 5
+    (15, 12, 2), # 돌 칼: 나뭇가지 2
+    (15, 8, 5),  # 돌 칼: 돌멩이 5
+]
+
+# location_monsters 데이터 (지역 id, 몬스터 이름, 출현 가중치)
+# 가중치는 모두 1로, 기존처럼 같은 지역의 몬스터가 같은 확률로 나옵니다.
+LOCATION_MONSTERS_DATA = [
+    (2, '슬라임', 1),
+    (2, '고블린', 1),
+    (3, '고블린', 1),
+    (3, '오크', 1),
+    (4, '늑대', 1),
+    (5, '거미', 1),
+    (5, '오크', 1)
+]
+
+# items 데이터
+ITEMS_DATA = [
+    (1, '기초 회복 물약', 'HP를 2 회복시켜주는 물약입니다.', 'consumable', 'hp_recovery', 2, 1, 99, None, None),
+    (2, '명의의 약', 'HP를 10 회복시켜주는 귀한 약입니다.', 'consumable', 'hp_recovery', 10, 1, 99, None, None),
+    (3, '낡은 곡괭이', '오래되어 녹슨 곡괭이입니다. 채광에 사용됩니다.', 'tool', 'none', None, 0, 1, None, 20),
+    (4, '공격력 강화 물약', '공격력을 5분간 증가시켜주는 물약입니다.', 'consumable', 'attack_boost', 300, 0, 1, None, None),
+    (5, '독 물약', '상대에게 독 상태 이상을 부여합니다.', 'consumable', 'status_effect_apply', 60, 0, 1, 'poison', None),
+    (6, '생고기', '익히지 않은 날고기입니다. 요리 재료로 사용됩니다.', 'consumable', 'hp_recovery', 5, 1, 99, None, None), # 임시로 HP 회복 효과 부여
+    (7, '낡은 낚싯대', '금방이라도 부러질 것 같은 낚싯대입니다.', 'tool', 'none', None, 0, 1, None, 15),
+    (8, '돌멩이', '강가에서 흔히 볼 수 있는 돌멩이입니다.', 'material', 'none', None, 1, 99, None, None),
+    (9, '철광석', '제련하면 철을 얻을 수 있는 광석입니다.', 'material', 'none', None, 1, 99, None, None),
+    (10, '송사리', '작고 귀여운 물고기입니다. 먹을 수는 없어 보입니다.', 'material', 'none', None, 1, 99, None, None),
+    (11, '잉어', '제법 살이 오른 잉어입니다. 요리하면 맛있을 것 같습니다.', 'consumable', 'hp_recovery', 10, 1, 99, None, None),
+    (12, '나뭇가지', '가늘고 긴 나뭇가지입니다. 어디에든 쓸모가 있을 것 같습니다.', 'material', 'none', None, 1, 99, None, None),
+    (13, '질긴 나뭇잎', '크고 질긴 나뭇잎입니다. 무언가를 엮는 데 사용될 수 있을 것 같습니다.', 'material', 'none', None, 1, 99, None, None),
+    (14, '튼튼한 낚싯대', '꽤나 튼튼해 보이는 낚싯대입니다. 더 좋은 물고기를 낚을 수 있을 것 같습니다.', 'tool', 'none', None, 0, 1, None, 30),
+    (15, '돌 칼', '돌을 뾰족하게 갈아 만든 칼입니다. 없는 것보다는 낫습니다.', 'equipment', 'attack_boost', 2, 0, 1, None, 20)
+]
+
+# (이름, 데이터, 기존 행 정리 SQL, 반영 SQL)
+# 연결 테이블은 초기 데이터와 정확히 같아지도록 비운 뒤 다시 넣고, locations는 id 기준으로 UPSERT합니다.
+# items는 관리자가 DB에서 직접 고치고 '/관리자 아이템새로고침'으로 반영하므로, 초기 데이터가 바뀌어도
+# 새 아이템만 추가하고 이미 있는 행은 덮어쓰지 않습니다. (기존 아이템을 바꾸려면 DB에서 직접 수정합니다)
+SEED_DATA = [
+    ('locations', LOCATIONS_DATA, None,
+     "INSERT INTO locations (id, name, description, actions) VALUES (?, ?, ?, ?) "
+     "ON CONFLICT(id) DO UPDATE SET name = excluded.name, description = excluded.description, actions = excluded.actions"),
+    ('map_connections', CONNECTIONS_DATA, "DELETE FROM map_connections",
+     "INSERT OR IGNORE INTO map_connections (from_location_id, to_location_id) VALUES (?, ?)"),
+    ('monsters', MONSTERS_DATA, None,
+     "INSERT INTO monsters (id, name, hp, attack, gold, exp) VALUES (?, ?, ?, ?, ?, ?) "
+     "ON CONFLICT(id) DO UPDATE SET name = excluded.name, hp = excluded.hp, attack = excluded.attack, "
+     "gold = excluded.gold, exp = excluded.exp"),
+    ('location_monsters', LOCATION_MONSTERS_DATA, "DELETE FROM location_monsters",
+     "INSERT OR IGNORE INTO location_monsters (location_id, monster_name, weight) VALUES (?, ?, ?)"),
+    ('items', ITEMS_DATA, None,
+     "INSERT OR IGNORE INTO items (id, name, description, item_type, effect_type, effect_value, stackable, max_stack, effect_name, max_durability) "
+     "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"),
+    ('monster_drops', MONSTER_DROPS_DATA, "DELETE FROM monster_drops",
+     "INSERT OR IGNORE INTO monster_drops (monster_id, item_id, chance, min_quantity, max_quantity) VALUES (?, ?, ?, ?, ?)"),
+    ('recipes', RECIPES_DATA, "DELETE FROM recipes",
+     "INSERT OR IGNORE INTO recipes (product_id, material_id, quantity) VALUES (?, ?, ?)"),
+]
+
+def _checksum(rows):
+    payload = json.dumps(rows, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def sync_seed_data(conn):
+    """체크섬이 바뀐 초기 데이터만 반영합니다. 반영한 데이터 이름 목록을 반환합니다."""
+    stored = dict(conn.execute("SELECT name, checksum FROM seed_checksums").fetchall())
+    changed = []
+    for name, rows, reset_sql, upsert_sql in SEED_DATA:
+        checksum = _checksum(rows)
+        if stored.get(name) != checksum:
+            changed.append((name, rows, reset_sql, upsert_sql, checksum))
+    if not changed:
+        return []
+
+    c = conn.cursor()
+    c.execute("BEGIN IMMEDIATE")
+    try:
+        for name, rows, reset_sql, upsert_sql, checksum in changed:
+            if reset_sql:
+                c.execute(reset_sql)
+            c.executemany(upsert_sql, rows)
+            c.execute("INSERT INTO seed_checksums (name, checksum) VALUES (?, ?) "
+                      "ON CONFLICT(name) DO UPDATE SET checksum = excluded.checksum", (name, checksum))
+            print(f"초기 데이터 '{name}'이(가) 갱신되었습니다. ({len(rows)}행)")
+        c.execute("COMMIT")
+    except BaseException:
+        c.execute("ROLLBACK")
+        raise
+    return [entry[0] for entry in changed]
+
+def setup_database(db_path='game.db'):
+    # 트랜잭션은 migrate()와 sync_seed_data()에서 직접 관리합니다.
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        migrate(conn)
+        sync_seed_data(conn)
+        for name, detail in check_query_plans(conn):
+            print(f"경고: 자주 실행되는 쿼리 '{name}'가 인덱스를 사용하지 않습니다. ({detail})")
+    finally:
+        conn.close()
 
 if __name__ == '__main__':
     setup_database()
-    print("Database 'game.db' with map system tables is ready.")
+    print(f"Database 'game.db' is ready. (schema version {SCHEMA_VERSION})")
@@ -0,0 +1,310 @@
+import asyncio
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+DB_PATH = 'game.db'
+
+# 연결마다 한 번만 적용되는 PRAGMA 설정
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",     # 읽기와 쓰기가 서로를 막지 않도록 WAL 모드 사용
+    "PRAGMA synchronous=NORMAL",   # WAL 모드에서는 NORMAL로도 충분히 안전합니다.
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",     # 연결당 약 8MB 페이지 캐시
+)
+
+class PoolStats:
+    """연결 체크아웃 대기 시간을 기록합니다. (피크 시간대 풀 크기 조정용)"""
+
+    def __init__(self, sample_size=1000):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=sample_size)
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            if wait > self.max_wait:
+                self.max_wait = wait
+            self._samples.append(wait)
+
+    def snapshot(self):
+        with self._lock:
+            samples = sorted(self._samples)
+            checkouts = self.checkouts
+            total_wait = self.total_wait
+            max_wait = self.max_wait
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0.0
+        return {
+            "checkouts": checkouts,
+            "avg_wait_ms": (total_wait / checkouts * 1000) if checkouts else 0.0,
+            "p95_wait_ms": p95 * 1000,
+            "max_wait_ms": max_wait * 1000,
+        }
+
+class ConnectionPool:
+    """연결을 열어 둔 채 재사용하는 크기 제한 SQLite 연결 풀"""
+
+    def __init__(self, db_path=DB_PATH, max_size=4, statement_cache_size=512, timeout=15):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self.timeout = timeout
+        self.stats = PoolStats()
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+
+    def connect(self):
+        """풀 설정(PRAGMA, 문장 캐시)을 적용한 새 연결을 엽니다. 풀에 넣지 않으므로 닫는 것은 호출한 쪽의 몫입니다."""
+        # 연결은 작업 스레드 사이를 오가므로 check_same_thread를 끕니다.
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False,
+                               cached_statements=self.statement_cache_size)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def acquire(self, requested_at=None):
+        """연결을 하나 빌려옵니다. requested_at부터 연결을 얻기까지의 대기 시간이 기록됩니다."""
+        if requested_at is None:
+            requested_at = time.perf_counter()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                if len(self._all) < self.max_size:
+                    conn = self.connect()
+                    self._all.append(conn)
+            if conn is None:
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    # 호출하는 쪽은 sqlite3.Error만 처리하므로 같은 계열의 예외로 바꿉니다.
+                    raise sqlite3.OperationalError("connection pool exhausted") from None
+        self.stats.record(time.perf_counter() - requested_at)
+        return conn
+
+    def release(self, conn):
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self, requested_at=None):
+        conn = self.acquire(requested_at)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def snapshot(self):
+        report = self.stats.snapshot()
+        with self._lock:
+            report["size"] = len(self._all)
+        report["max_size"] = self.max_size
+        report["idle"] = self._idle.qsize()
+        return report
+
+    def close_all(self):
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+        self._idle = queue.LifoQueue()
+
+class WriterStats:
+    """그룹 커밋 배치 크기를 기록합니다."""
+
+    def __init__(self):
+        self.batches = 0
+        self.writes = 0
+        self.failed = 0
+        self.max_batch = 0
+
+    def record(self, batch_size, failed):
+        self.batches += 1
+        self.writes += batch_size
+        self.failed += failed
+        if batch_size > self.max_batch:
+            self.max_batch = batch_size
+
+    def snapshot(self):
+        return {
+            "write_batches": self.batches,
+            "writes": self.writes,
+            "failed_writes": self.failed,
+            "avg_batch": (self.writes / self.batches) if self.batches else 0.0,
+            "max_batch": self.max_batch,
+        }
+
+class Database:
+    """SQL을 전용 스레드에서 실행하여 이벤트 루프를 막지 않는 비동기 DB 계층
+
+    읽기는 연결 풀에서 병렬로 실행되고, 쓰기는 모두 단일 작성자(writer) 작업으로 모입니다.
+    작성자는 몇 ms 동안 쌓인 쓰기를 하나의 트랜잭션으로 묶어 커밋(그룹 커밋)하므로
+    SQLite의 쓰기 잠금을 두고 여러 연결이 경쟁하지 않습니다.
+    """
+
+    def __init__(self, db_path=DB_PATH, pool_size=4, batch_window=0.003, max_batch=256):
+        self.db_path = db_path
+        self.pool = ConnectionPool(db_path, max_size=pool_size)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.writer_stats = WriterStats()
+        self._executor = None
+        self._write_executor = None
+        self._write_conn = None
+        self._write_queue = None
+        self._writer_task = None
+
+    async def start(self):
+        if self._executor is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self.pool.max_size, thread_name_prefix="db")
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._write_queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer_loop())
+
+    async def close(self):
+        if self._executor is None:
+            return
+        # 남은 쓰기를 모두 커밋한 뒤 작성자를 종료합니다.
+        await self._write_queue.put(None)
+        await self._writer_task
+        loop = asyncio.get_running_loop()
+        executor, self._executor = self._executor, None
+        write_executor, self._write_executor = self._write_executor, None
+        # 진행 중인 쿼리가 끝날 때까지 기다리되, 이벤트 루프는 막지 않습니다.
+        await loop.run_in_executor(None, executor.shutdown, True)
+        await loop.run_in_executor(None, write_executor.shutdown, True)
+        if self._write_conn is not None:
+            self._write_conn.close()
+            self._write_conn = None
+        self.pool.close_all()
+
+    # --- 읽기 (연결 풀) ---
+    def _run_read(self, func, args, requested_at):
+        with self.pool.connection(requested_at) as conn:
+            try:
+                return func(conn, *args)
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+
+    async def read(self, func, *args):
+        """읽기 전용 func(conn, *args)를 풀의 연결에서 실행하고 결과를 반환합니다."""
+        if self._executor is None:
+            raise RuntimeError("데이터베이스가 아직 시작되지 않았습니다.")
+        loop = asyncio.get_running_loop()
+        # 실행기 대기열에서 기다린 시간까지 체크아웃 대기 시간에 포함합니다.
+        requested_at = time.perf_counter()
+        return await loop.run_in_executor(self._executor, self._run_read, func, args, requested_at)
+
+    async def fetchone(self, sql, params=()):
+        return await self.read(lambda conn: conn.execute(sql, params).fetchone())
+
+    async def fetchall(self, sql, params=()):
+        return await self.read(lambda conn: conn.execute(sql, params).fetchall())
+
+    # --- 쓰기 (단일 작성자 + 그룹 커밋) ---
+    def _commit_batch(self, batch):
+        """배치 전체를 하나의 트랜잭션으로 실행합니다. 각 쓰기는 SAVEPOINT로 격리되어
+        하나가 실패해도 나머지는 커밋됩니다."""
+        if self._write_conn is None:
+            self._write_conn = self.pool.connect()
+            self._write_conn.isolation_level = None # 트랜잭션을 직접 관리합니다.
+        conn = self._write_conn
+        results = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for func, args, _ in batch:
+                conn.execute("SAVEPOINT write_unit")
+                try:
+                    value = func(conn, *args)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write_unit")
+                    conn.execute("RELEASE write_unit")
+                    results.append((False, e))
+                else:
+                    conn.execute("RELEASE write_unit")
+                    results.append((True, value))
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return results
+
+    async def _writer_loop(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._write_queue.get()
+            if item is None:
+                break
+            batch = [item]
+            if self._write_queue.empty():
+                # 잠시 기다려 동시에 들어오는 쓰기를 한 번에 커밋합니다.
+                await asyncio.sleep(self.batch_window)
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._write_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                results = await loop.run_in_executor(self._write_executor, self._commit_batch, batch)
+            except Exception as e:
+                print(f"그룹 커밋 실패 (쓰기 {len(batch)}건): {e}")
+                results = [(False, e)] * len(batch)
+
+            self.writer_stats.record(len(batch), sum(1 for ok, _ in results if not ok))
+            for (_, _, future), (ok, value) in zip(batch, results):
+                if future.done():
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    async def run(self, func, *args):
+        """쓰기 작업 func(conn, *args)를 작성자 큐에 넣고, 커밋된 뒤 그 결과를 반환합니다.
+
+        func가 예외를 던지면 해당 쓰기만 롤백되고 예외가 호출자에게 전달됩니다.
+        """
+        if self._write_queue is None:
+            raise RuntimeError("데이터베이스가 아직 시작되지 않았습니다.")
+        future = asyncio.get_running_loop().create_future()
+        await self._write_queue.put((func, args, future))
+        return await future
+
+    async def execute(self, sql, params=()):
+        """쓰기 쿼리를 실행하고 영향을 받은 행 수를 반환합니다."""
+        return await self.run(lambda conn: conn.execute(sql, params).rowcount)
+
+    async def executemany(self, sql, seq_of_params):
+        return await self.run(lambda conn: conn.executemany(sql, seq_of_params).rowcount)
+
+    async def execute_batch(self, statements):
+        """(sql, params) 목록을 하나의 트랜잭션으로 실행합니다."""
+        def _execute_all(conn):
+            for sql, params in statements:
+                conn.execute(sql, params)
+        if statements:
+            await self.run(_execute_all)
+
+    def stats(self):
+        report = self.pool.snapshot()
+        report.update(self.writer_stats.snapshot())
+        return report
@@ -0,0 +1,165 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+
+from combat import POISON_DAMAGE, POISON_TICK_INTERVAL
+
+# 한 틱에 처리된 모든 플레이어의 변경을 하나의 executemany로 반영합니다.
+_APPLY_EFFECTS_SQL = (
+    "UPDATE players SET "
+    "hp = MAX(1, hp - ?), "
+    "attack_buff_until = CASE WHEN ? THEN 0 ELSE attack_buff_until END, "
+    "status_effect = CASE WHEN ? THEN NULL ELSE status_effect END, "
+    "status_effect_end_time = CASE WHEN ? THEN 0 ELSE status_effect_end_time END, "
+    "status_effect_value = CASE WHEN ? THEN 0 ELSE status_effect_value END "
+    "WHERE user_id = ?"
+)
+_ACTIVE_EFFECTS_SQL = (
+    "SELECT user_id, attack_buff_until, status_effect, status_effect_end_time FROM players "
+    "WHERE attack_buff_until > 0 OR status_effect IS NOT NULL"
+)
+
+# 힙 항목 종류
+_BUFF_EXPIRE, _STATUS_EXPIRE, _STATUS_TICK = 'buff', 'status', 'tick'
+
+class EffectScheduler:
+    """버프/상태 이상의 만료와 지속 데미지를 한곳에서 처리하는 스케줄러
+
+    모든 활성 효과를 (시각, 종류) 힙에 넣어 두고, resolution 초 단위로 맞춘 시각에만 깨어나
+    그때까지 도래한 항목을 한꺼번에 처리합니다. 결과는 플레이어 캐시에 바로 반영하고,
+    DB에는 틱마다 한 번의 일괄 UPDATE로 저장합니다. 시작할 때 DB에서 활성 효과를 다시 읽어 옵니다.
+    """
+
+    def __init__(self, db, player_cache, resolution=1.0):
+        self.db = db
+        self.player_cache = player_cache
+        self.resolution = resolution
+        self._heap = []
+        self._seq = itertools.count()
+        self._buffs = {}    # user_id -> 버프 종료 시각
+        self._statuses = {} # user_id -> (상태 이상 이름, 종료 시각)
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.ticks = 0
+        self.fired = 0
+
+    async def start(self):
+        if self._task is not None:
+            return
+        rows = await self.db.fetchall(_ACTIVE_EFFECTS_SQL)
+        for row in rows:
+            self._track(row['user_id'], row['attack_buff_until'], row['status_effect'], row['status_effect_end_time'])
+        if rows:
+            print(f"활성 효과 {len(rows)}건을 불러왔습니다.")
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def track(self, player):
+        """플레이어 상태(PlayerState)의 버프/상태 이상을 스케줄에 등록합니다. 효과를 새로 건 뒤 호출합니다."""
+        self._track(player.user_id, player.attack_buff_until, player.status_effect, player.status_effect_end_time)
+        self._wakeup.set()
+
+    def _track(self, user_id, buff_until, status_effect, status_end_time):
+        # 등록표가 기준이므로, 효과가 사라졌거나 바뀌면 힙에 남은 예전 항목은 처리할 때 무시됩니다.
+        if buff_until:
+            if self._buffs.get(user_id) != buff_until:
+                self._buffs[user_id] = buff_until
+                self._push(buff_until, user_id, _BUFF_EXPIRE, buff_until)
+        else:
+            self._buffs.pop(user_id, None)
+
+        if status_effect:
+            status = (status_effect, status_end_time or 0)
+            if self._statuses.get(user_id) != status:
+                self._statuses[user_id] = status
+                self._push(status[1], user_id, _STATUS_EXPIRE, status)
+                if status_effect == 'poison':
+                    self._push(time.time() + POISON_TICK_INTERVAL, user_id, _STATUS_TICK, status)
+        else:
+            self._statuses.pop(user_id, None)
+
+    def _push(self, due, user_id, kind, token):
+        # token은 항목을 만든 시점의 효과 값입니다. 등록표의 값과 다르면 이미 바뀐 효과입니다.
+        heapq.heappush(self._heap, (due, next(self._seq), user_id, kind, token))
+
+    def stats(self):
+        return {
+            "buffs": len(self._buffs),
+            "statuses": len(self._statuses),
+            "heap": len(self._heap),
+            "ticks": self.ticks,
+            "fired": self.fired,
+        }
+
+    async def _run(self):
+        while True:
+            timeout = None
+            if self._heap:
+                # 깨어나는 시각을 resolution 단위로 맞춰 가까운 항목들을 한 번에 처리합니다.
+                wake_at = math.ceil(self._heap[0][0] / self.resolution) * self.resolution
+                timeout = max(0.0, wake_at - time.time())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self._fire_due()
+            except Exception as e:
+                print(f"효과 스케줄러 처리 중 오류: {e}")
+
+    def _collect_due(self, now):
+        # user_id -> [독 데미지, 버프 해제 여부, 상태 이상 해제 여부]
+        deltas = {}
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            due, _, user_id, kind, token = heapq.heappop(heap)
+            if kind == _BUFF_EXPIRE:
+                if self._buffs.get(user_id) != token:
+                    continue
+                del self._buffs[user_id]
+                deltas.setdefault(user_id, [0, False, False])[1] = True
+            elif self._statuses.get(user_id) != token:
+                continue
+            elif kind == _STATUS_EXPIRE:
+                del self._statuses[user_id]
+                deltas.setdefault(user_id, [0, False, False])[2] = True
+            elif due < token[1]:
+                deltas.setdefault(user_id, [0, False, False])[0] += POISON_DAMAGE
+                self._push(due + POISON_TICK_INTERVAL, user_id, _STATUS_TICK, token)
+        return deltas
+
+    async def _fire_due(self):
+        deltas = self._collect_due(time.time())
+        if not deltas:
+            return
+        self.ticks += 1
+        self.fired += len(deltas)
+
+        params = []
+        for user_id, (damage, clear_buff, clear_status) in deltas.items():
+            params.append((damage, clear_buff, clear_status, clear_status, clear_status, user_id))
+            # 캐시에 올라간 플레이어는 메모리에도 같은 변경을 적용합니다. DB는 아래 UPDATE로 반영됩니다.
+            changes = {}
+            state = self.player_cache.peek(user_id)
+            if state is None:
+                continue
+            if damage:
+                changes['hp'] = max(1, state.hp - damage)
+            if clear_buff:
+                changes['attack_buff_until'] = 0
+            if clear_status:
+                changes.update(status_effect=None, status_effect_end_time=0, status_effect_value=0)
+            self.player_cache.apply_persisted(state, **changes)
+
+        await self.db.executemany(_APPLY_EFFECTS_SQL, params)
@@ -4,39 +4,53 @@ from discord import app_commands
 import random
 import asyncio
 import sqlite3
-import json
 from typing import List
-from item_manager import ItemManager # ItemManager 임포트
+from database import (SQL_INVENTORY_HAS_ITEM, SQL_INVENTORY_QUANTITY, SQL_INVENTORY_TOOL, SQL_INVENTORY_ITEM_IDS,
+                      SQL_INVENTORY_LIST)
+from hangul_search import HangulIndex
+from inventory_view import CATEGORIES, SORTS, InventoryPageCache, InventoryView
+from loot import LootTable
+from battle import BattleSession
+from inventory import GrantResult, grant_items, grant_items_bulk, held_quantities, resolve_items, stack_space
+from recipes import craft_planned, CraftInterrupted
+from player_locks import PlayerBusyError
 import time # time 모듈 임포트
 
+def _overflow_note(overflow: dict) -> str:
+    """보관 한도 때문에 받지 못한 아이템 안내 문구. 없으면 빈 문자열"""
+    if not overflow:
+        return ""
+    return "\n(가방이 가득 차 받지 못함: " + ", ".join(f"{name} {quantity}개" for name, quantity in overflow.items()) + ")"
+
+def _autocomplete_choices(index: HangulIndex, current: str):
+    """검색 색인에서 입력값(부분 글자, 초성 포함)과 일치하는 이름을 최대 25개까지 선택지로 만듭니다."""
+    return [app_commands.Choice(name=name, value=name) for name in index.search(current)]
+
 # 순환 참조 방지를 위한 타입 힌트
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
-    from main import get_db_connection, update_game_status
+    from main import update_game_status
 
-# --- 몬스터 데이터 ---
-MONSTERS = {
-    "슬라임": {"hp": 20, "attack": 5, "gold": 2, "exp": 3, "drops": {"기초 회복 물약": 0.3, "생고기": 0.5}},
-    "고블린": {"hp": 35, "attack": 8, "gold": 5, "exp": 7, "drops": {"기초 회복 물약": 0.2, "독 물약": 0.1}},
-    "오크": {"hp": 50, "attack": 12, "gold": 10, "exp": 12, "drops": {"공격력 강화 물약": 0.1, "생고기": 0.7}},
-    "늑대": {"hp": 25, "attack": 7, "gold": 3, "exp": 5, "drops": {"생고기": 0.8}},
-    "거미": {"hp": 15, "attack": 4, "gold": 1, "exp": 2, "drops": {"독 물약": 0.05}}
-}
+BUSY_MESSAGE = "이미 다른 행동을 하고 있습니다."
+QUEUE_FULL_MESSAGE = "처리 중인 요청이 많습니다. 잠시 후 다시 시도해주세요."
+
+# 탐험 중 전투가 없을 때 발견하는 아이템
+EXPLORE_LOOT = LootTable.independent({"기초 회복 물약": 0.2})
 
 # --- 전투 UI ---
 class BattleView(discord.ui.View):
-    def __init__(self, bot, player_id, monster_name, game_cog_instance):
+    def __init__(self, bot, session: BattleSession, game_cog_instance):
         super().__init__(timeout=60)
         self.bot = bot
-        self.player_id = player_id
-        self.monster_name = monster_name
-        self.monster = MONSTERS[monster_name].copy()
+        self.session = session
+        self.player_id = session.player_id
+        self.monster_name = session.monster.name
         self.game_cog = game_cog_instance
         self.battle_message: discord.Message = None # 나중에 설정될 메시지 객체
         
 
     async def on_timeout(self):
-        self.game_cog.active_users.discard(self.player_id)
+        self.bot.player_locks.end_activity(self.player_id)
         # 타임아웃 시 버튼 비활성화
         for item in self.children:
             item.disabled = True
@@ -49,7 +63,7 @@ class BattleView(discord.ui.View):
         return True
 
     async def handle_battle_end(self):
-        self.game_cog.active_users.discard(self.player_id)
+        self.bot.player_locks.end_activity(self.player_id)
         # 전투 종료 시 버튼 비활성화
         for item in self.children:
             item.disabled = True
@@ -60,101 +74,37 @@ class BattleView(discord.ui.View):
     async def attack(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer()
 
-        from main import get_db_connection
-        conn = get_db_connection()
-        c = conn.cursor()
-
-        c.execute("SELECT * FROM players WHERE user_id = ?", (self.player_id,))
-        player_data = c.fetchone()
-
-        if not player_data:
-            await self.battle_message.edit(content="오류: 플레이어 정보를 찾을 수 없습니다.", view=None)
-            await self.handle_battle_end()
-            conn.close()
-            return
-
-        player_hp = player_data['hp']
-        attack_buff_until = player_data['attack_buff_until']
-
-        # --- 플레이어 공격 ---
-        player_attack = random.randint(5, 15)
-        weapon_name = "돌 칼" # 지금은 돌 칼만 사용
-        durability_message = ""
-        if attack_buff_until and time.time() < attack_buff_until:
-            player_attack += 10 # 예시: 버프 시 공격력 10 증가
-
-        if await self.game_cog._has_item(self.player_id, weapon_name):
-            weapon_info = self.game_cog.item_manager.get_item_by_name(weapon_name)
-            if weapon_info and weapon_info.effect_type == 'attack_boost':
-                player_attack += weapon_info.effect_value
-
-            success, durability_message = await self.game_cog._use_tool(self.player_id, weapon_name)
-            if not success:
-                durability_message = f"\n({weapon_name} 내구도 처리 중 오류 발생)"
-
-        battle_log = f"⚔️ {player_data['nickname']}이(가) {self.monster_name}에게 {player_attack}의 데미지를 입혔습니다.\n   (몬스터 남은 HP: {self.monster['hp'] - player_attack})\n"
-        if durability_message:
-            battle_log += durability_message + "\n"
-
-        self.monster['hp'] -= player_attack
-
-        # 플레이어 상태 이상 적용 (독)
-        if player_data['status_effect'] == 'poison' and time.time() < player_data['status_effect_end_time']:
-            poison_damage = 5 # 예시: 독 데미지
-            new_hp = player_hp - poison_damage
-            c.execute("UPDATE players SET hp = ? WHERE user_id = ?", (new_hp, self.player_id))
-            battle_log += f"💀 {player_data['nickname']}이(가) 독으로 인해 {poison_damage}의 데미지를 입었습니다. (남은 HP: {new_hp})\n"
-            player_hp = new_hp # 업데이트된 HP 반영
-
-        # 상태 이상 종료 확인 및 제거
-        if player_data['status_effect'] and time.time() >= player_data['status_effect_end_time']:
-            c.execute("UPDATE players SET status_effect = NULL, status_effect_end_time = 0, status_effect_value = 0 WHERE user_id = ?", (self.player_id,))
-            battle_log += f"✨ {player_data['nickname']}의 {player_data['status_effect']} 상태 이상이 해제되었습니다.\n"
-
-        # --- 몬스터 사망 처리 ---
-        if self.monster['hp'] <= 0:
-            gold_reward = self.monster['gold']
-            exp_reward = self.monster['exp']
-            c.execute("UPDATE players SET gold = gold + ?, exp = exp + ? WHERE user_id = ?", (gold_reward, exp_reward, self.player_id))
-            battle_log += f"\n🎉 {self.monster_name}을(를) 물리쳤습니다!\n   골드 +{gold_reward}, 경험치 +{exp_reward}을 획득했습니다."
-
-            if "drops" in MONSTERS[self.monster_name]:
-                for item_name, drop_rate in MONSTERS[self.monster_name]["drops"].items():
-                    if random.random() < drop_rate:
-                        await self.game_cog.add_item_to_inventory(self.player_id, item_name)
-                        battle_log += f"\n   ✨ {item_name}을(를) 획득했습니다!"
-
-            await self.battle_message.edit(content=battle_log, view=None)
-            await self.handle_battle_end()
-            conn.commit()
-            conn.close()
-            return
-
-        # --- 몬스터 반격 ---
-        monster_attack = self.monster['attack']
-        c.execute("UPDATE players SET hp = hp - ? WHERE user_id = ?", (monster_attack, self.player_id))
-        c.execute("SELECT hp FROM players WHERE user_id = ?", (self.player_id,))
-        new_hp = c.fetchone()['hp']
-
-        battle_log += f"\n🩸 {self.monster_name}이(가) {player_data['nickname']}에게 {monster_attack}의 데미지를 입혔습니다.\n   (남은 HP: {new_hp})"
-
-        # --- 플레이어 사망 처리 ---
-        if new_hp <= 0:
-            c.execute("UPDATE players SET hp = 1 WHERE user_id = ?", (self.player_id,))
-            battle_log += f"\n\n☠️ 전투에서 패배했습니다..."
-            await self.battle_message.edit(content=battle_log, view=None)
-            await self.handle_battle_end()
-        else:
-            await self.battle_message.edit(content=battle_log)
-
-        conn.commit()
-        conn.close()
+        try:
+            # 연타한 공격은 차례대로 처리되고, 앞선 턴에서 전투가 끝났으면 무시됩니다.
+            async with self.bot.player_locks.hold(self.player_id):
+                if self.is_finished():
+                    return
+                # 턴 계산은 메모리에서 하고, 인벤토리 변경(내구도, 드롭)은 한 번의 트랜잭션으로 저장합니다.
+                battle_log, finished = self.session.play_turn()
+                if await self.session.commit(self.bot):
+                    # 내구도/획득 문구는 저장에 성공한 경우에만 보여줍니다.
+                    self.game_cog._inventory_changed(self.player_id)
+                    battle_log += self.session.notes + _overflow_note(self.session.overflow)
+
+                if finished:
+                    await self.battle_message.edit(content=battle_log, view=None)
+                    await self.handle_battle_end()
+                else:
+                    await self.battle_message.edit(content=battle_log)
+        except PlayerBusyError:
+            pass # 이미 대기 중인 공격이 충분히 많습니다.
 
     @discord.ui.button(label="도망", style=discord.ButtonStyle.secondary)
     async def flee(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer() # 상호작용 응답
-        await self.battle_message.edit(content="무사히 도망쳤습니다.", view=None) # 메시지 업데이트 및 버튼 제거
-        await self.handle_battle_end()
+        try:
+            async with self.bot.player_locks.hold(self.player_id):
+                if self.is_finished():
+                    return
+                await self.battle_message.edit(content="무사히 도망쳤습니다.", view=None) # 메시지 업데이트 및 버튼 제거
+                await self.handle_battle_end()
+        except PlayerBusyError:
+            pass
 
 # --- 게임 명령어 Cog ---
 class GameCog(commands.Cog):
@@ -162,14 +112,10 @@ class GameCog(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.active_users = set()
-        self.item_manager = ItemManager() # ItemManager 인스턴스 생성
-        self.item_manager.load_items_from_db() # 아이템 데이터 로드
-        self.recipes = {
-            "낡은 낚싯대": {"나뭇가지": 5, "질긴 나뭇잎": 2},
-            "튼튼한 낚싯대": {"나뭇가지": 10, "질긴 나뭇잎": 5},
-            "돌 칼": {"나뭇가지": 2, "돌멩이": 5}
-        }
+        self._inventory_indexes = {} # user_id -> (보유 아이템 id 목록, 카탈로그, 검색 색인). 인벤토리가 바뀌면 비웁니다.
+        self._inventory_versions = {} # user_id -> 인벤토리 버전. 인벤토리를 쓸 때마다 1씩 올라갑니다.
+        self.inventory_pages = InventoryPageCache()
+        self.item_manager = bot.item_manager # 카탈로그는 setup_hook에서 불러옵니다.
 
     async def _check_game_channel_and_role(self, interaction: discord.Interaction) -> bool:
         """게임 채널 및 역할 권한을 확인하는 내부 헬퍼 함수"""
@@ -189,67 +135,77 @@ class GameCog(commands.Cog):
             return False
         return True
 
-    async def _has_item(self, user_id: int, item_name: str) -> bool:
+    def _inventory_changed(self, user_id: int):
+        """인벤토리를 변경한 뒤 호출하여 자동완성용 보유 아이템 목록과 인벤토리 페이지 캐시를 무효화합니다."""
+        self._inventory_indexes.pop(user_id, None)
+        self._inventory_versions[user_id] = self._inventory_versions.get(user_id, 0) + 1
+
+    async def _inventory_pages(self, user_id: int, category: str, sort: str):
+        """인벤토리 페이지 임베드 목록. 인벤토리 버전과 카탈로그가 그대로면 DB 조회와 렌더링을 건너뜁니다."""
+        cache = self.inventory_pages
+        catalog = self.item_manager.catalog
+        # 조회 전에 버전을 읽어 두므로, 조회 도중 인벤토리가 바뀌면 다음 요청에서 다시 읽습니다.
+        version = self._inventory_versions.get(user_id, 0)
+        if cache.rows(user_id, version, catalog) is None:
+            rows = await self.bot.db.fetchall(SQL_INVENTORY_LIST, (user_id,))
+            cache.store(user_id, version, catalog, tuple(rows))
+        return cache.pages(user_id, category, sort)
+
+    async def _inventory_index(self, user_id: int) -> HangulIndex:
+        catalog = self.item_manager.catalog
+        cached = self._inventory_indexes.get(user_id)
+        if cached is not None and cached[1] is catalog:
+            return cached[2]
+        if cached is not None:
+            item_ids = cached[0]
+        else:
+            rows = await self.bot.db.fetchall(SQL_INVENTORY_ITEM_IDS, (user_id,))
+            item_ids = tuple(row['item_id'] for row in rows)
+        # 아이템 새로고침으로 카탈로그가 바뀌면 이름만 새 카탈로그 기준으로 다시 색인합니다.
+        index = HangulIndex(item.name for item in map(catalog.get_item, item_ids) if item)
+        self._inventory_indexes[user_id] = (item_ids, catalog, index)
+        return index
+
+    async def _has_item(self, user_id: int, item_name: str, catalog=None) -> bool:
         """플레이어의 인벤토리에 특정 아이템이 있는지 확인하는 헬퍼 함수"""
-        from main import get_db_connection
-        conn = get_db_connection()
-        c = conn.cursor()
-        c.execute("""
-            SELECT 1 FROM player_inventory pi
-            JOIN items i ON pi.item_id = i.id
-            WHERE pi.user_id = ? AND i.name = ? AND pi.quantity > 0
-        """, (user_id, item_name))
-        result = c.fetchone()
-        conn.close()
+        item = (catalog or self.item_manager.catalog).get_item_by_name(item_name)
+        if not item:
+            return False
+        result = await self.bot.db.fetchone(SQL_INVENTORY_HAS_ITEM, (user_id, item.id))
         return result is not None
 
-    async def add_item_to_inventory(self, user_id: int, item_name: str, quantity: int = 1):
-        from main import get_db_connection
-        conn = get_db_connection()
-        c = conn.cursor()
+    async def grant_items(self, user_id: int, items: dict, catalog=None) -> GrantResult:
+        """{아이템 이름: 수량}을 한 번의 쓰기로 지급합니다. 실제로 받은 수량과 넘친 수량을 반환합니다."""
+        grants = resolve_items(catalog or self.item_manager.catalog, items)
+        if not grants:
+            return GrantResult({}, {})
+        try:
+            return await self.bot.db.run(grant_items, user_id, grants)
+        finally:
+            self._inventory_changed(user_id)
 
-        item = self.item_manager.get_item_by_name(item_name)
-        if not item:
-            conn.close()
-            return False # 아이템을 찾을 수 없음
-
-        c.execute("SELECT quantity FROM player_inventory WHERE user_id = ? AND item_id = ?", (user_id, item.id))
-        existing_item = c.fetchone()
-
-        if existing_item and item.stackable:
-            new_quantity = existing_item['quantity'] + quantity
-            if new_quantity > item.max_stack:
-                new_quantity = item.max_stack
-            c.execute("UPDATE player_inventory SET quantity = ? WHERE user_id = ? AND item_id = ?", (new_quantity, user_id, item.id))
-        elif not existing_item:
-            durability = item.max_durability if item.max_durability is not None else None
-            c.execute("INSERT INTO player_inventory (user_id, item_id, quantity, durability) VALUES (?, ?, ?, ?)", (user_id, item.id, quantity, durability))
-        else: # 아이템이 존재하지만, 스택 불가능한 아이템일 경우
-            pass
+    async def grant_items_bulk(self, grants: dict, catalog=None) -> dict:
+        """{user_id: {아이템 이름: 수량}}을 모든 플레이어에 대해 한 번의 쓰기로 지급합니다. {user_id: GrantResult}를 반환합니다."""
+        catalog = catalog or self.item_manager.catalog
+        resolved = {user_id: resolve_items(catalog, items) for user_id, items in grants.items()}
+        try:
+            return await self.bot.db.run(grant_items_bulk, resolved)
+        finally:
+            for user_id in resolved:
+                self._inventory_changed(user_id)
 
-        conn.commit()
-        conn.close()
-        return True
+    async def _use_tool(self, user_id: int, tool_name: str, catalog=None):
+        tool = (catalog or self.item_manager.catalog).get_item_by_name(tool_name)
+        if not tool:
+            return False, f"오류: 인벤토리에서 {tool_name}을(를) 찾을 수 없습니다."
+        item_id = tool.id
 
-    async def _use_tool(self, user_id: int, tool_name: str):
-        conn = None
-        try:
-            from main import get_db_connection
-            conn = get_db_connection()
-            c = conn.cursor()
-
-            c.execute("""
-                SELECT i.id, pi.durability, i.max_durability 
-                FROM player_inventory pi 
-                JOIN items i ON pi.item_id = i.id 
-                WHERE pi.user_id = ? AND i.name = ?
-            """, (user_id, tool_name))
-            item_info = c.fetchone()
+        def use_tool(conn):
+            item_info = conn.execute(SQL_INVENTORY_TOOL, (user_id, item_id)).fetchone()
 
             if not item_info:
                 return False, f"오류: 인벤토리에서 {tool_name}을(를) 찾을 수 없습니다."
 
-            item_id = item_info['id']
             current_durability = item_info['durability']
             max_durability = item_info['max_durability']
 
@@ -261,151 +217,146 @@ class GameCog(commands.Cog):
 
             new_durability = current_durability - 1
             
-            message = ""
             if new_durability > 0:
-                c.execute("UPDATE player_inventory SET durability = ? WHERE user_id = ? AND item_id = ?", 
-                          (new_durability, user_id, item_id))
-                message = f"({tool_name}의 내구도가 1 감소했습니다.)"
-            else:
-                c.execute("DELETE FROM player_inventory WHERE user_id = ? AND item_id = ?", 
-                          (user_id, item_id))
-                message = f"**{tool_name}이(가) 모두 사용되어 부서졌습니다!**"
-            
-            conn.commit()
-            return True, message
+                conn.execute("UPDATE player_inventory SET durability = ? WHERE user_id = ? AND item_id = ?", 
+                             (new_durability, user_id, item_id))
+                return True, f"({tool_name}의 내구도가 1 감소했습니다.)"
+            conn.execute("DELETE FROM player_inventory WHERE user_id = ? AND item_id = ?", 
+                         (user_id, item_id))
+            return True, f"**{tool_name}이(가) 모두 사용되어 부서졌습니다!**"
 
+        try:
+            return await self.bot.db.run(use_tool)
         except sqlite3.Error as e:
-            if conn: conn.rollback()
             print(f"DB Error in _use_tool (User: {user_id}, Tool: {tool_name}): {e}")
             return False, "데이터베이스 오류로 도구를 사용할 수 없습니다."
         finally:
-            if conn: conn.close()
+            self._inventory_changed(user_id)
 
     # --- Autocompletes ---
     async def move_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-        from main import get_db_connection
-        conn = get_db_connection()
-        c = conn.cursor()
-        c.execute("SELECT l.name FROM map_connections mc JOIN locations l ON mc.to_location_id = l.id WHERE mc.from_location_id = (SELECT current_location_id FROM players WHERE user_id = ?)", (interaction.user.id,))
-        destinations = [row['name'] for row in c.fetchall()]
-        conn.close()
-        return [app_commands.Choice(name=dest, value=dest) for dest in destinations if current.lower() in dest.lower()]
+        player = await self.bot.player_cache.get(interaction.user.id)
+        if not player:
+            return []
+        return _autocomplete_choices(self.bot.world_map.destination_index(player.current_location_id), current)
+
+    async def travel_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        player = await self.bot.player_cache.get(interaction.user.id)
+        if not player:
+            return []
+        return _autocomplete_choices(self.bot.world_map.travel_index(player.current_location_id), current)
 
     async def action_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-        from main import get_db_connection
-        conn = get_db_connection()
-        c = conn.cursor()
-        c.execute("SELECT l.actions FROM players p JOIN locations l ON p.current_location_id = l.id WHERE p.user_id = ?", (interaction.user.id,))
-        actions_json = c.fetchone()['actions']
-        conn.close()
-        
-        if actions_json:
-            actions = json.loads(actions_json)
-            return [app_commands.Choice(name=action, value=action) for action in actions if current.lower() in action.lower()]
-        return []
+        player = await self.bot.player_cache.get(interaction.user.id)
+        if not player:
+            return []
+        return _autocomplete_choices(self.bot.world_map.action_index(player.current_location_id), current)
 
     async def item_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-        from main import get_db_connection
-        conn = get_db_connection()
-        c = conn.cursor()
-        c.execute("SELECT i.name FROM player_inventory pi JOIN items i ON pi.item_id = i.id WHERE pi.user_id = ?", (interaction.user.id,))
-        player_items = [row['name'] for row in c.fetchall()]
-        conn.close()
-        return [app_commands.Choice(name=item_name, value=item_name) for item_name in player_items if current.lower() in item_name.lower()]
+        return _autocomplete_choices(await self._inventory_index(interaction.user.id), current)
 
     async def craft_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-        return [app_commands.Choice(name=recipe, value=recipe) for recipe in self.recipes if current.lower() in recipe.lower()]
+        return _autocomplete_choices(self.bot.recipes.index, current)
 
     # --- Commands ---
-    @game_group.command(name="제작", description="재료를 사용하여 아이템을 제작합니다.")
+    @game_group.command(name="제작", description="재료를 사용하여 아이템을 제작합니다. 필요한 중간 재료도 함께 만듭니다.")
+    @app_commands.describe(item_name="제작할 아이템", quantity="제작할 개수 (재료가 부족하면 가능한 만큼만 제작합니다)")
     @app_commands.autocomplete(item_name=craft_autocomplete)
-    async def craft(self, interaction: discord.Interaction, item_name: str):
+    async def craft(self, interaction: discord.Interaction, item_name: str, quantity: app_commands.Range[int, 1, 99] = 1):
         if not await self._check_game_channel_and_role(interaction): return
-        if interaction.user.id in self.active_users:
-            return await interaction.response.send_message("이미 다른 행동을 하고 있습니다.", ephemeral=True)
+        if self.bot.player_locks.activity(interaction.user.id):
+            return await interaction.response.send_message(BUSY_MESSAGE, ephemeral=True)
 
         await interaction.response.defer(ephemeral=True)
 
-        if item_name not in self.recipes:
+        recipes = self.bot.recipes
+        if item_name not in recipes:
             return await interaction.followup.send("제작할 수 없는 아이템입니다.")
 
-        recipe = self.recipes[item_name]
-        
-        from main import get_db_connection
-        conn = None
+        user_id = interaction.user.id
+        # 보유 수량 확인, 계획, 모든 단계의 재료 소모와 완성품 추가가 개수와 상관없이 한 번의 트랜잭션입니다.
         try:
-            conn = get_db_connection()
-            c = conn.cursor()
-
-            for material, required_amount in recipe.items():
-                c.execute("SELECT pi.quantity FROM player_inventory pi JOIN items i ON pi.item_id = i.id WHERE pi.user_id = ? AND i.name = ?", (interaction.user.id, material))
-                result = c.fetchone()
-                if not result or result['quantity'] < required_amount:
-                    await interaction.followup.send(f"재료가 부족합니다: {material} {required_amount}개 필요")
-                    return
-            
-            for material, required_amount in recipe.items():
-                c.execute("UPDATE player_inventory SET quantity = quantity - ? WHERE user_id = ? AND item_id = (SELECT id FROM items WHERE name = ?)", (required_amount, interaction.user.id, material))
-
-            item_to_add = self.item_manager.get_item_by_name(item_name)
-            if not item_to_add:
-                await interaction.followup.send("제작하려는 아이템 정보를 찾을 수 없습니다.")
-                conn.rollback()
-                return
-
-            c.execute("SELECT quantity FROM player_inventory WHERE user_id = ? AND item_id = ?", (interaction.user.id, item_to_add.id))
-            existing_item = c.fetchone()
-            if existing_item:
-                c.execute("UPDATE player_inventory SET quantity = quantity + 1 WHERE user_id = ? AND item_id = ?", (interaction.user.id, item_to_add.id))
-            else:
-                c.execute("INSERT INTO player_inventory (user_id, item_id, quantity) VALUES (?, ?, 1)", (interaction.user.id, item_to_add.id))
-
-            conn.commit()
-            await interaction.followup.send(f"축하합니다! {item_name}을(를) 제작했습니다.", ephemeral=False)
-
+            async with self.bot.player_locks.hold(user_id):
+                plan, crafted = await self.bot.db.run(
+                    craft_planned, user_id, recipes, self.item_manager.catalog, item_name, quantity)
+        except PlayerBusyError:
+            return await interaction.followup.send(QUEUE_FULL_MESSAGE)
+        except KeyError:
+            return await interaction.followup.send("제작 재료 정보를 찾을 수 없습니다.")
+        except CraftInterrupted as e:
+            return await interaction.followup.send(f"{e}을(를) 더 이상 가질 수 없어 제작을 취소했습니다.")
         except sqlite3.Error as e:
             print(f"/제작 명령어 처리 중 데이터베이스 오류 발생: {e}")
-            if conn:
-                conn.rollback()
-            await interaction.followup.send("제작 중 오류가 발생했습니다. 다시 시도해주세요.")
+            return await interaction.followup.send("제작 중 오류가 발생했습니다. 다시 시도해주세요.")
         finally:
-            if conn:
-                conn.close()
+            self._inventory_changed(user_id)
+
+        if not crafted:
+            if plan.shortages:
+                shortages = ", ".join(f"{material} {amount}개" for material, amount in plan.shortages.items())
+                return await interaction.followup.send(f"재료가 부족합니다: {shortages} 더 필요")
+            return await interaction.followup.send(f"{item_name}을(를) 더 이상 가질 수 없습니다.")
+
+        message = f"축하합니다! {item_name}을(를) {crafted}개 제작했습니다."
+        intermediates = [f"{step} {count}개" for step, count in plan.steps if step != item_name]
+        if intermediates:
+            message += f"\n(중간 재료 제작: {', '.join(intermediates)})"
+        if crafted < quantity:
+            message += f"\n(요청한 {quantity}개 중 재료와 보관 한도가 허락하는 만큼만 제작했습니다.)"
+        await interaction.followup.send(message, ephemeral=False)
+
+    @game_group.command(name="레시피", description="아이템의 재료 트리와 지금 인벤토리로 만들 수 있는 개수를 봅니다.")
+    @app_commands.describe(item_name="확인할 아이템")
+    @app_commands.autocomplete(item_name=craft_autocomplete)
+    async def recipe(self, interaction: discord.Interaction, item_name: str):
+        if not await self._check_game_channel_and_role(interaction): return
+        await interaction.response.defer(ephemeral=True)
+
+        recipes = self.bot.recipes
+        if item_name not in recipes:
+            return await interaction.followup.send("제작할 수 없는 아이템입니다.")
+
+        catalog = self.item_manager.catalog
+        nodes = [(node, item) for node in recipes.order(item_name) if (item := catalog.get_item_by_name(node))]
+        # 제작할 때와 같은 보유 수량 쿼리(HOT_QUERIES의 inventory_quantities)를 사용합니다.
+        quantities = await self.bot.db.read(held_quantities, interaction.user.id, [item.id for _, item in nodes])
+        held = {node: quantities[item.id] for node, item in nodes}
+
+        tree = "\n".join(f"{'　' * depth}{'└ ' if depth else ''}{name} ×{amount} (보유 {held.get(name, 0)})"
+                         for depth, name, amount in recipes.tree(item_name))
+        raw = ", ".join(f"{name} {amount}" for name, amount in recipes.raw_materials(item_name).items())
+
+        embed = discord.Embed(title=f"🛠️ {item_name} 레시피", color=discord.Color.orange())
+        embed.add_field(name="재료 트리", value=tree, inline=False)
+        embed.add_field(name="기초 재료 합계", value=raw, inline=False)
+        plan = recipes.plan(item_name, 1, held)
+        product = catalog.get_item_by_name(item_name)
+        limit = stack_space(product, held.get(item_name, 0)) if product else 0
+        craftable = recipes.max_craftable(item_name, held, limit)
+        if craftable:
+            steps = " → ".join(f"{step} {count}개" for step, count in plan.steps)
+            value = f"{craftable}개\n1개 제작 순서: {steps}"
+        elif plan.shortages:
+            value = "0개 (부족: " + ", ".join(f"{name} {amount}개" for name, amount in plan.shortages.items()) + ")"
+        else:
+            value = "0개 (더 이상 가질 수 없습니다)"
+        embed.add_field(name="지금 만들 수 있는 개수", value=value, inline=False)
+        await interaction.followup.send(embed=embed)
 
     @game_group.command(name="인벤토리", description="현재 가지고 있는 아이템을 확인합니다.")
-    async def inventory(self, interaction: discord.Interaction):
+    @app_commands.describe(category="보여줄 아이템 분류", sort="정렬 방식")
+    @app_commands.choices(
+        category=[app_commands.Choice(name=label, value=value) for value, (label, _) in CATEGORIES.items()],
+        sort=[app_commands.Choice(name=label, value=value) for value, (label, _) in SORTS.items()],
+    )
+    async def inventory(self, interaction: discord.Interaction, category: str = "all", sort: str = "name"):
         if not await self._check_game_channel_and_role(interaction): return
         await interaction.response.defer(ephemeral=True)
-        
-        from main import get_db_connection
-        conn = get_db_connection()
-        c = conn.cursor()
-        c.execute("""
-            SELECT i.name, pi.quantity, pi.durability, i.max_durability 
-            FROM player_inventory pi 
-            JOIN items i ON pi.item_id = i.id 
-            WHERE pi.user_id = ?
-        """, (interaction.user.id,))
-        items = c.fetchall()
-        conn.close()
-
-        if not items:
-            return await interaction.followup.send("인벤토리가 비어있습니다.")
-
-        embed = discord.Embed(title="🎒 인벤토리", color=discord.Color.blue())
-        for item in items:
-            item_name = item['name']
-            quantity = item['quantity']
-            durability = item['durability']
-            max_durability = item['max_durability']
-
-            value = f"수량: {quantity}"
-            if durability is not None and max_durability is not None:
-                value += f" | 내구도: {durability}/{max_durability}"
-
-            embed.add_field(name=item_name, value=value, inline=True)
-        
-        await interaction.followup.send(embed=embed)
+
+        user_id = interaction.user.id
+        pages = await self._inventory_pages(user_id, category, sort)
+        view = InventoryView(user_id, lambda category, sort: self._inventory_pages(user_id, category, sort), category, sort, pages)
+        await interaction.followup.send(embed=pages[0], view=view)
 
     @game_group.command(name="직업선택", description="직업을 선택합니다. 한 번 선택하면 변경할 수 없습니다.")
     @app_commands.describe(job_name="선택할 직업의 이름 (검사, 마법사)")
@@ -417,24 +368,20 @@ class GameCog(commands.Cog):
         if not await self._check_game_channel_and_role(interaction): return
         await interaction.response.defer(ephemeral=True)
 
-        from main import get_db_connection
-        conn = get_db_connection()
-        c = conn.cursor()
-
-        c.execute("SELECT job FROM players WHERE user_id = ?", (interaction.user.id,))
-        current_job = c.fetchone()['job']
+        try:
+            async with self.bot.player_locks.hold(interaction.user.id):
+                player = await self.bot.player_cache.get(interaction.user.id)
+                current_job = player.job
 
-        if current_job != '초보자':
-            conn.close()
-            return await interaction.followup.send(f"이미 직업을 선택했습니다: {current_job}")
+                if current_job != '초보자':
+                    return await interaction.followup.send(f"이미 직업을 선택했습니다: {current_job}")
 
-        if job_name not in ["검사", "마법사"]:
-            conn.close()
-            return await interaction.followup.send("유효하지 않은 직업 이름입니다. '검사' 또는 '마법사' 중에서 선택해주세요.")
+                if job_name not in ["검사", "마법사"]:
+                    return await interaction.followup.send("유효하지 않은 직업 이름입니다. '검사' 또는 '마법사' 중에서 선택해주세요.")
 
-        c.execute("UPDATE players SET job = ?, skp = 1 WHERE user_id = ?", (job_name, interaction.user.id))
-        conn.commit()
-        conn.close()
+                self.bot.player_cache.update(player, job=job_name, skp=1)
+        except PlayerBusyError:
+            return await interaction.followup.send(QUEUE_FULL_MESSAGE)
 
         await interaction.followup.send(f"축하합니다! 당신은 이제 {job_name}이(가) 되었습니다. 스킬 포인트 1을 획득했습니다.", ephemeral=False)
 
@@ -444,63 +391,78 @@ class GameCog(commands.Cog):
         if not await self._check_game_channel_and_role(interaction): return
         await interaction.response.defer(ephemeral=False)
 
-        from main import get_db_connection
-        conn = get_db_connection()
-        c = conn.cursor()
+        # 같은 플레이어의 아이템 사용은 한 번에 하나씩 처리하여 같은 아이템을 두 번 소모하지 않게 합니다.
+        try:
+            async with self.bot.player_locks.hold(interaction.user.id):
+                response_message, ephemeral = await self._use_item(interaction.user.id, item_name)
+        except PlayerBusyError:
+            response_message, ephemeral = QUEUE_FULL_MESSAGE, True
+        await interaction.followup.send(response_message, ephemeral=ephemeral)
 
-        c.execute("SELECT pi.quantity, i.id, i.item_type, i.effect_type, i.effect_value FROM player_inventory pi JOIN items i ON pi.item_id = i.id WHERE pi.user_id = ? AND i.name = ?", (interaction.user.id, item_name))
-        item_info = c.fetchone()
+    async def _use_item(self, user_id: int, item_name: str):
+        """아이템을 소모하고 효과를 적용합니다. (응답 메시지, 나만 보기 여부)를 반환합니다."""
+        player_cache = self.bot.player_cache
+        player = await player_cache.get(user_id)
 
-        if not item_info:
-            conn.close()
-            return await interaction.followup.send(f"인벤토리에 '{item_name}'이(가) 없습니다.", ephemeral=True)
+        item = self.item_manager.get_item_by_name(item_name)
+        if not item:
+            return f"인벤토리에 '{item_name}'이(가) 없습니다.", True
+        item_id = item.id
 
-        quantity, item_id, item_type, effect_type, effect_value = item_info
+        def consume_item(conn):
+            item_info = conn.execute(SQL_INVENTORY_QUANTITY, (user_id, item_id)).fetchone()
 
-        item = self.item_manager.get_item(item_id)
-        if not item:
-            conn.close()
-            return await interaction.followup.send("아이템 정보를 찾을 수 없습니다.", ephemeral=True)
+            if not item_info:
+                return f"인벤토리에 '{item_name}'이(가) 없습니다.", None
+
+            quantity = item_info['quantity']
+
+            if item.item_type != 'consumable':
+                return f"'{item_name}'은(는) 사용할 수 있는 아이템이 아닙니다.", None
 
-        if item_type != 'consumable':
-            conn.close()
-            return await interaction.followup.send(f"'{item_name}'은(는) 사용할 수 있는 아이템이 아닙니다.", ephemeral=True)
+            if quantity > 1:
+                conn.execute("UPDATE player_inventory SET quantity = quantity - 1 WHERE user_id = ? AND item_id = ?", (user_id, item_id))
+            else:
+                conn.execute("DELETE FROM player_inventory WHERE user_id = ? AND item_id = ?", (user_id, item_id))
+            return None, item
+
+        try:
+            error_message, _ = await self.bot.db.run(consume_item)
+        finally:
+            self._inventory_changed(user_id)
+        if error_message:
+            return error_message, True
 
+        # 아이템 소모는 위 트랜잭션에서 확정되었고, 효과는 플레이어 캐시에 반영합니다.
+        effect_type, effect_value = item.effect_type, item.effect_value
         response_message = ""
         if effect_type == 'hp_recovery':
-            c.execute("SELECT hp, level FROM players WHERE user_id = ?", (interaction.user.id,))
-            player_hp, player_level = c.fetchone()
-            max_hp = 100 + (player_level - 1) * 10
+            max_hp = 100 + (player.level - 1) * 10
             
-            recovered_hp = min(max_hp - player_hp, effect_value)
+            recovered_hp = min(max_hp - player.hp, effect_value)
             if recovered_hp <= 0:
                 response_message = f"이미 체력이 가득 찼습니다. '{item_name}'을(를) 사용할 필요가 없습니다."
             else:
-                c.execute("UPDATE players SET hp = hp + ? WHERE user_id = ?", (recovered_hp, interaction.user.id))
-                response_message = f"'{item_name}'을(를) 사용하여 체력 {recovered_hp}을(를) 회복했습니다. (현재 HP: {player_hp + recovered_hp})"
+                player_cache.update(player, hp=player.hp + recovered_hp)
+                response_message = f"'{item_name}'을(를) 사용하여 체력 {recovered_hp}을(를) 회복했습니다. (현재 HP: {player.hp})"
         elif effect_type == 'attack_boost':
             buff_duration = effect_value
             buff_end_time = time.time() + buff_duration
-            c.execute("UPDATE players SET attack_buff_until = ? WHERE user_id = ?", (buff_end_time, interaction.user.id))
+            player_cache.update(player, attack_buff_until=buff_end_time)
+            self.bot.effects.track(player)
             response_message = f"'{item_name}'을(를) 사용하여 공격력이 {buff_duration}초 동안 증가했습니다!"
         elif effect_type == 'status_effect_apply':
             status_duration = effect_value
             status_end_time = time.time() + status_duration
-            c.execute("UPDATE players SET status_effect = ?, status_effect_end_time = ? WHERE user_id = ?", (item.effect_name, status_end_time, interaction.user.id))
+            player_cache.update(player, status_effect=item.effect_name, status_effect_end_time=status_end_time)
+            self.bot.effects.track(player)
             response_message = f"'{item_name}'을(를) 사용하여 {item.effect_name} 상태 이상을 {status_duration}초 동안 부여했습니다!"
         elif effect_type == 'status_effect_cure':
             response_message = f"'{item_name}'을(를) 사용하여 상태 이상을 치료했습니다! (구현 예정)"
         else:
             response_message = f"'{item_name}'은(는) 현재 사용해도 아무런 효과가 없습니다."
 
-        if quantity > 1:
-            c.execute("UPDATE player_inventory SET quantity = quantity - 1 WHERE user_id = ? AND item_id = ?", (interaction.user.id, item_id))
-        else:
-            c.execute("DELETE FROM player_inventory WHERE user_id = ? AND item_id = ?", (interaction.user.id, item_id))
-        
-        conn.commit()
-        conn.close()
-        await interaction.followup.send(response_message)
+        return response_message, False
 
     @game_group.command(name="입장", description="특정 채널에 입장하기 위한 역할을 받습니다.")
     @app_commands.describe(channel="입장할 채널을 선택하세요.")
@@ -565,29 +527,23 @@ class GameCog(commands.Cog):
         if not await self._check_game_channel_and_role(interaction): return
         await interaction.response.defer(ephemeral=False)
 
-        from main import get_db_connection
-        conn = get_db_connection()
-        c = conn.cursor()
-        c.execute("SELECT l.name, l.description, l.id, l.actions FROM players p JOIN locations l ON p.current_location_id = l.id WHERE p.user_id = ?", (interaction.user.id,))
-        current_location = c.fetchone()
+        player = await self.bot.player_cache.get(interaction.user.id)
+        world_map = self.bot.world_map
+        current_location = world_map.get(player.current_location_id) if player else None
 
         if not current_location:
-            conn.close()
             return await interaction.followup.send("오류: 현재 위치를 찾을 수 없습니다.")
 
-        c.execute("SELECT l.name FROM map_connections mc JOIN locations l ON mc.to_location_id = l.id WHERE mc.from_location_id = ?", (current_location['id'],))
-        possible_moves = [row['name'] for row in c.fetchall()]
-        conn.close()
+        possible_moves = [dest.name for dest in world_map.destinations(current_location.id)]
 
-        embed = discord.Embed(title=f"📍 현재 위치: {current_location['name']}", description=current_location['description'], color=discord.Color.green())
+        embed = discord.Embed(title=f"📍 현재 위치: {current_location.name}", description=current_location.description, color=discord.Color.green())
         if possible_moves:
             embed.add_field(name="이동 가능 장소", value=" / ".join(possible_moves), inline=False)
         else:
             embed.add_field(name="이동 가능 장소", value="이곳에서는 더 이상 이동할 곳이 없는 것 같습니다.", inline=False)
         
-        if current_location['actions']:
-            actions = json.loads(current_location['actions'])
-            embed.add_field(name="가능한 행동", value=" / ".join(actions), inline=False)
+        if current_location.actions:
+            embed.add_field(name="가능한 행동", value=" / ".join(current_location.actions), inline=False)
 
         await interaction.followup.send(embed=embed)
 
@@ -595,212 +551,173 @@ class GameCog(commands.Cog):
     @app_commands.autocomplete(destination=move_autocomplete)
     async def move(self, interaction: discord.Interaction, destination: str):
         if not await self._check_game_channel_and_role(interaction): return
-        if interaction.user.id in self.active_users:
-            return await interaction.response.send_message("이미 다른 행동을 하고 있습니다.", ephemeral=True)
+        if self.bot.player_locks.activity(interaction.user.id):
+            return await interaction.response.send_message(BUSY_MESSAGE, ephemeral=True)
 
-        self.active_users.add(interaction.user.id)
         await interaction.response.defer(ephemeral=False)
 
-        from main import get_db_connection
-        conn = get_db_connection()
-        c = conn.cursor()
-        
-        c.execute("SELECT id FROM locations WHERE name = ?", (destination,))
-        dest_location = c.fetchone()
-        
+        world_map = self.bot.world_map
+        dest_location = world_map.by_name.get(destination)
         if not dest_location:
-            self.active_users.discard(interaction.user.id)
-            conn.close()
             return await interaction.followup.send("존재하지 않는 목적지입니다.")
 
-        c.execute("SELECT to_location_id FROM map_connections WHERE from_location_id = (SELECT current_location_id FROM players WHERE user_id = ?) AND to_location_id = ?", (interaction.user.id, dest_location['id']))
-        if not c.fetchone():
-            self.active_users.discard(interaction.user.id)
-            conn.close()
-            return await interaction.followup.send("그곳으로는 이동할 수 없습니다.")
-
-        c.execute("UPDATE players SET current_location_id = ? WHERE user_id = ?", (dest_location['id'], interaction.user.id))
-        conn.commit()
-        conn.close()
+        try:
+            async with self.bot.player_locks.hold(interaction.user.id):
+                player = await self.bot.player_cache.get(interaction.user.id)
+                if not world_map.is_adjacent(player.current_location_id, dest_location.id):
+                    return await interaction.followup.send("그곳으로는 이동할 수 없습니다.")
+                self.bot.player_cache.update(player, current_location_id=dest_location.id)
+        except PlayerBusyError:
+            return await interaction.followup.send(QUEUE_FULL_MESSAGE, ephemeral=True)
 
         await interaction.followup.send(f"당신은 {destination}(으)로 이동했습니다.")
-        self.active_users.discard(interaction.user.id)
 
-    @game_group.command(name="탐험", description="현재 지역을 탐험하여 새로운 사건을 마주합니다.")
-    async def explore(self, interaction: discord.Interaction):
+    @game_group.command(name="여행", description="갈 수 있는 곳이라면 여러 장소를 거쳐 한 번에 이동합니다.")
+    @app_commands.autocomplete(destination=travel_autocomplete)
+    async def travel(self, interaction: discord.Interaction, destination: str):
         if not await self._check_game_channel_and_role(interaction): return
-        if interaction.user.id in self.active_users:
-            return await interaction.response.send_message("이미 다른 행동을 하고 있습니다.", ephemeral=True)
+        if self.bot.player_locks.activity(interaction.user.id):
+            return await interaction.response.send_message(BUSY_MESSAGE, ephemeral=True)
+
+        world_map = self.bot.world_map
+        dest_location = world_map.by_name.get(destination)
+        if not dest_location:
+            return await interaction.response.send_message("존재하지 않는 목적지입니다.", ephemeral=True)
 
+        # 같은 플레이어의 다른 명령이 끝나기를 기다릴 수 있으므로 먼저 응답을 미룹니다.
         await interaction.response.defer(ephemeral=False)
-        self.active_users.add(interaction.user.id)
+        try:
+            async with self.bot.player_locks.hold(interaction.user.id):
+                player = await self.bot.player_cache.get(interaction.user.id)
+                # 경로는 미리 계산된 최단 경로표에서 찾으므로 DB를 조회하지 않습니다.
+                if dest_location.id == player.current_location_id:
+                    return await interaction.followup.send("이미 그곳에 있습니다.")
+                route = world_map.route(player.current_location_id, dest_location.id)
+                if route is None:
+                    return await interaction.followup.send("그곳으로 가는 길이 없습니다.")
+                self.bot.player_cache.update(player, current_location_id=dest_location.id)
+        except PlayerBusyError:
+            return await interaction.followup.send(QUEUE_FULL_MESSAGE)
+
+        path = " → ".join(world_map.location_name(location_id) for location_id in route)
+        # route는 출발지를 빼고 도착지를 포함하므로 길이가 곧 이동 횟수입니다.
+        await interaction.followup.send(f"당신은 {len(route)}번 이동해 {destination}(으)로 왔습니다.\n경로: {path}")
 
-        from main import get_db_connection
-        conn = get_db_connection()
-        c = conn.cursor()
-        c.execute("SELECT current_location_id FROM players WHERE user_id = ?", (interaction.user.id,))
-        player_location_id = c.fetchone()['current_location_id']
-        
-        c.execute("SELECT monster_name FROM location_monsters WHERE location_id = ?", (player_location_id,))
-        possible_monsters = [row['monster_name'] for row in c.fetchall()]
-        conn.close()
-        
+    @game_group.command(name="탐험", description="현재 지역을 탐험하여 새로운 사건을 마주합니다.")
+    async def explore(self, interaction: discord.Interaction):
+        if not await self._check_game_channel_and_role(interaction): return
+        user_id = interaction.user.id
+        # 확인과 등록을 await 없이 한 번에 하므로 연타해도 탐험이 두 번 시작되지 않습니다.
+        if not self.bot.player_locks.begin_activity(user_id, "탐험"):
+            return await interaction.response.send_message(BUSY_MESSAGE, ephemeral=True)
+
+        in_battle = False
         try:
-            if possible_monsters and random.random() < 0.7:
-                monster_name = random.choice(possible_monsters)
-                # 1. View 객체를 먼저 생성합니다.
-                view = BattleView(self.bot, interaction.user.id, monster_name, self)
+            await interaction.response.defer(ephemeral=False)
+            player = await self.bot.player_cache.get(interaction.user.id)
+            player_location_id = player.current_location_id
+
+            # 지역별 출현 표는 메모리에 있으므로 SQL 없이 판정합니다.
+            monsters = self.bot.monsters
+            if monsters.has_encounters(player_location_id) and random.random() < 0.7:
+                monster = monsters.encounter(player_location_id)
+                # 전투에 필요한 플레이어/무기 정보는 여기서 한 번만 읽습니다.
+                session = await BattleSession.start(self.bot, interaction.user.id, monster, self.item_manager.catalog)
+                if session is None:
+                    return await interaction.followup.send("오류: 플레이어 정보를 찾을 수 없습니다.")
+                # 1. View 객체를 먼저 생성합니다. 전투가 끝나면 BattleView가 행동을 종료합니다.
+                view = BattleView(self.bot, session, self)
+                in_battle = True
                 # 2. 메시지를 보낼 때 View를 함께 첨부합니다.
-                message = await interaction.followup.send(f"야생의 {monster_name}이(가) 나타났다! 어떻게 하시겠습니까?", view=view, wait=True)
+                message = await interaction.followup.send(f"야생의 {monster.name}이(가) 나타났다! 어떻게 하시겠습니까?", view=view, wait=True)
                 # 3. 생성된 View에 방금 보낸 메시지 객체를 설정해줍니다.
                 view.battle_message = message
             else:
-                if random.random() < 0.2:
-                    await self.add_item_to_inventory(interaction.user.id, "기초 회복 물약")
-                    await interaction.followup.send("반짝이는 기초 회복 물약을 발견하여 획득했습니다!")
+                drops = EXPLORE_LOOT.roll()
+                if drops:
+                    async with self.bot.player_locks.hold(user_id):
+                        result = await self.grant_items(user_id, dict(drops))
+                    found = ", ".join(item_name for item_name, _ in drops)
+                    await interaction.followup.send(f"반짝이는 {found}을(를) 발견하여 획득했습니다!" + _overflow_note(result.overflow))
                 else:
                     await interaction.followup.send("아무 일도 일어나지 않았습니다.")
-                self.active_users.discard(interaction.user.id)
+        except PlayerBusyError:
+            await interaction.followup.send(QUEUE_FULL_MESSAGE)
         except Exception as e:
             print(f"탐험 중 오류: {e}")
-            if interaction.user.id in self.active_users:
-                self.active_users.discard(interaction.user.id)
+            in_battle = False
+        finally:
+            if not in_battle:
+                self.bot.player_locks.end_activity(user_id)
 
     @game_group.command(name="행동", description="현재 위치에서 특정 행동을 합니다.")
     @app_commands.autocomplete(action_name=action_autocomplete)
     async def do_action(self, interaction: discord.Interaction, action_name: str):
         if not await self._check_game_channel_and_role(interaction): return
-        if interaction.user.id in self.active_users:
-            await interaction.response.send_message("이미 다른 행동을 하고 있습니다.", ephemeral=True)
-            return
-
-        await interaction.response.defer(ephemeral=False)
-
-        from main import get_db_connection
-        conn = get_db_connection()
-        c = conn.cursor()
-        c.execute("SELECT l.name, l.actions FROM players p JOIN locations l ON p.current_location_id = l.id WHERE p.user_id = ?", (interaction.user.id,))
-        location_info = c.fetchone()
-        conn.close()
-
-        location_name = location_info['name']
-        actions_json = location_info['actions']
-
-        if not actions_json:
-            await interaction.followup.send("이곳에서는 할 수 있는 행동이 없습니다.")
-            return
-
-        available_actions = json.loads(actions_json)
-
-        if action_name not in available_actions:
-            await interaction.followup.send(f"'{action_name}'은(는) 이곳에서 할 수 없는 행동입니다.")
+        user_id = interaction.user.id
+        if not self.bot.player_locks.begin_activity(user_id, action_name):
+            await interaction.response.send_message(BUSY_MESSAGE, ephemeral=True)
             return
 
-        self.active_users.add(interaction.user.id)
         response_message = f"당신은 {action_name}을(를) 시도합니다...\n\n"
         try:
-            if action_name == "덤불 살피기":
-                if random.random() < 0.5:
-                    await self.add_item_to_inventory(interaction.user.id, "나뭇가지")
-                    response_message += "덤불 속에서 쓸만한 나뭇가지를 발견했습니다!"
-                else:
-                    response_message += "아무것도 찾지 못했습니다."
-
-            elif action_name == "나무 올라가기":
-                if random.random() < 0.3:
-                    response_message += "높은 곳에서 주변을 둘러보지만, 특별한 것은 보이지 않습니다."
-                else:
-                    await self.add_item_to_inventory(interaction.user.id, "질긴 나뭇잎")
-                    response_message += "미끄러져 내려왔습니다. 다행히 다치진 않았고, 손에 질긴 나뭇잎이 걸렸습니다."
-            elif action_name == "수풀 헤치기":
-                if random.random() < 0.6:
-                    response_message += "길을 찾았습니다! 하지만 아직 가기에는 험해보이는 길이네요.."
-                else:
-                    response_message += "수풀이 너무 우거져 더 이상 나아갈 수 없습니다."
-            elif action_name == "버섯 채집":
-                if random.random() < 0.7:
-                    response_message += "독버섯을 채집했습니다! (아직 사용 불가)"
-                else:
-                    response_message += "아무 버섯도 찾지 못했습니다."
-            elif action_name == "문 두드리기":
-                response_message += "문이 굳게 닫혀있습니다. 안에서는 아무런 소리도 들리지 않습니다."
-            elif action_name == "잔해 뒤지기":
-                if random.random() < 0.4:
-                    await self.add_item_to_inventory(interaction.user.id, "낡은 곡괭이")
-                    response_message += "부서진 잔해 속에서 낡은 곡괭이를 발견했습니다!"
-                else:
-                    response_message += "부서진 잔해들 뿐입니다."            
-            elif action_name == "낚시하기":
-                if location_name != "강가":
-                    response_message = "이곳에서는 낚시를 할 수 없습니다."
-                else:
-                    rod_name = None
-                    if await self._has_item(interaction.user.id, "튼튼한 낚싯대"):
-                        rod_name = "튼튼한 낚싯대"
-                    elif await self._has_item(interaction.user.id, "낡은 낚싯대"):
-                        rod_name = "낡은 낚싯대"
-
-                    if not rod_name:
-                        response_message = "낚싯대가 없습니다."
-                    else:
-                        await asyncio.sleep(2)
-                        success, durability_message = await self._use_tool(interaction.user.id, rod_name)
-                        if not success:
-                            response_message = durability_message
-                        else:
-                            fish_roll = random.random()
-                            if fish_roll < 0.5:
-                                await self.add_item_to_inventory(interaction.user.id, "송사리")
-                                response_message += "작고 귀여운 송사리를 낚았습니다."
-                            elif fish_roll < 0.8:
-                                await self.add_item_to_inventory(interaction.user.id, "잉어")
-                                response_message += "제법 살이 오른 잉어를 낚았습니다!"
-                            else:
-                                response_message += "아무것도 낚지 못했습니다."
-                            
-                            if durability_message:
-                                response_message += f"\n{durability_message}"
-
-            elif action_name == "광물 채집":
-                if location_name != "어두운 동굴":
-                    response_message = "이곳에서는 광물을 채집할 수 없습니다."
-                elif not await self._has_item(interaction.user.id, "낡은 곡괭이"):
-                    response_message = "곡괭이가 없습니다."
-                else:
-                    await asyncio.sleep(3)
-                    success, durability_message = await self._use_tool(interaction.user.id, "낡은 곡괭이")
+            await interaction.response.defer(ephemeral=False)
+
+            player = await self.bot.player_cache.get(user_id)
+            world_map = self.bot.world_map
+            # 도구 확인부터 지급까지 한 행동 안에서는 같은 버전의 카탈로그를 사용합니다.
+            catalog = self.item_manager.catalog
+
+            # 행동 정의는 지도를 불러올 때 (장소, 행동) 표로 컴파일되어 있으므로 한 번의 조회로 끝납니다.
+            action = world_map.get_action(player.current_location_id, action_name)
+            if action is None:
+                if not world_map.actions(player.current_location_id):
+                    return await interaction.followup.send("이곳에서는 할 수 있는 행동이 없습니다.")
+                return await interaction.followup.send(f"'{action_name}'은(는) 이곳에서 할 수 없는 행동입니다.")
+
+            tool_name = None
+            for candidate in action.tools:
+                if await self._has_item(user_id, candidate, catalog):
+                    tool_name = candidate
+                    break
+            if action.tools and not tool_name:
+                return await interaction.followup.send(action.missing_tool)
+
+            if action.duration:
+                await asyncio.sleep(action.duration)
+
+            # 기다리는 동안에는 잠금을 잡지 않고, 인벤토리를 바꾸는 부분만 다른 명령과 차례대로 실행합니다.
+            durability_message = ""
+            async with self.bot.player_locks.hold(user_id):
+                if tool_name:
+                    success, durability_message = await self._use_tool(user_id, tool_name, catalog)
                     if not success:
-                        response_message = durability_message
-                    else:
-                        ore_roll = random.random()
-                        if ore_roll < 0.6:
-                            await self.add_item_to_inventory(interaction.user.id, "철광석")
-                            response_message += "반짝이는 철광석을 발견하여 채집했습니다!"
-                        else:
-                            response_message += "돌멩이만 잔뜩 나왔습니다."
-
-                        if durability_message:
-                            response_message += f"\n{durability_message}"
-            
+                        return await interaction.followup.send(durability_message)
+
+                item_name, message = action.roll()
+                if item_name:
+                    result = await self.grant_items(user_id, {item_name: 1}, catalog)
+                    message += _overflow_note(result.overflow)
+            response_message += message
+            if durability_message:
+                response_message += f"\n{durability_message}"
+
             await interaction.followup.send(response_message)
 
+        except PlayerBusyError:
+            await interaction.followup.send(QUEUE_FULL_MESSAGE)
         except Exception as e:
-            print(f"/행동 명령어 처리 중 오류 발생 (Action: {action_name}, User: {interaction.user.id}): {e}")
+            print(f"/행동 명령어 처리 중 오류 발생 (Action: {action_name}, User: {user_id}): {e}")
             await interaction.followup.send("행동 처리 중 오류가 발생했습니다. 다시 시도해주세요.")
         finally:
-            self.active_users.discard(interaction.user.id)
+            self.bot.player_locks.end_activity(user_id)
 
     @game_group.command(name="스탯", description="자신의 스탯 정보를 확인합니다.")
     async def stats(self, interaction: discord.Interaction):
         if not await self._check_game_channel_and_role(interaction): return
         await interaction.response.defer(ephemeral=True)
         
-        from main import get_db_connection
-        conn = get_db_connection()
-        c = conn.cursor()
-        c.execute("SELECT * FROM players WHERE user_id = ?", (interaction.user.id,))
-        player = c.fetchone()
-        conn.close()
+        player = await self.bot.player_cache.get(interaction.user.id)
 
         if player:
             calculated_attack = player['strength'] + player['swordsmanship']
@@ -826,12 +743,7 @@ class GameCog(commands.Cog):
         if not await self._check_game_channel_and_role(interaction): return
         await interaction.response.defer(ephemeral=True)
 
-        from main import get_db_connection
-        conn = get_db_connection()
-        c = conn.cursor()
-        c.execute("SELECT skp FROM players WHERE user_id = ?", (interaction.user.id,))
-        player = c.fetchone()
-        conn.close()
+        player = await self.bot.player_cache.get(interaction.user.id)
 
         if player:
             skp = player['skp']
@@ -0,0 +1,103 @@
+MAX_RESULTS = 25 # 디스코드 자동완성 선택지 최대 개수
+
+# 호환용 자모 (키보드로 입력되는 글자)
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG = ("", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+             "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ")
+
+# 입력 중인 글자와 비교할 수 있도록 겹자모를 키 입력 순서대로 풉니다. (예: 낚 -> ㄴㅏㄱㄱ)
+_COMPOUND_JAMO = {
+    "ㄲ": "ㄱㄱ", "ㄸ": "ㄷㄷ", "ㅃ": "ㅂㅂ", "ㅆ": "ㅅㅅ", "ㅉ": "ㅈㅈ",
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+}
+
+_SYLLABLE_BASE = 0xAC00
+_SYLLABLE_COUNT = 11172
+
+# 매칭 종류 (작을수록 먼저 보여줍니다)
+_MATCH_SYLLABLE, _MATCH_JAMO, _MATCH_CHOSEONG = 0, 1, 2
+# 매칭 위치
+_AT_NAME_START, _AT_WORD_START, _AT_INSIDE = 0, 1, 2
+
+def _split_syllable(ch):
+    code = ord(ch) - _SYLLABLE_BASE
+    if not 0 <= code < _SYLLABLE_COUNT:
+        return None
+    return CHOSEONG[code // 588], JUNGSEONG[(code % 588) // 28], JONGSEONG[code % 28]
+
+def choseong(text):
+    """한글 음절을 초성으로 바꿉니다. (예: 낚싯대 -> ㄴㅅㄷ)"""
+    return ''.join(parts[0] if (parts := _split_syllable(ch)) else ch for ch in text)
+
+def decompose(text):
+    """한글을 키 입력 순서의 자모열로 풉니다. 입력 중인 마지막 글자도 접두어로 비교할 수 있습니다."""
+    jamo = []
+    for ch in text:
+        parts = _split_syllable(ch)
+        for part in (parts or (ch,)):
+            jamo.append(_COMPOUND_JAMO.get(part, part))
+    return ''.join(jamo)
+
+def _compact(text):
+    """대소문자와 띄어쓰기를 무시하고 비교하기 위해 정규화합니다. (압축된 문자열, 단어 시작 위치)"""
+    chars, word_starts = [], set()
+    for word in text.casefold().split():
+        word_starts.add(len(chars))
+        chars.extend(word)
+    return ''.join(chars), word_starts
+
+class HangulIndex:
+    """이름 목록에 대한 자동완성 검색 색인
+
+    만들 때 모든 부분 문자열/초성열, 그리고 단어 시작 위치의 자모열 접두어를 키로 미리 계산해
+    키마다 순위가 매겨진 상위 limit개를 저장합니다. 검색은 입력값으로 키를 만들어 사전을 두 번
+    찾아보는 것이 전부이므로, 비용은 이름 개수가 아니라 입력 길이에만 비례합니다.
+    """
+
+    def __init__(self, names, limit=MAX_RESULTS):
+        self.names = tuple(dict.fromkeys(names)) # 순서를 유지하며 중복 제거
+        self.limit = limit
+        keys, jamo_keys = {}, {}
+        for order, name in enumerate(self.names):
+            compact, word_starts = _compact(name)
+            initials = choseong(compact)
+            length = len(compact)
+            for pos in range(length):
+                where = _AT_NAME_START if pos == 0 else _AT_WORD_START if pos in word_starts else _AT_INSIDE
+                for end in range(pos + 1, length + 1):
+                    _add(keys, compact[pos:end], (where, _MATCH_SYLLABLE, length, order), name)
+                    _add(keys, initials[pos:end], (where, _MATCH_CHOSEONG, length, order), name)
+                if where != _AT_INSIDE:
+                    jamo = decompose(compact[pos:])
+                    for end in range(1, len(jamo) + 1):
+                        _add(jamo_keys, jamo[:end], (where, _MATCH_JAMO, length, order), name)
+            if compact:
+                _add(keys, compact, (-1, _MATCH_SYLLABLE, length, order), name) # 정확히 일치
+        self._keys = _finalize(keys, limit)
+        self._jamo_keys = _finalize(jamo_keys, limit)
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query):
+        """입력값과 일치하는 이름을 순위대로 최대 limit개 반환합니다. 빈 입력이면 앞에서부터 반환합니다."""
+        compact, _ = _compact(query)
+        if not compact:
+            return list(self.names[:self.limit])
+        best = {}
+        for hits in (self._keys.get(compact, ()), self._jamo_keys.get(decompose(compact), ())):
+            for score, name in hits:
+                if name not in best or score < best[name]:
+                    best[name] = score
+        return [name for name, _ in sorted(best.items(), key=lambda item: item[1])[:self.limit]]
+
+def _add(keys, key, score, name):
+    hits = keys.setdefault(key, {})
+    if name not in hits or score < hits[name]:
+        hits[name] = score
+
+def _finalize(keys, limit):
+    return {key: tuple(sorted(((score, name) for name, score in hits.items()))[:limit]) for key, hits in keys.items()}
@@ -0,0 +1,114 @@
+from dataclasses import dataclass
+
+from database import sql_inventory_pairs, sql_inventory_quantities
+
+# --- 인벤토리 쓰기 헬퍼 ---
+# Database.run()에 넘기는 쓰기 함수 안에서 사용합니다. (conn은 작성자 트랜잭션의 연결)
+
+_UPSERT_STACK_SQL = (
+    "INSERT INTO player_inventory (user_id, item_id, quantity, durability) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(user_id, item_id) DO UPDATE SET quantity = quantity + excluded.quantity"
+)
+
+def held_quantities(conn, user_id, item_ids):
+    """여러 아이템의 보유 수량을 한 번의 쿼리로 읽습니다. 없는 아이템은 0입니다."""
+    item_ids = list(item_ids)
+    held = dict.fromkeys(item_ids, 0)
+    if item_ids:
+        rows = conn.execute(sql_inventory_quantities(len(item_ids)), (user_id, *item_ids))
+        for item_id, quantity in rows:
+            held[item_id] = quantity
+    return held
+
+def stack_space(item, held):
+    """지금 보유량(held)에서 더 받을 수 있는 개수"""
+    if item.stackable:
+        return max(0, item.max_stack - held)
+    return 0 if held else 1
+
+# (user_id, item_id) 쌍을 한 번에 조회할 때 쿼리 하나에 넣는 최대 쌍 수
+_PAIR_CHUNK = 400
+
+@dataclass(frozen=True, slots=True)
+class GrantResult:
+    """grant_items()의 결과"""
+    granted: dict  # 아이템 이름 -> 실제로 받은 수량
+    overflow: dict # 아이템 이름 -> 보관 한도(max_stack, 겹칠 수 없는 아이템)를 넘어 받지 못한 수량
+
+def resolve_items(catalog, quantities):
+    """{아이템 이름: 수량}을 카탈로그 기준 {Item: 수량}으로 바꿉니다. 없는 이름은 경고를 남기고 건너뜁니다."""
+    resolved = {}
+    for name, quantity in quantities.items():
+        item = catalog.get_item_by_name(name)
+        if item is None:
+            print(f"경고: 지급할 아이템 '{name}'을(를) 카탈로그에서 찾을 수 없습니다.")
+            continue
+        resolved[item] = resolved.get(item, 0) + quantity
+    return resolved
+
+def _held_pairs(conn, pairs):
+    held = {}
+    for start in range(0, len(pairs), _PAIR_CHUNK):
+        chunk = pairs[start:start + _PAIR_CHUNK]
+        params = [value for pair in chunk for value in pair]
+        rows = conn.execute(sql_inventory_pairs(len(chunk)), params)
+        for user_id, item_id, quantity in rows:
+            held[(user_id, item_id)] = quantity
+    return held
+
+def grant_items_bulk(conn, grants):
+    """여러 플레이어에게 아이템을 한꺼번에 지급합니다. grants는 {user_id: {Item: 수량}}입니다.
+
+    현재 보유량을 (user_id, item_id) 묶음 조회로 읽고, 보관 한도와 내구도 규칙을 메모리에서 적용한 뒤
+    받을 수 있는 만큼을 하나의 UPSERT executemany로 씁니다. {user_id: GrantResult}를 반환합니다.
+    """
+    pairs = [(user_id, item.id) for user_id, items in grants.items() for item, quantity in items.items() if quantity > 0]
+    held = _held_pairs(conn, pairs)
+
+    results, params = {}, []
+    for user_id, items in grants.items():
+        granted, overflow = {}, {}
+        for item, quantity in items.items():
+            if quantity <= 0:
+                continue
+            amount = min(quantity, stack_space(item, held.get((user_id, item.id), 0)))
+            if amount:
+                granted[item.name] = amount
+                # 새 행에만 최대 내구도가 들어가고, 기존 행은 수량만 늘어납니다.
+                params.append((user_id, item.id, amount, item.max_durability))
+            if amount < quantity:
+                overflow[item.name] = quantity - amount
+        results[user_id] = GrantResult(granted, overflow)
+    if params:
+        conn.executemany(_UPSERT_STACK_SQL, params)
+    return results
+
+def grant_items(conn, user_id, items):
+    """한 플레이어에게 {Item: 수량}을 지급합니다. GrantResult를 반환합니다."""
+    return grant_items_bulk(conn, {user_id: items})[user_id]
+
+def craft_items(conn, user_id, product, materials, quantity=1):
+    """재료를 소모해 product를 최대 quantity개 만듭니다. materials는 [(재료 id, 1개당 필요 수량)]입니다.
+
+    재료와 완성품의 보유 수량은 한 번에 읽고, 재료로 만들 수 있는 개수와 완성품이 들어갈 자리 중
+    작은 쪽만큼만 만듭니다. 수량이 0이 된 재료 행은 지웁니다. (만든 개수, {아이템 id: 제작 전 보유 수량})을 반환합니다.
+    """
+    held = held_quantities(conn, user_id, [material_id for material_id, _ in materials] + [product.id])
+    craftable = min([quantity, stack_space(product, held[product.id])] +
+                    [held[material_id] // amount for material_id, amount in materials])
+    if craftable <= 0:
+        return 0, held
+
+    conn.executemany("UPDATE player_inventory SET quantity = quantity - ? WHERE user_id = ? AND item_id = ?",
+                     [(amount * craftable, user_id, material_id) for material_id, amount in materials])
+    conn.executemany("DELETE FROM player_inventory WHERE user_id = ? AND item_id = ? AND quantity <= 0",
+                     [(user_id, material_id) for material_id, _ in materials])
+    conn.execute(_UPSERT_STACK_SQL, (user_id, product.id, craftable, product.max_durability))
+    return craftable, held
+
+def set_durability(conn, user_id, item_id, durability):
+    """내구도를 저장합니다. 0 이하가 되면 아이템이 부서져 인벤토리에서 사라집니다."""
+    if durability > 0:
+        conn.execute("UPDATE player_inventory SET durability = ? WHERE user_id = ? AND item_id = ?", (durability, user_id, item_id))
+    else:
+        conn.execute("DELETE FROM player_inventory WHERE user_id = ? AND item_id = ?", (user_id, item_id))
@@ -0,0 +1,160 @@
+from collections import OrderedDict
+
+import discord
+
+PAGE_SIZE = 12 # 한 페이지의 아이템 수 (임베드 필드는 최대 25개)
+
+# 분류 필터 (값은 items.item_type, None은 전체)
+CATEGORIES = {
+    "all": ("전체", None),
+    "consumable": ("소모품", "consumable"),
+    "material": ("재료", "material"),
+    "tool": ("도구", "tool"),
+    "equipment": ("장비", "equipment"),
+}
+_TYPE_ORDER = {item_type: order for order, (_, item_type) in enumerate(CATEGORIES.values()) if item_type}
+
+# 정렬 방식 -> (이름, 정렬 키)
+SORTS = {
+    "name": ("이름순", lambda entry: entry[0]),
+    "quantity": ("수량 많은 순", lambda entry: (-entry[1], entry[0])),
+    "type": ("종류순", lambda entry: (_TYPE_ORDER.get(entry[3], len(_TYPE_ORDER)), entry[0])),
+}
+
+def render_pages(rows, catalog, category="all", sort="name"):
+    """인벤토리 행(name, quantity, durability, max_durability)을 분류/정렬해 페이지별 임베드 목록으로 만듭니다."""
+    category_label, item_type = CATEGORIES[category]
+    sort_label, sort_key = SORTS[sort]
+
+    entries = []
+    for row in rows:
+        item = catalog.get_item_by_name(row['name'])
+        row_type = item.item_type if item else None
+        if item_type is None or row_type == item_type:
+            entries.append((row['name'], row['quantity'], (row['durability'], row['max_durability']), row_type))
+    entries.sort(key=sort_key)
+
+    page_count = max(1, -(-len(entries) // PAGE_SIZE))
+    pages = []
+    for page in range(page_count):
+        embed = discord.Embed(title="🎒 인벤토리", color=discord.Color.blue())
+        for name, quantity, (durability, max_durability), _ in entries[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]:
+            value = f"수량: {quantity}"
+            if durability is not None and max_durability is not None:
+                value += f" | 내구도: {durability}/{max_durability}"
+            embed.add_field(name=name, value=value, inline=True)
+        if not entries:
+            embed.description = "이 분류에는 아이템이 없습니다." if item_type else "인벤토리가 비어있습니다."
+        embed.set_footer(text=f"{category_label} · {sort_label} · {page + 1}/{page_count} 페이지 · {len(entries)}종")
+        pages.append(embed)
+    return pages
+
+class _CachedInventory:
+    __slots__ = ('version', 'catalog', 'rows', 'pages')
+
+    def __init__(self, version, catalog, rows):
+        self.version = version
+        self.catalog = catalog
+        self.rows = rows
+        self.pages = {} # (분류, 정렬) -> 임베드 목록
+
+class InventoryPageCache:
+    """플레이어별 인벤토리 행과 렌더링한 페이지 캐시
+
+    항목은 인벤토리 버전(쓰기마다 1씩 증가)과 아이템 카탈로그가 모두 같을 때만 사용합니다.
+    같은 버전 안에서는 분류/정렬을 바꿔도 DB를 다시 읽지 않고, 한 번 만든 페이지는 다시 렌더링하지 않습니다.
+    """
+
+    def __init__(self, max_users=500):
+        self.max_users = max_users
+        self._entries = OrderedDict() # user_id -> _CachedInventory (오래된 순)
+        self.hits = 0
+        self.misses = 0
+
+    def rows(self, user_id, version, catalog):
+        """캐시된 인벤토리 행. 버전이나 카탈로그가 다르면 None"""
+        entry = self._entries.get(user_id)
+        if entry is None or entry.version != version or entry.catalog is not catalog:
+            return None
+        self._entries.move_to_end(user_id)
+        return entry.rows
+
+    def store(self, user_id, version, catalog, rows):
+        self._entries[user_id] = _CachedInventory(version, catalog, rows)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+
+    def pages(self, user_id, category, sort):
+        """store()/rows()로 확인한 항목의 페이지를 반환합니다. 처음 요청된 조합이면 이때 렌더링합니다."""
+        entry = self._entries[user_id]
+        key = (category, sort)
+        pages = entry.pages.get(key)
+        if pages is None:
+            self.misses += 1
+            pages = entry.pages[key] = render_pages(entry.rows, entry.catalog, category, sort)
+        else:
+            self.hits += 1
+        return pages
+
+class InventoryView(discord.ui.View):
+    """인벤토리 페이지 넘김과 분류/정렬 선택"""
+
+    def __init__(self, owner_id, load_pages, category="all", sort="name", pages=()):
+        super().__init__(timeout=120)
+        self.owner_id = owner_id
+        self.load_pages = load_pages # async (분류, 정렬) -> 임베드 목록
+        self.category = category
+        self.sort = sort
+        self.pages = list(pages)
+        self.page = 0
+        self.category_select.options = [discord.SelectOption(label=label, value=value, default=value == category)
+                                        for value, (label, _) in CATEGORIES.items()]
+        self.sort_select.options = [discord.SelectOption(label=label, value=value, default=value == sort)
+                                    for value, (label, _) in SORTS.items()]
+        self._update_buttons()
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message("당신의 인벤토리가 아닙니다!", ephemeral=True)
+            return False
+        return True
+
+    def _update_buttons(self):
+        self.previous_page.disabled = self.page <= 0
+        self.next_page.disabled = self.page >= len(self.pages) - 1
+
+    async def _show(self, interaction: discord.Interaction):
+        self.page = min(self.page, len(self.pages) - 1)
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.pages[self.page], view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary, row=0)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page -= 1
+        await self._show(interaction)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary, row=0)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page += 1
+        await self._show(interaction)
+
+    @discord.ui.select(placeholder="분류", row=1)
+    async def category_select(self, interaction: discord.Interaction, select: discord.ui.Select):
+        self.category = select.values[0]
+        for option in select.options:
+            option.default = option.value == self.category
+        await self._reload(interaction)
+
+    @discord.ui.select(placeholder="정렬", row=2)
+    async def sort_select(self, interaction: discord.Interaction, select: discord.ui.Select):
+        self.sort = select.values[0]
+        for option in select.options:
+            option.default = option.value == self.sort
+        await self._reload(interaction)
+
+    async def _reload(self, interaction: discord.Interaction):
+        # 인벤토리가 그 사이 바뀌었으면 새 버전으로 다시 불러오고, 아니면 캐시된 페이지를 씁니다.
+        self.pages = await self.load_pages(self.category, self.sort)
+        self.page = 0
+        await self._show(interaction)
@@ -1,67 +1,121 @@
-import sqlite3
+import asyncio
+import unicodedata
+from dataclasses import dataclass, asdict
+from types import MappingProxyType
 
+ITEM_COLUMNS = ('id', 'name', 'description', 'item_type', 'effect_type', 'effect_value',
+                'stackable', 'max_stack', 'effect_name', 'max_durability')
+
+@dataclass(frozen=True, slots=True)
 class Item:
-    def __init__(self, id, name, description, item_type, effect_type, effect_value, stackable, max_stack, effect_name=None):
-        self.id = id
-        self.name = name
-        self.description = description
-        self.item_type = item_type
-        self.effect_type = effect_type
-        self.effect_value = effect_value
-        self.stackable = bool(stackable) # SQLite stores BOOLEAN as INTEGER (0 or 1)
-        self.max_stack = max_stack
-        self.effect_name = effect_name
+    """items 테이블의 한 행. 로드 후에는 변경되지 않습니다."""
+    id: int
+    name: str
+    description: str
+    item_type: str
+    effect_type: str | None
+    effect_value: int | None
+    stackable: bool
+    max_stack: int
+    effect_name: str | None = None
+    max_durability: int | None = None # 내구도가 없는 아이템은 None
 
     def __str__(self):
         return f"{self.name} (ID: {self.id}, Type: {self.item_type})"
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "name": self.name,
-            "description": self.description,
-            "item_type": self.item_type,
-            "effect_type": self.effect_type,
-            "effect_value": self.effect_value,
-            "stackable": self.stackable,
-            "max_stack": self.max_stack,
-            "effect_name": self.effect_name
-        }
+        return asdict(self)
 
-class ItemManager:
-    def __init__(self, db_path='game.db'):
-        self.db_path = db_path
-        self.items = {} # Stores Item objects by their ID
+def _name_key(name):
+    # 대소문자/전각 차이를 무시하고 이름을 비교하기 위한 키
+    return unicodedata.normalize("NFKC", name).strip().casefold()
 
-    def load_items_from_db(self):
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("SELECT id, name, description, item_type, effect_type, effect_value, stackable, max_stack, effect_name FROM items")
-        rows = c.fetchall()
-        conn.close()
+class ItemCatalog:
+    """특정 시점의 아이템 목록과 색인. 만들어진 뒤에는 바뀌지 않으므로 여러 작업이 안전하게 공유할 수 있습니다."""
+    __slots__ = ('version', 'items', '_by_name', '_by_type')
 
+    def __init__(self, rows=(), version=0):
+        items, by_name, by_type = {}, {}, {}
         for row in rows:
-            item = Item(*row)
-            self.items[item.id] = item
-            print(f"Loaded item: {item.name}") # For debugging
+            values = dict(zip(ITEM_COLUMNS, row))
+            values['stackable'] = bool(values['stackable']) # SQLite는 BOOLEAN을 0/1로 저장합니다.
+            item = Item(**values)
+            items[item.id] = item
+            by_name[_name_key(item.name)] = item
+            by_type.setdefault(item.item_type, []).append(item)
+        self.version = version
+        self.items = MappingProxyType(items)       # id -> Item
+        self._by_name = by_name                    # casefold된 이름 -> Item
+        self._by_type = {item_type: tuple(group) for item_type, group in by_type.items()}
+
+    def __len__(self):
+        return len(self.items)
 
     def get_item(self, item_id):
         return self.items.get(item_id)
 
     def get_item_by_name(self, item_name):
-        for item_id, item in self.items.items():
-            if item.name.lower() == item_name.lower():
-                return item
-        return None
+        return self._by_name.get(_name_key(item_name))
+
+    def get_items_by_type(self, item_type):
+        return self._by_type.get(item_type, ())
+
+def _load_rows(conn):
+    return conn.execute(f"SELECT {', '.join(ITEM_COLUMNS)} FROM items ORDER BY id").fetchall()
+
+class ItemManager:
+    """현재 아이템 카탈로그를 들고 있다가, 새로고침 시 새 카탈로그를 따로 만든 뒤 한 번에 교체합니다.
+
+    전투처럼 오래 이어지는 작업은 시작할 때 catalog를 받아 두면 도중에 새로고침이 있어도
+    같은 버전의 아이템 정보를 계속 사용합니다.
+    """
+
+    def __init__(self):
+        self.catalog = ItemCatalog()
+        self._reload_lock = asyncio.Lock()
+
+    @property
+    def items(self):
+        return self.catalog.items
+
+    @property
+    def version(self):
+        return self.catalog.version
+
+    async def reload(self, db):
+        """items 테이블을 다시 읽어 새 카탈로그로 교체하고 (이전 카탈로그, 새 카탈로그)를 반환합니다."""
+        async with self._reload_lock:
+            version = self.catalog.version + 1
+            # 행 조회와 색인 생성은 DB 스레드에서 하고, 이벤트 루프에서는 참조만 바꿉니다.
+            catalog = await db.read(lambda conn: ItemCatalog(_load_rows(conn), version))
+            previous, self.catalog = self.catalog, catalog
+        return previous, catalog
+
+    def get_item(self, item_id):
+        return self.catalog.get_item(item_id)
+
+    def get_item_by_name(self, item_name):
+        return self.catalog.get_item_by_name(item_name)
+
+    def get_items_by_type(self, item_type):
+        return self.catalog.get_items_by_type(item_type)
 
 # Example usage (for testing)
+async def _example():
+    from db_manager import Database
+    db = Database()
+    await db.start()
+    item_manager = ItemManager()
+    await item_manager.reload(db)
+    await db.close()
+    return item_manager
+
 if __name__ == '__main__':
     # Ensure database is set up with items
     from database import setup_database
     setup_database()
 
-    item_manager = ItemManager()
-    item_manager.load_items_from_db()
+    item_manager = asyncio.run(_example())
 
     # Test retrieving items
     potion = item_manager.get_item_by_name("기초 회복 물약")
@@ -70,4 +124,7 @@ if __name__ == '__main__':
 
     pickaxe = item_manager.get_item_by_name("낡은 곡괭이")
     if pickaxe:
-        print(f"Found: {pickaxe.name}, Type: {pickaxe.item_type}")
+        print(f"Found: {pickaxe.name}, Type: {pickaxe.item_type}, Durability: {pickaxe.max_durability}")
+
+    print(f"Tools: {[item.name for item in item_manager.get_items_by_type('tool')]}")
+    print(f"Catalog version: {item_manager.version} ({len(item_manager.catalog)} items)")
@@ -0,0 +1,119 @@
+import random
+from dataclasses import dataclass
+
+from loot import AliasTable
+
+# --- 장소별 행동 정의 ---
+# 장소 이름 -> 행동 이름 -> 정의
+#   tools: 필요한 도구 (앞에 있는 것부터 우선 사용). 없으면 도구가 필요 없는 행동입니다.
+#   missing_tool: 도구가 없을 때의 메시지
+#   duration: 결과가 나오기까지 걸리는 시간(초)
+#   outcomes: (확률, 획득 아이템 또는 None, 메시지) 목록. 확률의 합이 1보다 작으면 나머지는 otherwise입니다.
+#   otherwise: 어떤 결과에도 해당하지 않았을 때의 메시지
+LOCATION_ACTIONS = {
+    "평온한 초원": {
+        "덤불 살피기": {
+            "outcomes": [(0.5, "나뭇가지", "덤불 속에서 쓸만한 나뭇가지를 발견했습니다!")],
+            "otherwise": "아무것도 찾지 못했습니다.",
+        },
+        "나무 올라가기": {
+            "outcomes": [
+                (0.3, None, "높은 곳에서 주변을 둘러보지만, 특별한 것은 보이지 않습니다."),
+                (0.7, "질긴 나뭇잎", "미끄러져 내려왔습니다. 다행히 다치진 않았고, 손에 질긴 나뭇잎이 걸렸습니다."),
+            ],
+        },
+    },
+    "동쪽 숲": {
+        "수풀 헤치기": {
+            "outcomes": [(0.6, None, "길을 찾았습니다! 하지만 아직 가기에는 험해보이는 길이네요..")],
+            "otherwise": "수풀이 너무 우거져 더 이상 나아갈 수 없습니다.",
+        },
+        "버섯 채집": {
+            "outcomes": [(0.7, None, "독버섯을 채집했습니다! (아직 사용 불가)")],
+            "otherwise": "아무 버섯도 찾지 못했습니다.",
+        },
+    },
+    "오래된 폐허": {
+        "문 두드리기": {
+            "otherwise": "문이 굳게 닫혀있습니다. 안에서는 아무런 소리도 들리지 않습니다.",
+        },
+        "잔해 뒤지기": {
+            "outcomes": [(0.4, "낡은 곡괭이", "부서진 잔해 속에서 낡은 곡괭이를 발견했습니다!")],
+            "otherwise": "부서진 잔해들 뿐입니다.",
+        },
+    },
+    "강가": {
+        "낚시하기": {
+            "tools": ["튼튼한 낚싯대", "낡은 낚싯대"],
+            "missing_tool": "낚싯대가 없습니다.",
+            "duration": 2,
+            "outcomes": [
+                (0.5, "송사리", "작고 귀여운 송사리를 낚았습니다."),
+                (0.3, "잉어", "제법 살이 오른 잉어를 낚았습니다!"),
+            ],
+            "otherwise": "아무것도 낚지 못했습니다.",
+        },
+    },
+    "어두운 동굴": {
+        "광물 채집": {
+            "tools": ["낡은 곡괭이"],
+            "missing_tool": "곡괭이가 없습니다.",
+            "duration": 3,
+            "outcomes": [(0.6, "철광석", "반짝이는 철광석을 발견하여 채집했습니다!")],
+            "otherwise": "돌멩이만 잔뜩 나왔습니다.",
+        },
+    },
+}
+
+@dataclass(frozen=True, slots=True)
+class LocationAction:
+    """한 장소에서 할 수 있는 행동 하나. 결과는 별칭 표로 한 번에 고릅니다."""
+    location_id: int
+    name: str
+    results: tuple        # (획득 아이템 또는 None, 메시지). 마지막은 otherwise일 수 있습니다.
+    outcomes: AliasTable  # results 중 하나를 고르는 표
+    tools: tuple = ()
+    missing_tool: str = ""
+    duration: float = 0
+
+    def roll(self, rng=random):
+        """(획득 아이템 또는 None, 메시지)를 반환합니다."""
+        return self.results[self.outcomes.sample(rng)]
+
+def compile_location_actions(locations, definitions=LOCATION_ACTIONS):
+    """장소 목록(id -> Location)과 행동 정의로 (location_id, 행동 이름) -> LocationAction 표를 만듭니다.
+
+    locations 테이블에 등록되어 있지만 정의가 없는 행동은 아무 일도 일어나지 않는 행동이 됩니다.
+    """
+    table = {}
+    for location in locations.values():
+        location_definitions = definitions.get(location.name, {})
+        for action_name in location.actions:
+            definition = location_definitions.get(action_name, {})
+            weights, results = [], []
+            for probability, item_name, message in definition.get("outcomes", ()):
+                weights.append(probability)
+                results.append((item_name, message))
+            total = sum(weights)
+            if total > 1.0 + 1e-9:
+                raise ValueError(f"'{location.name}'의 '{action_name}' 결과 확률의 합이 1을 넘습니다. ({total})")
+            if 1.0 - total > 1e-9:
+                weights.append(1.0 - total)
+                results.append((None, definition.get("otherwise", "")))
+            table[(location.id, action_name)] = LocationAction(
+                location_id=location.id,
+                name=action_name,
+                results=tuple(results),
+                outcomes=AliasTable(weights),
+                tools=tuple(definition.get("tools", ())),
+                missing_tool=definition.get("missing_tool", ""),
+                duration=definition.get("duration", 0),
+            )
+        for action_name in location_definitions:
+            if action_name not in location.actions:
+                print(f"경고: '{location.name}'에 등록되지 않은 행동 '{action_name}'의 정의는 무시됩니다.")
+    known_names = {location.name for location in locations.values()}
+    for location_name in definitions:
+        if known_names and location_name not in known_names:
+            print(f"경고: 존재하지 않는 장소 '{location_name}'의 행동 정의는 무시됩니다.")
+    return table
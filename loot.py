@@ -0,0 +1,164 @@
+import math
+import random
+from collections import Counter
+from dataclasses import dataclass
+
+class AliasTable:
+    """가중치 목록에서 인덱스 하나를 O(1)로 뽑는 별칭(alias) 표 (Vose 방식)
+
+    만들 때 O(n)으로 표를 준비하고, 뽑을 때는 항목 수와 관계없이 난수 두 개만 사용합니다.
+    """
+    __slots__ = ('_prob', '_alias', '_size')
+
+    def __init__(self, weights):
+        weights = list(weights)
+        size = len(weights)
+        total = sum(weights)
+        if size == 0 or total <= 0 or any(w < 0 for w in weights):
+            raise ValueError("가중치는 하나 이상이어야 하며, 음수가 없고 합이 0보다 커야 합니다.")
+
+        scaled = [w * size / total for w in weights]
+        prob = [1.0] * size
+        alias = list(range(size))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] += scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        # 남은 항목은 부동소수점 오차만큼만 1에서 벗어나 있으므로 확률 1로 둡니다.
+        self._prob = tuple(prob)
+        self._alias = tuple(alias)
+        self._size = size
+
+    def __len__(self):
+        return self._size
+
+    def sample(self, rng=random):
+        i = int(rng.random() * self._size)
+        return i if rng.random() < self._prob[i] else self._alias[i]
+
+@dataclass(frozen=True, slots=True)
+class LootEntry:
+    """전리품 항목. item_name이 None이면 '아무것도 없음'입니다.
+
+    weight는 배타 그룹에서는 상대 가중치, 독립 그룹에서는 획득 확률(0~1)입니다.
+    """
+    item_name: str | None
+    weight: float
+    min_quantity: int = 1
+    max_quantity: int = 1
+
+    def quantity(self, rng=random):
+        if self.min_quantity == self.max_quantity:
+            return self.min_quantity
+        return rng.randint(self.min_quantity, self.max_quantity)
+
+class ExclusiveGroup:
+    """항목 중 정확히 하나를 가중치에 따라 고르는 그룹 (낚시 결과처럼 서로 배타적인 결과)"""
+    __slots__ = ('entries', '_table')
+
+    def __init__(self, entries):
+        self.entries = tuple(entries)
+        self._table = AliasTable(entry.weight for entry in self.entries)
+
+    def roll(self, drops, rng=random):
+        entry = self.entries[self._table.sample(rng)]
+        if entry.item_name is not None:
+            drops[entry.item_name] += entry.quantity(rng)
+
+class IndependentGroup:
+    """항목마다 따로 확률을 굴리는 그룹 (몬스터 드롭처럼 여러 개가 함께 나올 수 있는 결과)
+
+    확률을 2의 거듭제곱 상한별로 묶은 뒤, 묶음 안에서는 다음 당첨 후보까지를 기하분포로 건너뛰고
+    실제 확률/상한 비율로 한 번 더 걸러냅니다. 그래서 비용은 항목 수가 아니라
+    묶음 수(최대 수십 개)와 실제로 나온 아이템 수에 비례합니다.
+    """
+    __slots__ = ('entries', '_buckets')
+
+    def __init__(self, entries):
+        self.entries = tuple(entries)
+        buckets = {}
+        for entry in self.entries:
+            if not 0 <= entry.weight <= 1:
+                raise ValueError(f"'{entry.item_name}'의 확률은 0~1 사이여야 합니다. ({entry.weight})")
+            if entry.weight == 0 or entry.item_name is None:
+                continue
+            exponent = min(60, math.floor(-math.log2(entry.weight))) # 상한 2^-exponent >= weight
+            buckets.setdefault(exponent, []).append(entry)
+        self._buckets = tuple((0.5 ** exponent, tuple(group)) for exponent, group in sorted(buckets.items()))
+
+    def roll(self, drops, rng=random):
+        for bound, entries in self._buckets:
+            if bound >= 1.0:
+                candidates = range(len(entries)) # 상한이 1이면 모든 항목이 후보입니다.
+            else:
+                candidates = _geometric_skips(len(entries), math.log1p(-bound), rng)
+            for i in candidates:
+                entry = entries[i]
+                if rng.random() * bound < entry.weight:
+                    drops[entry.item_name] += entry.quantity(rng)
+
+def _geometric_skips(size, log_miss, rng):
+    # 각 항목이 확률 bound로 후보가 될 때, 다음 후보까지의 간격을 한 번에 뽑습니다.
+    i = -1
+    while True:
+        i += 1 + int(math.log(1.0 - rng.random()) / log_miss)
+        if i >= size:
+            return
+        yield i
+
+_GROUP_TYPES = {"exclusive": ExclusiveGroup, "independent": IndependentGroup}
+
+class LootTable:
+    """여러 그룹으로 이루어진 전리품 표. 각 그룹을 순서대로 굴려 결과를 합칩니다."""
+    __slots__ = ('groups',)
+
+    def __init__(self, groups):
+        self.groups = tuple(groups)
+
+    @classmethod
+    def from_spec(cls, spec):
+        """[{"roll": "exclusive" | "independent", "entries": [(가중치, 아이템 이름, (최소, 최대)), ...]}, ...]
+
+        수량 범위는 생략할 수 있고(기본 1개), 숫자 하나면 고정 수량입니다.
+        """
+        groups = []
+        for group in spec:
+            entries = []
+            for entry in group["entries"]:
+                weight, item_name, *quantity = entry
+                low, high = _quantity_range(quantity[0] if quantity else 1)
+                entries.append(LootEntry(item_name, weight, low, high))
+            groups.append(_GROUP_TYPES[group["roll"]](entries))
+        return cls(groups)
+
+    @classmethod
+    def independent(cls, chances):
+        """{아이템 이름: 확률} 형태의 간단한 드롭 표"""
+        return cls([IndependentGroup(LootEntry(item_name, chance) for item_name, chance in chances.items())])
+
+    def roll(self, rng=random):
+        """한 번 굴려 [(아이템 이름, 수량), ...]을 반환합니다."""
+        drops = Counter()
+        for group in self.groups:
+            group.roll(drops, rng)
+        return list(drops.items())
+
+    def roll_many(self, count, rng=random):
+        """count번 굴린 결과를 합산한 Counter를 반환합니다. (밸런스 시뮬레이션용)"""
+        drops = Counter()
+        for _ in range(count):
+            for group in self.groups:
+                group.roll(drops, rng)
+        return drops
+
+def _quantity_range(quantity):
+    if isinstance(quantity, int):
+        return quantity, quantity
+    low, high = quantity
+    if not 0 < low <= high:
+        raise ValueError(f"수량 범위가 올바르지 않습니다: {quantity}")
+    return low, high
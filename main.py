@@ -2,12 +2,20 @@ import discord
 from discord.ext import commands, tasks
 from discord import app_commands
 import json
-import sqlite3
 import asyncio
 from collections import deque
-from werkzeug.security import generate_password_hash, check_password_hash
 from discord.ui import Modal, TextInput
-from database import setup_database
+from database import setup_database, CHAT_LOG_SIZE, SQL_CHAT_APPEND, SQL_CHAT_RECENT
+from db_manager import Database
+from player_cache import PlayerCache
+from effects import EffectScheduler
+from player_locks import PlayerLocks
+from panel_renderer import PanelRenderer
+from auth import PasswordHasher, AuthBusyError
+from world_map import WorldMap
+from monsters import MonsterRegistry
+from recipes import RecipeBook
+from item_manager import ItemManager
 from flask import Flask
 from threading import Thread
 import os # os 모듈 추가
@@ -73,11 +81,32 @@ except (ValueError, TypeError):
 
 
 # --- 봇 설정 ---
+class GameBot(commands.Bot):
+    async def setup_hook(self):
+        await self.db.start()
+        await self.player_cache.start()
+        await self.effects.start()
+        await self.panels.start()
+        await self.password_hasher.start()
+        self.world_map = await WorldMap.load(self.db)
+        self.monsters = await MonsterRegistry.load(self.db)
+        self.recipes = await RecipeBook.load(self.db)
+        await self.item_manager.reload(self.db)
+
+    async def close(self):
+        await self.panels.close()
+        await super().close()
+        await self.password_hasher.close()
+        await self.effects.close()
+        # 아직 저장되지 않은 플레이어 상태를 모두 반영한 뒤 DB를 닫습니다.
+        await self.player_cache.close()
+        await self.db.close()
+
 intents = discord.Intents.default()
 intents.members = True
 intents.messages = True
 intents.message_content = True
-bot = commands.Bot(command_prefix="!", intents=intents)
+bot = GameBot(command_prefix="!", intents=intents)
 
 # --- 설정값을 bot 객체에 저장 ---
 bot.game_channel_id = GAME_CHANNEL_ID
@@ -90,17 +119,23 @@ bot.channel_2_role_id = CHANNEL_2_ROLE_ID
 # --- 상태 변수 ---
 bot.chat_log_message = None
 bot.game_status_message = None
-bot.chat_history = deque(maxlen=10)
+bot.chat_history = deque(maxlen=CHAT_LOG_SIZE)
 bot.chat_lock = asyncio.Lock()
-
-# --- DB 헬퍼 ---
-def get_db_connection():
-    # timeout을 15초로 늘려 DB 잠금 오류를 줄입니다.
-    conn = sqlite3.connect('game.db', timeout=15)
-    # WAL 모드를 활성화하여 동시성(concurrency)을 높입니다.
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.row_factory = sqlite3.Row
-    return conn
+bot.game_status = {"title": "게임 정보", "content": "게임 상태 정보"}
+bot.panels = PanelRenderer()
+
+# --- DB 계층 (모든 SQL은 전용 스레드에서 실행됩니다) ---
+bot.db = Database('game.db')
+bot.player_cache = PlayerCache(bot.db)
+bot.effects = EffectScheduler(bot.db, bot.player_cache) # 버프/상태 이상 만료와 독 데미지
+bot.player_locks = PlayerLocks() # 같은 플레이어의 명령을 차례대로 실행합니다.
+bot.world_map = WorldMap() # 장소/이동 경로 (setup_hook에서 불러옵니다)
+bot.monsters = MonsterRegistry() # 몬스터 템플릿/지역별 출현 표 (setup_hook에서 불러옵니다)
+bot.recipes = RecipeBook() # 제작 레시피 그래프 (setup_hook에서 불러옵니다)
+bot.item_manager = ItemManager() # 아이템 카탈로그 (setup_hook에서 불러옵니다)
+
+# --- 비밀번호 해시 (scrypt는 프로세스 풀에서 계산합니다) ---
+bot.password_hasher = PasswordHasher()
 
 # --- UI (Modals, Views) ---
 class RegistrationModal(Modal, title="회원가입"):
@@ -108,18 +143,27 @@ class RegistrationModal(Modal, title="회원가입"):
     password = TextInput(label="비밀번호")
 
     async def on_submit(self, interaction: discord.Interaction):
-        conn = get_db_connection()
-        c = conn.cursor()
-        c.execute("SELECT * FROM players WHERE login_id = ?", (self.login_id.value,))
-        if c.fetchone():
-            await interaction.response.send_message("이미 사용 중인 아이디입니다.", ephemeral=True)
+        # 해시 계산이 몰리면 3초를 넘길 수 있으므로 먼저 응답을 미룹니다.
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        if await bot.db.fetchone("SELECT 1 FROM players WHERE login_id = ?", (self.login_id.value,)):
+            return await interaction.followup.send("이미 사용 중인 아이디입니다.", ephemeral=True)
+
+        try:
+            hashed_password = await bot.password_hasher.hash(interaction.user.id, self.password.value)
+        except AuthBusyError:
+            return await interaction.followup.send("이전 요청을 처리하고 있습니다. 잠시 후 다시 시도해주세요.", ephemeral=True)
+
+        def register(conn):
+            if conn.execute("SELECT 1 FROM players WHERE login_id = ?", (self.login_id.value,)).fetchone():
+                return False
+            conn.execute("INSERT INTO players (user_id, login_id, password_hash) VALUES (?, ?, ?)",
+                         (interaction.user.id, self.login_id.value, hashed_password))
+            return True
+
+        if await bot.db.run(register):
+            await interaction.followup.send("회원가입 완료! `/로그인`으로 접속해주세요.", ephemeral=True)
         else:
-            hashed_password = generate_password_hash(self.password.value)
-            c.execute("INSERT INTO players (user_id, login_id, password_hash) VALUES (?, ?, ?)",
-                      (interaction.user.id, self.login_id.value, hashed_password))
-            conn.commit()
-            await interaction.response.send_message("회원가입 완료! `/로그인`으로 접속해주세요.", ephemeral=True)
-        conn.close()
+            await interaction.followup.send("이미 사용 중인 아이디입니다.", ephemeral=True)
 
 class NicknameButtonView(discord.ui.View):
     def __init__(self, author_id: int):
@@ -141,23 +185,31 @@ class LoginModal(Modal, title="로그인"):
     password = TextInput(label="비밀번호")
 
     async def on_submit(self, interaction: discord.Interaction):
-        conn = get_db_connection()
-        c = conn.cursor()
-        c.execute("SELECT * FROM players WHERE login_id = ?", (self.login_id.value,))
-        player = c.fetchone()
-        conn.close()
+        # 해시 검증이 몰리면 3초를 넘길 수 있으므로 먼저 응답을 미룹니다.
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        player = await bot.db.fetchone("SELECT * FROM players WHERE login_id = ?", (self.login_id.value,))
 
-        if player and check_password_hash(player['password_hash'], self.password.value):
+        verified = False
+        if player:
+            try:
+                verified, new_hash = await bot.password_hasher.verify(interaction.user.id, player['password_hash'], self.password.value)
+            except AuthBusyError:
+                return await interaction.followup.send("이전 요청을 처리하고 있습니다. 잠시 후 다시 시도해주세요.", ephemeral=True)
+            if new_hash:
+                # 해시 파라미터가 바뀐 경우, 검증에 성공한 김에 새 방식으로 다시 저장합니다.
+                await bot.db.execute("UPDATE players SET password_hash = ? WHERE user_id = ?", (new_hash, player['user_id']))
+
+        if verified:
             if player['nickname']:
                 await handle_login_success(interaction, player, interaction.guild)
             else:
                 view = NicknameButtonView(author_id=interaction.user.id)
-                await interaction.response.send_message(
+                await interaction.followup.send(
                     f"{interaction.user.mention}, 로그인 성공! 게임을 시작하려면 닉네임을 설정해야 합니다.",
                     view=view, ephemeral=True
                 )
         else:
-            await interaction.response.send_message("아이디 또는 비밀번호가 일치하지 않습니다.", ephemeral=True)
+            await interaction.followup.send("아이디 또는 비밀번호가 일치하지 않습니다.", ephemeral=True)
 
 class NicknameModal(Modal, title="닉네임 설정"):
     def __init__(self, user_id: int, original_message: discord.Message):
@@ -168,19 +220,19 @@ class NicknameModal(Modal, title="닉네임 설정"):
     nickname = TextInput(label="게임에서 사용할 닉네임", min_length=2, max_length=15)
 
     async def on_submit(self, interaction: discord.Interaction):
-        conn = get_db_connection()
-        c = conn.cursor()
-        c.execute("SELECT * FROM players WHERE nickname = ?", (self.nickname.value,))
-        if c.fetchone():
+        def set_nickname(conn):
+            if conn.execute("SELECT 1 FROM players WHERE nickname = ?", (self.nickname.value,)).fetchone():
+                return None
+            conn.execute("UPDATE players SET nickname = ? WHERE user_id = ?", (self.nickname.value, self.user_id))
+            return conn.execute("SELECT * FROM players WHERE user_id = ?", (self.user_id,)).fetchone()
+
+        player = await bot.db.run(set_nickname)
+        if not player:
             await interaction.response.send_message("이미 사용 중인 닉네임입니다.", ephemeral=True)
-            conn.close()
             return
-        
-        c.execute("UPDATE players SET nickname = ? WHERE user_id = ?", (self.nickname.value, self.user_id))
-        conn.commit()
-        c.execute("SELECT * FROM players WHERE user_id = ?", (self.user_id,))
-        player = c.fetchone()
-        conn.close()
+        cached_player = bot.player_cache.peek(self.user_id)
+        if cached_player:
+            cached_player.nickname = self.nickname.value
         await handle_login_success(interaction, player, interaction.guild, self.original_message)
 
 # --- 로그인 성공 처리 ---
@@ -193,11 +245,9 @@ async def handle_login_success(interaction: discord.Interaction, player_data, gu
         if no_participant_role: await member.remove_roles(no_participant_role, reason="게임 참가")
         if participant_role: await member.add_roles(participant_role, reason="게임 참가")
         
-        conn = get_db_connection()
-        c = conn.cursor()
-        c.execute("UPDATE players SET current_location_id = 1 WHERE user_id = ?", (interaction.user.id,))
-        conn.commit()
-        conn.close()
+        state = await bot.player_cache.get(interaction.user.id)
+        if state is not None: # 다른 디스코드 계정으로 가입한 아이디면 이 사용자의 플레이어 행이 없습니다.
+            bot.player_cache.update(state, current_location_id=1)
 
         response_message = f"{player_data['nickname']}님, 환영합니다!"
         if message_to_edit and not interaction.response.is_done(): # 이미 응답된 상호작용이 아닌 경우에만 메시지 수정 시도
@@ -217,19 +267,26 @@ async def handle_login_success(interaction: discord.Interaction, player_data, gu
         print(f"역할 변경 또는 메시지 수정 오류: {e}")
         if not interaction.response.is_done():
             await interaction.response.send_message("처리 중 오류가 발생했습니다.", ephemeral=True)
+        else:
+            await interaction.followup.send("처리 중 오류가 발생했습니다.", ephemeral=True)
 
 # --- 헬퍼 함수: 임베드 업데이트 ---
+# 실제 메시지 편집은 PanelRenderer가 모아서 처리하므로, 아래 함수들은 패널을 dirty로 표시만 합니다.
+def render_chat_log():
+    return discord.Embed(title="채팅창", description='\n'.join(bot.chat_history) or "대화가 없습니다.", color=discord.Color.blue())
+
+def render_game_status():
+    return discord.Embed(title=bot.game_status["title"], description=bot.game_status["content"], color=discord.Color.gold())
+
+bot.panels.register("chat", lambda: bot.chat_log_message, render_chat_log)
+bot.panels.register("status", lambda: bot.game_status_message, render_game_status)
+
 async def update_chat_log(bot_instance):
-    if not bot_instance.chat_log_message: return
-    embed = discord.Embed(title="채팅창", description='\n'.join(bot_instance.chat_history) or "대화가 없습니다.", color=discord.Color.blue())
-    try: await bot_instance.chat_log_message.edit(embed=embed)
-    except discord.NotFound: print("채팅 로그 메시지를 찾을 수 없습니다.")
+    bot_instance.panels.mark_dirty("chat")
 
 async def update_game_status(bot_instance, content="게임 상태 정보", title="게임 정보"):
-    if not bot_instance.game_status_message: return
-    embed = discord.Embed(title=title, description=content, color=discord.Color.gold())
-    try: await bot_instance.game_status_message.edit(embed=embed)
-    except discord.NotFound: print("게임 상태 메시지를 찾을 수 없습니다.")
+    bot_instance.game_status = {"title": title, "content": content}
+    bot_instance.panels.mark_dirty("status")
 
 # --- 백그라운드 작업 ---
 @tasks.loop(seconds=60)
@@ -255,23 +312,18 @@ async def update_server_status():
 @bot.event
 async def on_ready():
     print(f'{bot.user}에 로그인하였습니다!')
-    conn = get_db_connection()
-    c = conn.cursor()
-    c.execute("SELECT chat_message_id, status_message_id FROM game_state WHERE id = 1")
-    state = c.fetchone()
+    state = await bot.db.fetchone("SELECT chat_message_id, status_message_id FROM game_state WHERE id = 1")
     if state and state['chat_message_id']:
         try:
             game_channel = bot.get_channel(GAME_CHANNEL_ID) or await bot.fetch_channel(GAME_CHANNEL_ID)
             bot.chat_log_message = await game_channel.fetch_message(state['chat_message_id'])
             bot.game_status_message = await game_channel.fetch_message(state['status_message_id'])
-            c.execute("SELECT message FROM chat_logs ORDER BY timestamp DESC LIMIT 10")
-            logs = c.fetchall()
+            logs = await bot.db.fetchall(SQL_CHAT_RECENT)
             bot.chat_history.extendleft([log['message'] for log in logs])
             await update_chat_log(bot)
             print("게임 상태가 복구되었습니다.")
         except Exception as e:
             print(f"메시지 복구 실패: {e}")
-    conn.close()
 
     print("Cog 로드를 시작합니다...")
     for cog_name in ["admin_cog", "game_cog"]:
@@ -315,20 +367,17 @@ async def login_command(interaction: discord.Interaction):
 
 @bot.tree.command(name="내정보", description="자신의 캐릭터 정보를 표시합니다.")
 async def profile(interaction: discord.Interaction):
-    conn = get_db_connection()
-    c = conn.cursor()
-    c.execute("SELECT p.*, l.name as location_name FROM players p JOIN locations l ON p.current_location_id = l.id WHERE p.user_id = ?", (interaction.user.id,))
-    player = c.fetchone()
-    conn.close()
+    player = await bot.player_cache.get(interaction.user.id)
 
     if player:
+        location_name = bot.world_map.location_name(player.current_location_id)
         info_text = (
             f"**닉네임:** {player['nickname']}\n"
             f"**직업:** {player['job']}\n"
             f"**레벨:** {player['level']} (EXP: {player['exp']})\n"
             f"**HP:** {player['hp']} / **MP:** {player['mp']}\n"
             f"**골드:** {player['gold']}\n"
-            f"**현재 위치:** {player['location_name']}"
+            f"**현재 위치:** {location_name}"
         )
         await interaction.response.send_message(info_text, ephemeral=True)
     else:
@@ -341,27 +390,21 @@ async def say(interaction: discord.Interaction, message: str):
     if interaction.channel_id != GAME_CHANNEL_ID:
         return await interaction.response.send_message("이 명령어는 게임 채널에서만 사용할 수 있습니다.", ephemeral=True)
     
-    conn = get_db_connection()
-    c = conn.cursor()
-    c.execute("SELECT nickname FROM players WHERE user_id = ?", (interaction.user.id,))
-    player = c.fetchone()
+    player = await bot.player_cache.get(interaction.user.id)
     
     if not player or not player['nickname']:
-        conn.close()
         return await interaction.response.send_message("채팅을 하기 전에 먼저 로그인하여 닉네임을 설정해야 합니다.", ephemeral=True)
 
     game_nickname = player['nickname']
     await interaction.response.send_message("메시지를 보내는 중...", ephemeral=True, delete_after=1)
     
+    formatted_message = f"**{game_nickname}**: {message}"
     async with bot.chat_lock:
-        formatted_message = f"**{game_nickname}**: {message}"
         bot.chat_history.append(formatted_message)
-        c.execute("INSERT INTO chat_logs (message) VALUES (?)", (formatted_message,))
-        c.execute("DELETE FROM chat_logs WHERE id NOT IN (SELECT id FROM chat_logs ORDER BY timestamp DESC LIMIT 10)")
-        conn.commit()
         await update_chat_log(bot)
-        
-    conn.close()
+    # DB 저장은 잠금 밖에서 기다립니다. 잠금을 푼 뒤 작성자 큐에 들어갈 때까지 멈추는 지점이 없으므로,
+    # 저장 순서는 채팅창에 추가된 순서와 같습니다.
+    await bot.db.execute(SQL_CHAT_APPEND, (formatted_message,))
 
 # --- 봇 실행 ---
 if __name__ == '__main__':
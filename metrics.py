@@ -0,0 +1,23 @@
+from collections import deque
+
+class LatencyStats:
+    """최근 소요 시간 표본으로 p50/p95/최대값을 계산합니다. (이벤트 루프에서만 사용합니다)"""
+
+    def __init__(self, sample_size=500):
+        self._samples = deque(maxlen=sample_size)
+        self.count = 0
+
+    def record(self, seconds):
+        self.count += 1
+        self._samples.append(seconds)
+
+    def snapshot(self):
+        samples = sorted(self._samples)
+        if not samples:
+            return {"count": self.count, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        return {
+            "count": self.count,
+            "p50_ms": samples[len(samples) // 2] * 1000,
+            "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+            "max_ms": samples[-1] * 1000,
+        }
@@ -0,0 +1,75 @@
+import random
+from dataclasses import dataclass
+
+from loot import AliasTable, LootEntry, IndependentGroup, LootTable
+
+@dataclass(frozen=True, slots=True)
+class Monster:
+    """몬스터 템플릿. 모든 전투가 같은 객체를 공유하므로 변경하지 않습니다."""
+    id: int
+    name: str
+    hp: int
+    attack: int
+    gold: int
+    exp: int
+    loot: LootTable
+
+def _load_rows(conn):
+    monsters = conn.execute("SELECT id, name, hp, attack, gold, exp FROM monsters ORDER BY id").fetchall()
+    drops = conn.execute(
+        "SELECT md.monster_id, i.name, md.chance, md.min_quantity, md.max_quantity "
+        "FROM monster_drops md JOIN items i ON md.item_id = i.id ORDER BY md.monster_id, md.item_id"
+    ).fetchall()
+    spawns = conn.execute("SELECT location_id, monster_name, weight FROM location_monsters ORDER BY location_id, monster_name").fetchall()
+    return monsters, drops, spawns
+
+class MonsterRegistry:
+    """몬스터 템플릿과 지역별 출현 표. 만들어진 뒤에는 바뀌지 않습니다.
+
+    지역마다 출현 가중치로 별칭 표를 미리 만들어 두므로, 탐험 중 만남 판정은 SQL 없이 O(1)입니다.
+    """
+
+    def __init__(self, monster_rows=(), drop_rows=(), spawn_rows=()):
+        drops = {}
+        for monster_id, item_name, chance, min_quantity, max_quantity in drop_rows:
+            drops.setdefault(monster_id, []).append(LootEntry(item_name, chance, min_quantity, max_quantity))
+
+        self.by_id = {}
+        self.by_name = {}
+        for monster_id, name, hp, attack, gold, exp in monster_rows:
+            loot = LootTable([IndependentGroup(drops.get(monster_id, ()))])
+            monster = Monster(monster_id, name, hp, attack, gold, exp, loot)
+            self.by_id[monster_id] = monster
+            self.by_name[name] = monster
+
+        spawns = {}
+        for location_id, monster_name, weight in spawn_rows:
+            monster = self.by_name.get(monster_name)
+            if monster is None:
+                print(f"경고: 지역 {location_id}의 출현 몬스터 '{monster_name}'을(를) 찾을 수 없습니다.")
+                continue
+            if weight > 0:
+                spawns.setdefault(location_id, []).append((monster, weight))
+        # 지역 id -> (몬스터 목록, 별칭 표)
+        self._encounters = {
+            location_id: (tuple(monster for monster, _ in entries), AliasTable(weight for _, weight in entries))
+            for location_id, entries in spawns.items()
+        }
+
+    @classmethod
+    async def load(cls, db):
+        return cls(*(await db.read(_load_rows)))
+
+    def get(self, name):
+        return self.by_name.get(name)
+
+    def has_encounters(self, location_id):
+        return location_id in self._encounters
+
+    def encounter(self, location_id, rng=random):
+        """지역의 출현 가중치에 따라 몬스터 하나를 고릅니다. 몬스터가 없는 지역이면 None"""
+        entry = self._encounters.get(location_id)
+        if entry is None:
+            return None
+        monsters, table = entry
+        return monsters[table.sample(rng)]
@@ -0,0 +1,123 @@
+import asyncio
+import hashlib
+import json
+import time
+
+import discord
+
+class Panel:
+    """공유 메시지 하나(채팅창, 상태창 등)의 갱신 상태"""
+    __slots__ = ('name', 'get_message', 'render', 'dirty', 'last_hash', 'last_message_id', 'last_edit', 'retry_at')
+
+    def __init__(self, name, get_message, render):
+        self.name = name
+        self.get_message = get_message # 현재 편집할 discord.Message를 돌려주는 함수
+        self.render = render           # 최신 상태로 discord.Embed를 만드는 함수
+        self.dirty = False
+        self.last_hash = None
+        self.last_message_id = None
+        self.last_edit = 0.0
+        self.retry_at = 0.0
+
+class PanelRenderer:
+    """공유 임베드 메시지 편집을 모아서 처리합니다.
+
+    mark_dirty()는 즉시 반환하고, 실제 편집은 백그라운드 작업이 패널마다 min_interval 초에 한 번만 합니다.
+    그 사이에 들어온 변경은 하나의 편집으로 합쳐지며, 내용 해시가 이전과 같으면 편집을 건너뜁니다.
+    429 응답을 받으면 Retry-After 헤더만큼 해당 패널의 편집을 미룹니다.
+    """
+
+    def __init__(self, min_interval=2.0):
+        self.min_interval = min_interval
+        self._panels = {}
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.edits = 0
+        self.skipped = 0
+
+    def register(self, name, get_message, render):
+        self._panels[name] = Panel(name, get_message, render)
+
+    def mark_dirty(self, name):
+        self._panels[name].dirty = True
+        self._wakeup.set()
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            next_due = None
+            for panel in self._panels.values():
+                if not panel.dirty:
+                    continue
+                due = max(panel.last_edit + self.min_interval, panel.retry_at)
+                now = time.monotonic()
+                if now < due:
+                    next_due = due if next_due is None else min(next_due, due)
+                    continue
+                await self._flush(panel)
+                if panel.dirty: # 편집 중 다시 변경되었거나 재시도가 필요한 경우
+                    due = max(panel.last_edit + self.min_interval, panel.retry_at)
+                    next_due = due if next_due is None else min(next_due, due)
+
+            if next_due is not None:
+                # 아직 시간이 되지 않은 패널이 있으면 그때 다시 깨어납니다.
+                delay = max(0.0, next_due - time.monotonic())
+                asyncio.get_running_loop().call_later(delay, self._wakeup.set)
+
+    async def _flush(self, panel):
+        message = panel.get_message()
+        panel.dirty = False
+        if message is None:
+            return
+
+        embed = panel.render()
+        content_hash = hashlib.sha1(json.dumps(embed.to_dict(), sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+        if message.id == panel.last_message_id and content_hash == panel.last_hash:
+            self.skipped += 1
+            return
+
+        try:
+            await message.edit(embed=embed)
+        except discord.NotFound:
+            print(f"'{panel.name}' 메시지를 찾을 수 없습니다.")
+            return
+        except discord.HTTPException as e:
+            if e.status != 429:
+                print(f"'{panel.name}' 메시지 수정 중 오류 발생: {e}")
+                return
+            panel.retry_at = time.monotonic() + _retry_after(e)
+            panel.dirty = True
+            return
+        finally:
+            panel.last_edit = time.monotonic()
+
+        panel.last_hash = content_hash
+        panel.last_message_id = message.id
+        self.edits += 1
+
+def _retry_after(error, default=5.0):
+    """429 응답의 헤더에서 다시 시도할 때까지의 시간(초)을 읽습니다."""
+    headers = getattr(error.response, 'headers', None) or {}
+    for key in ('Retry-After', 'X-RateLimit-Reset-After'):
+        value = headers.get(key)
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+    return default
@@ -0,0 +1,162 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+# 캐시에 올리는 players 열 (로그인 정보는 제외)
+PLAYER_COLUMNS = (
+    'user_id', 'nickname', 'level', 'hp', 'mp', 'gold', 'exp', 'current_location_id', 'job', 'skp',
+    'attack_buff_until', 'status_effect', 'status_effect_end_time', 'status_effect_value',
+    'strength', 'swordsmanship', 'recovery', 'observation', 'water_magic', 'sight',
+)
+# 플러시 시 DB에 다시 쓰는 열. 닉네임은 NicknameModal에서 직접 DB에 쓰므로 제외합니다.
+WRITABLE_COLUMNS = tuple(col for col in PLAYER_COLUMNS if col not in ('user_id', 'nickname'))
+
+_SELECT_PLAYER_SQL = f"SELECT {', '.join(PLAYER_COLUMNS)} FROM players WHERE user_id = ?"
+_FLUSH_PLAYER_SQL = f"UPDATE players SET {', '.join(f'{col} = ?' for col in WRITABLE_COLUMNS)} WHERE user_id = ?"
+
+class PlayerState:
+    """캐시에 올라간 플레이어 한 명의 상태"""
+    __slots__ = PLAYER_COLUMNS + ('dirty', 'last_access')
+
+    def __init__(self, row):
+        for col in PLAYER_COLUMNS:
+            setattr(self, col, row[col])
+        self.dirty = False
+        self.last_access = time.monotonic()
+
+    def __getitem__(self, key):
+        # 기존 sqlite3.Row처럼 player['hp'] 형태로도 읽을 수 있게 합니다.
+        return getattr(self, key)
+
+    def flush_params(self):
+        return tuple(getattr(self, col) for col in WRITABLE_COLUMNS) + (self.user_id,)
+
+class PlayerCache:
+    """players 테이블의 write-behind 캐시
+
+    첫 접근 시 행을 불러오고, 변경된 행은 dirty로 표시했다가 주기적으로(그리고 종료 시)
+    한 번의 executemany로 game.db에 반영합니다. 오래 쓰이지 않은 플레이어는 LRU 순서로 내보냅니다.
+    """
+
+    def __init__(self, db, flush_interval=5.0, max_entries=2000, idle_ttl=900.0):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self.idle_ttl = idle_ttl
+        self._entries = OrderedDict() # user_id -> PlayerState (오래된 순)
+        self._dirty = {} # user_id -> PlayerState
+        self._loading = {}
+        self._flush_task = None
+
+    async def start(self):
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        try:
+            await self.flush()
+        except Exception:
+            # 종료는 계속 진행해야 DB 작성자와 연결 풀도 닫힙니다. 저장하지 못한 상태는 복구할 수 있도록 남깁니다.
+            print(f"종료 시 저장하지 못한 플레이어 상태 ({', '.join(WRITABLE_COLUMNS)}, user_id):")
+            for state in self._dirty.values():
+                print(f"  {state.flush_params()}")
+
+    async def get(self, user_id):
+        """플레이어 상태를 반환합니다. 캐시에 없으면 DB에서 한 번 불러오며, 없는 플레이어는 None입니다."""
+        state = self._entries.get(user_id)
+        if state is not None:
+            self._entries.move_to_end(user_id)
+            state.last_access = time.monotonic()
+            return state
+
+        # 같은 플레이어를 동시에 여러 번 불러오지 않도록 진행 중인 로드를 공유합니다.
+        pending = self._loading.get(user_id)
+        if pending is None:
+            pending = asyncio.ensure_future(self.db.fetchone(_SELECT_PLAYER_SQL, (user_id,)))
+            self._loading[user_id] = pending
+            pending.add_done_callback(lambda _: self._loading.pop(user_id, None))
+        row = await pending
+        if row is None:
+            return None
+
+        # 로드하는 동안 다른 작업이 먼저 올려 두었다면 그쪽을 사용합니다.
+        state = self._entries.get(user_id)
+        if state is None:
+            state = PlayerState(row)
+            self._entries[user_id] = state
+            self._evict_overflow()
+        return state
+
+    def peek(self, user_id):
+        """DB를 조회하지 않고 캐시에 있는 상태만 반환합니다."""
+        return self._entries.get(user_id)
+
+    def update(self, state, **changes):
+        """상태를 변경하고 dirty로 표시합니다. 실제 DB 반영은 다음 플러시 때 이루어집니다."""
+        for col, value in changes.items():
+            setattr(state, col, value)
+        state.dirty = True
+        self._dirty[state.user_id] = state
+        # 오래 들고 있던 상태(예: 긴 전투)가 그 사이 내보내졌다면 다시 캐시에 올립니다.
+        if self._entries.get(state.user_id) is not state:
+            self._entries[state.user_id] = state
+
+    def apply_persisted(self, state, **changes):
+        """이미 DB에 반영된(또는 곧 반영될) 변경을 메모리에만 적용합니다. dirty로 표시하지 않습니다."""
+        for col, value in changes.items():
+            setattr(state, col, value)
+
+    async def flush(self):
+        """dirty 상태인 플레이어를 하나의 트랜잭션으로 DB에 씁니다."""
+        if not self._dirty:
+            return 0
+        states, self._dirty = list(self._dirty.values()), {}
+        params = []
+        for state in states:
+            state.dirty = False
+            params.append(state.flush_params())
+        try:
+            await self.db.executemany(_FLUSH_PLAYER_SQL, params)
+        except Exception as e:
+            print(f"플레이어 상태 플러시 실패 ({len(params)}명): {e}")
+            for state in states:
+                state.dirty = True
+                self._dirty.setdefault(state.user_id, state)
+            raise
+        return len(params)
+
+    def _evict_overflow(self):
+        # 가장 오래 쓰이지 않은 플레이어부터 내보내되, 아직 저장되지 않은 상태는 남겨둡니다.
+        if len(self._entries) <= self.max_entries:
+            return
+        for user_id in list(self._entries):
+            if len(self._entries) <= self.max_entries:
+                break
+            if not self._entries[user_id].dirty:
+                del self._entries[user_id]
+
+    def _evict_idle(self):
+        cutoff = time.monotonic() - self.idle_ttl
+        for user_id in list(self._entries):
+            state = self._entries[user_id]
+            if state.last_access > cutoff:
+                break # 이후 항목은 더 최근에 사용되었습니다.
+            if not state.dirty:
+                del self._entries[user_id]
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                pass # flush()가 이미 로그를 남기고 다시 dirty로 표시했습니다.
+            self._evict_idle()
+            self._evict_overflow()
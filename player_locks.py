@@ -0,0 +1,77 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from metrics import LatencyStats
+
+class PlayerBusyError(Exception):
+    """같은 플레이어의 명령이 이미 너무 많이 대기 중일 때 발생합니다."""
+
+class _PlayerSlot:
+    __slots__ = ('lock', 'users')
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0 # 잠금을 가진 명령 + 기다리는 명령 수
+
+class PlayerLocks:
+    """플레이어별 명령 직렬화
+
+    같은 플레이어의 명령은 hold()로 잠금을 얻은 순서(FIFO)대로 하나씩 실행되고, 다른 플레이어끼리는
+    서로 기다리지 않습니다. 플레이어마다 대기열 길이를 max_pending으로 제한하며, 쓰이지 않는 잠금은
+    바로 정리합니다.
+
+    전투처럼 여러 상호작용에 걸친 행동은 잠금 대신 begin_activity()/end_activity()로 표시합니다.
+    """
+
+    def __init__(self, max_pending=3):
+        self.max_pending = max_pending
+        self.wait_stats = LatencyStats()
+        self.contended = 0 # 다른 명령이 끝나기를 기다린 횟수
+        self.rejected = 0
+        self._slots = {}      # user_id -> _PlayerSlot
+        self._activities = {} # user_id -> 진행 중인 행동 이름
+
+    @asynccontextmanager
+    async def hold(self, user_id):
+        slot = self._slots.get(user_id)
+        if slot is None:
+            slot = self._slots[user_id] = _PlayerSlot()
+        if slot.users >= self.max_pending:
+            self.rejected += 1
+            raise PlayerBusyError()
+        slot.users += 1
+        started = time.perf_counter()
+        try:
+            if slot.lock.locked():
+                self.contended += 1
+            async with slot.lock:
+                self.wait_stats.record(time.perf_counter() - started)
+                yield
+        finally:
+            slot.users -= 1
+            if not slot.users:
+                del self._slots[user_id]
+
+    def activity(self, user_id):
+        """진행 중인 행동 이름. 없으면 None"""
+        return self._activities.get(user_id)
+
+    def begin_activity(self, user_id, name):
+        """행동을 시작합니다. 이미 다른 행동 중이면 False를 반환합니다. (확인과 등록 사이에 await가 없습니다)"""
+        if user_id in self._activities:
+            return False
+        self._activities[user_id] = name
+        return True
+
+    def end_activity(self, user_id):
+        self._activities.pop(user_id, None)
+
+    def stats(self):
+        return {
+            "wait": self.wait_stats.snapshot(),
+            "contended": self.contended,
+            "rejected": self.rejected,
+            "locked": len(self._slots),
+            "activities": len(self._activities),
+        }
@@ -0,0 +1,207 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from hangul_search import HangulIndex
+from inventory import held_quantities, stack_space, craft_items
+
+class RecipeCycleError(ValueError):
+    """레시피가 서로를 재료로 요구해 제작 순서를 정할 수 없을 때 발생합니다."""
+
+class CraftInterrupted(Exception):
+    """계획한 단계를 끝까지 만들지 못했을 때 트랜잭션을 되돌리기 위해 사용합니다."""
+
+@dataclass(frozen=True, slots=True)
+class Recipe:
+    product: str
+    materials: tuple # ((재료 이름, 1개당 필요 수량), ...)
+
+@dataclass(frozen=True, slots=True)
+class CraftPlan:
+    """제작 계획. steps는 재료부터 완성품까지 실행할 순서입니다."""
+    product: str
+    quantity: int
+    steps: tuple     # ((만들 아이템, 개수), ...)
+    consumed: dict   # 인벤토리에서 소모할 아이템 -> 수량 (중간 재료 포함)
+    shortages: dict  # 부족한 기초 재료 -> 부족한 수량
+
+    @property
+    def feasible(self):
+        return not self.shortages
+
+def _load_rows(conn):
+    return conn.execute(
+        "SELECT p.name, m.name, r.quantity FROM recipes r "
+        "JOIN items p ON r.product_id = p.id JOIN items m ON r.material_id = m.id "
+        "ORDER BY p.name, m.name"
+    ).fetchall()
+
+class RecipeBook:
+    """레시피 의존 그래프. 만들어진 뒤에는 바뀌지 않습니다.
+
+    만들 때 순환을 검사하고, 레시피마다 기초 재료 합계와 (사용하는 쪽이 먼저 오는) 하위 레시피 순서를
+    처음 요청될 때 계산해 둡니다. 레시피가 바뀌면 새 RecipeBook을 만들므로 캐시도 그때만 버려집니다.
+    """
+
+    def __init__(self, rows=()):
+        self.rows = tuple(tuple(row) for row in rows)
+        materials = {}
+        for product, material, quantity in self.rows:
+            materials.setdefault(product, []).append((material, quantity))
+        self.recipes = {product: Recipe(product, tuple(entries)) for product, entries in materials.items()}
+        self._check_cycles()
+        self.index = HangulIndex(self.recipes)
+        self._raw_cache = {}
+        self._order_cache = {}
+
+    @classmethod
+    async def load(cls, db, previous=None):
+        """DB에서 레시피를 읽습니다. 이전 RecipeBook과 내용이 같으면 캐시를 유지하도록 그대로 돌려줍니다."""
+        book = cls(await db.read(_load_rows))
+        if previous is not None and previous.rows == book.rows:
+            return previous
+        return book
+
+    def _check_cycles(self):
+        # 깊이 우선 탐색으로 진행 중인 경로에 다시 들어오는 간선이 있으면 순환입니다.
+        done, path = set(), []
+        on_path = set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in on_path:
+                cycle = path[path.index(name):] + [name]
+                raise RecipeCycleError("레시피 순환: " + " → ".join(cycle))
+            recipe = self.recipes.get(name)
+            if recipe is None:
+                return
+            on_path.add(name)
+            path.append(name)
+            for material, _ in recipe.materials:
+                visit(material)
+            path.pop()
+            on_path.discard(name)
+            done.add(name)
+
+        for name in self.recipes:
+            visit(name)
+
+    def get(self, name):
+        return self.recipes.get(name)
+
+    def __contains__(self, name):
+        return name in self.recipes
+
+    def raw_materials(self, name):
+        """1개를 처음부터 만드는 데 필요한 기초 재료 합계 (재료 -> 수량)"""
+        cached = self._raw_cache.get(name)
+        if cached is not None:
+            return cached
+        recipe = self.recipes.get(name)
+        totals = {}
+        if recipe is None:
+            totals[name] = 1
+        else:
+            for material, quantity in recipe.materials:
+                for raw, amount in self.raw_materials(material).items():
+                    totals[raw] = totals.get(raw, 0) + amount * quantity
+        result = self._raw_cache[name] = MappingProxyType(totals)
+        return result
+
+    def tree(self, name, quantity=1, depth=0):
+        """재료 트리를 (깊이, 이름, 수량) 목록으로 펼칩니다."""
+        lines = [(depth, name, quantity)]
+        recipe = self.recipes.get(name)
+        if recipe is not None:
+            for material, amount in recipe.materials:
+                lines.extend(self.tree(material, amount * quantity, depth + 1))
+        return lines
+
+    def order(self, name):
+        """name과 그 하위 재료들을, 재료를 사용하는 아이템이 항상 먼저 오도록 정렬한 목록"""
+        cached = self._order_cache.get(name)
+        if cached is not None:
+            return cached
+        # 후위 순서(재료 먼저)를 뒤집으면 사용하는 쪽이 먼저 오는 위상 순서가 됩니다.
+        postorder, seen = [], set()
+        def visit(node):
+            if node in seen:
+                return
+            seen.add(node)
+            recipe = self.recipes.get(node)
+            if recipe is not None:
+                for material, _ in recipe.materials:
+                    visit(material)
+            postorder.append(node)
+        visit(name)
+        result = self._order_cache[name] = tuple(reversed(postorder))
+        return result
+
+    def plan(self, name, quantity, held):
+        """보유 수량(held: 이름 -> 수량)으로 name을 quantity개 만드는 계획을 세웁니다.
+
+        중간 재료는 가지고 있는 것을 먼저 쓰고, 모자란 만큼만 만듭니다. 완성품은 보유량과 상관없이 새로 만듭니다.
+        """
+        needs = {name: quantity}
+        steps, consumed, shortages = [], {}, {}
+        for node in self.order(name):
+            need = needs.get(node, 0)
+            if not need:
+                continue
+            if node != name:
+                use = min(need, held.get(node, 0))
+                if use:
+                    consumed[node] = use
+                need -= use
+            if not need:
+                continue
+            recipe = self.recipes.get(node)
+            if recipe is None:
+                shortages[node] = need
+                continue
+            steps.append((node, need))
+            for material, amount in recipe.materials:
+                needs[material] = needs.get(material, 0) + amount * need
+        steps.reverse() # 재료부터 만듭니다.
+        return CraftPlan(name, quantity, tuple(steps), consumed, shortages)
+
+    def max_craftable(self, name, held, limit=99):
+        """보유 수량으로 만들 수 있는 최대 개수 (limit 이하)"""
+        if name not in self.recipes or limit <= 0 or not self.plan(name, 1, held).feasible:
+            return 0
+        # 가능 여부는 개수에 대해 단조이므로 이분 탐색합니다.
+        low, high = 1, limit
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.plan(name, middle, held).feasible:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+def craft_planned(conn, user_id, book, catalog, name, quantity):
+    """보유 수량을 한 번에 읽어 계획을 세우고, 가능한 만큼 모든 단계를 같은 트랜잭션에서 제작합니다.
+
+    (실제 계획, 만든 개수)를 반환합니다. 하나도 만들 수 없으면 1개 기준 계획과 0을 돌려줍니다.
+    """
+    items = {node: catalog.get_item_by_name(node) for node in book.order(name)}
+    missing = [node for node, item in items.items() if item is None]
+    if missing:
+        raise KeyError(f"아이템 정보를 찾을 수 없습니다: {', '.join(missing)}")
+
+    held_by_id = held_quantities(conn, user_id, [item.id for item in items.values()])
+    held = {node: held_by_id[item.id] for node, item in items.items()}
+    product = items[name]
+    count = book.max_craftable(name, held, min(quantity, stack_space(product, held[name])))
+    if count <= 0:
+        return book.plan(name, 1, held), 0
+
+    plan = book.plan(name, count, held)
+    for step, step_count in plan.steps:
+        recipe = book.get(step)
+        materials = [(items[material].id, amount) for material, amount in recipe.materials]
+        crafted, _ = craft_items(conn, user_id, items[step], materials, step_count)
+        if crafted != step_count:
+            # 중간 재료가 보관 한도에 걸린 경우입니다. 지금까지의 단계도 모두 되돌립니다.
+            raise CraftInterrupted(step)
+    return plan, count
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 테스트는 저장소 루트의 모듈을 그대로 가져옵니다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,101 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from database import setup_database
+from db_manager import Database
+from inventory import GrantResult, craft_items, grant_items, grant_items_bulk, held_quantities
+from item_manager import ITEM_COLUMNS, ItemCatalog
+from recipes import CraftInterrupted, RecipeBook, craft_planned
+
+PLAYER = 1
+
+@pytest.fixture
+def db_path(tmp_path):
+    """마이그레이션과 초기 데이터가 적용된 임시 DB"""
+    path = str(tmp_path / "game.db")
+    setup_database(path)
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany("INSERT INTO players (user_id, login_id, password_hash) VALUES (?, ?, ?)",
+                         [(PLAYER, "player1", "x"), (2, "player2", "x")])
+    conn.close()
+    return path
+
+@pytest.fixture
+def conn(db_path):
+    conn = sqlite3.connect(db_path)
+    yield conn
+    conn.close()
+
+@pytest.fixture
+def catalog(conn):
+    return ItemCatalog(conn.execute(f"SELECT {', '.join(ITEM_COLUMNS)} FROM items ORDER BY id").fetchall())
+
+def give(conn, user_id, item, quantity):
+    conn.execute("INSERT INTO player_inventory (user_id, item_id, quantity, durability) VALUES (?, ?, ?, ?)",
+                 (user_id, item.id, quantity, item.max_durability))
+    conn.commit()
+
+def inventory(conn, user_id):
+    return dict(conn.execute("SELECT item_id, quantity FROM player_inventory WHERE user_id = ?", (user_id,)).fetchall())
+
+def test_craft_short_of_materials_changes_nothing(conn, catalog):
+    twig, leaf = catalog.get_item_by_name("나뭇가지"), catalog.get_item_by_name("질긴 나뭇잎")
+    give(conn, PLAYER, twig, 4)
+    give(conn, PLAYER, leaf, 2)
+    before = inventory(conn, PLAYER)
+
+    crafted, held = craft_items(conn, PLAYER, catalog.get_item_by_name("낡은 낚싯대"), [(twig.id, 5), (leaf.id, 2)])
+
+    assert crafted == 0
+    assert held[twig.id] == 4
+    assert inventory(conn, PLAYER) == before
+
+def test_interrupted_plan_rolls_back_every_step(db_path, conn, catalog):
+    # 겹칠 수 있는 완성품이 겹칠 수 없는 중간 재료(낡은 낚싯대)를 2개 요구하도록 만든 테스트용 레시피입니다.
+    book = RecipeBook([
+        ("낡은 낚싯대", "나뭇가지", 5),
+        ("낡은 낚싯대", "질긴 나뭇잎", 2),
+        ("기초 회복 물약", "낡은 낚싯대", 1),
+    ])
+    give(conn, PLAYER, catalog.get_item_by_name("나뭇가지"), 10)
+    give(conn, PLAYER, catalog.get_item_by_name("질긴 나뭇잎"), 4)
+    before = inventory(conn, PLAYER)
+
+    async def craft():
+        db = Database(db_path)
+        await db.start()
+        try:
+            return await db.run(craft_planned, PLAYER, book, catalog, "기초 회복 물약", 2)
+        finally:
+            await db.close()
+
+    # 낡은 낚싯대는 1개까지만 가질 수 있으므로 두 번째를 만들지 못하고, 첫 단계의 재료 소모도 되돌려집니다.
+    with pytest.raises(CraftInterrupted):
+        asyncio.run(craft())
+    assert inventory(conn, PLAYER) == before
+    rod = catalog.get_item_by_name("낡은 낚싯대")
+    assert held_quantities(conn, PLAYER, [rod.id]) == {rod.id: 0}
+
+def test_bulk_grant_reports_overflow_per_player(conn, catalog):
+    twig = catalog.get_item_by_name("나뭇가지")
+    give(conn, 2, twig, twig.max_stack - 3)
+
+    results = grant_items_bulk(conn, {PLAYER: {twig: 5}, 2: {twig: 5}})
+
+    assert results[PLAYER] == GrantResult({"나뭇가지": 5}, {})
+    assert results[2] == GrantResult({"나뭇가지": 3}, {"나뭇가지": 2})
+    assert inventory(conn, PLAYER) == {twig.id: 5}
+    assert inventory(conn, 2) == {twig.id: twig.max_stack}
+
+def test_non_stackable_item_is_capped_at_one(conn, catalog):
+    pickaxe = catalog.get_item_by_name("낡은 곡괭이")
+    assert not pickaxe.stackable
+
+    assert grant_items(conn, PLAYER, {pickaxe: 3}) == GrantResult({"낡은 곡괭이": 1}, {"낡은 곡괭이": 2})
+    assert grant_items(conn, PLAYER, {pickaxe: 1}) == GrantResult({}, {"낡은 곡괭이": 1})
+    row = conn.execute("SELECT quantity, durability FROM player_inventory WHERE user_id = ? AND item_id = ?",
+                       (PLAYER, pickaxe.id)).fetchone()
+    assert row == (1, pickaxe.max_durability)
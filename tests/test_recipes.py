@@ -0,0 +1,52 @@
+import pytest
+
+from recipes import RecipeBook, RecipeCycleError
+
+# 중간 재료가 있는 레시피 (완성품, 재료, 수량). 실제 초기 데이터와 무관한 테스트용 데이터입니다.
+NESTED_ROWS = [
+    ("낡은 낚싯대", "나뭇가지", 5),
+    ("낡은 낚싯대", "질긴 나뭇잎", 2),
+    ("튼튼한 낚싯대", "낡은 낚싯대", 1),
+    ("튼튼한 낚싯대", "나뭇가지", 5),
+    ("튼튼한 낚싯대", "질긴 나뭇잎", 3),
+]
+
+@pytest.fixture
+def book():
+    return RecipeBook(NESTED_ROWS)
+
+def test_raw_materials_expand_intermediates(book):
+    assert dict(book.raw_materials("튼튼한 낚싯대")) == {"나뭇가지": 10, "질긴 나뭇잎": 5}
+
+def test_order_puts_consumers_first(book):
+    order = book.order("튼튼한 낚싯대")
+    assert order[0] == "튼튼한 낚싯대"
+    assert order.index("낡은 낚싯대") < order.index("나뭇가지")
+
+def test_plan_crafts_missing_intermediates_first(book):
+    plan = book.plan("튼튼한 낚싯대", 2, {"나뭇가지": 20, "질긴 나뭇잎": 10})
+    assert plan.feasible
+    assert plan.steps == (("낡은 낚싯대", 2), ("튼튼한 낚싯대", 2))
+    assert plan.consumed == {"나뭇가지": 20, "질긴 나뭇잎": 10}
+
+def test_plan_uses_held_intermediates(book):
+    plan = book.plan("튼튼한 낚싯대", 2, {"낡은 낚싯대": 1, "나뭇가지": 15, "질긴 나뭇잎": 8})
+    assert plan.feasible
+    assert plan.steps == (("낡은 낚싯대", 1), ("튼튼한 낚싯대", 2))
+    assert plan.consumed == {"낡은 낚싯대": 1, "나뭇가지": 15, "질긴 나뭇잎": 8}
+
+def test_plan_reports_raw_shortages(book):
+    plan = book.plan("튼튼한 낚싯대", 1, {"나뭇가지": 7})
+    assert not plan.feasible
+    assert plan.shortages == {"나뭇가지": 3, "질긴 나뭇잎": 5}
+
+def test_max_craftable(book):
+    held = {"낡은 낚싯대": 1, "나뭇가지": 25, "질긴 나뭇잎": 20}
+    # 1개는 낡은 낚싯대로 (5, 3), 나머지는 (10, 5)씩: 5 + 10 * 2 = 25
+    assert book.max_craftable("튼튼한 낚싯대", held) == 3
+    assert book.max_craftable("튼튼한 낚싯대", held, limit=2) == 2
+    assert book.max_craftable("나뭇가지", held) == 0
+
+def test_cycle_is_rejected():
+    with pytest.raises(RecipeCycleError):
+        RecipeBook([("가", "나", 1), ("나", "가", 1)])
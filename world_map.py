@@ -0,0 +1,137 @@
+import json
+from collections import deque
+from dataclasses import dataclass
+
+from hangul_search import HangulIndex
+from location_actions import compile_location_actions
+
+@dataclass(frozen=True, slots=True)
+class Location:
+    """locations 테이블의 한 행. actions는 로드할 때 한 번만 파싱합니다."""
+    id: int
+    name: str
+    description: str
+    actions: tuple = ()
+
+def _load_rows(conn):
+    locations = conn.execute("SELECT id, name, description, actions FROM locations ORDER BY id").fetchall()
+    connections = conn.execute("SELECT from_location_id, to_location_id FROM map_connections ORDER BY rowid").fetchall()
+    return locations, connections
+
+class WorldMap:
+    """장소와 이동 경로를 메모리에 올린 인접 리스트. 만들어진 뒤에는 바뀌지 않습니다.
+
+    만들 때 모든 장소 쌍의 최단 경로(다음에 이동할 장소와 거리)를 BFS로 미리 계산하므로,
+    여행 경로 확인과 계산은 DB 없이 사전 조회만으로 끝납니다. 지도가 바뀌면 새 WorldMap을 만듭니다.
+    """
+
+    def __init__(self, location_rows=(), connection_rows=()):
+        locations = {}
+        for row in location_rows:
+            actions = tuple(json.loads(row['actions'])) if row['actions'] else ()
+            locations[row['id']] = Location(row['id'], row['name'], row['description'], actions)
+
+        neighbors = {location_id: [] for location_id in locations}
+        for from_id, to_id in connection_rows:
+            if from_id in locations and to_id in locations and to_id not in neighbors[from_id]:
+                neighbors[from_id].append(to_id)
+
+        self.locations = locations # id -> Location
+        self.by_name = {location.name: location for location in locations.values()}
+        self.neighbors = {location_id: tuple(ids) for location_id, ids in neighbors.items()}
+
+        self._next_hop, self._distance = self._shortest_paths()
+        self._actions = compile_location_actions(locations) # (location_id, 행동 이름) -> LocationAction
+
+        # 자동완성용 검색 색인
+        self._destination_indexes = {
+            location_id: HangulIndex(locations[to_id].name for to_id in ids) for location_id, ids in self.neighbors.items()
+        }
+        self._action_indexes = {location_id: HangulIndex(location.actions) for location_id, location in locations.items()}
+        # 여행 목적지: 현재 위치를 뺀, 갈 수 있는 장소 (가까운 순). 걸러낸 뒤 색인하므로 결과가 25개 제한에 잘리지 않습니다.
+        self._travel_indexes = {
+            location_id: HangulIndex(locations[to_id].name for to_id in self.reachable(location_id)) for location_id in locations
+        }
+
+    def _shortest_paths(self):
+        # 간선 가중치가 모두 같으므로 출발지마다 BFS 한 번이면 최단 경로가 나옵니다.
+        next_hop, distance = {}, {}
+        for source in self.neighbors:
+            hops, dist = {}, {source: 0}
+            queue = deque()
+            for neighbor in self.neighbors[source]:
+                if neighbor not in dist:
+                    dist[neighbor] = 1
+                    hops[neighbor] = neighbor
+                    queue.append(neighbor)
+            while queue:
+                current = queue.popleft()
+                for neighbor in self.neighbors[current]:
+                    if neighbor not in dist:
+                        dist[neighbor] = dist[current] + 1
+                        hops[neighbor] = hops[current]
+                        queue.append(neighbor)
+            next_hop[source] = hops
+            distance[source] = dist
+        return next_hop, distance
+
+    @classmethod
+    async def load(cls, db):
+        location_rows, connection_rows = await db.read(_load_rows)
+        return cls(location_rows, connection_rows)
+
+    def get(self, location_id):
+        return self.locations.get(location_id)
+
+    def location_name(self, location_id, default="알 수 없는 곳"):
+        location = self.locations.get(location_id)
+        return location.name if location else default
+
+    def destinations(self, location_id):
+        """location_id에서 한 번에 이동할 수 있는 장소 목록"""
+        return tuple(self.locations[to_id] for to_id in self.neighbors.get(location_id, ()))
+
+    def is_adjacent(self, from_id, to_id):
+        return to_id in self.neighbors.get(from_id, ())
+
+    def distance(self, from_id, to_id):
+        """이동 횟수. 갈 수 없으면 None"""
+        return self._distance.get(from_id, {}).get(to_id)
+
+    def route(self, from_id, to_id):
+        """from_id에서 to_id까지 거쳐 가는 장소 id 목록(출발지 제외). 갈 수 없으면 None"""
+        if from_id == to_id:
+            return []
+        hops = self._next_hop.get(from_id)
+        if hops is None or to_id not in hops:
+            return None
+        path = []
+        current = from_id
+        while current != to_id:
+            current = self._next_hop[current][to_id]
+            path.append(current)
+        return path
+
+    def reachable(self, from_id):
+        """from_id에서 갈 수 있는 장소 id 목록 (가까운 순)"""
+        dist = self._distance.get(from_id, {})
+        return sorted((location_id for location_id in dist if location_id != from_id), key=dist.__getitem__)
+
+    def actions(self, location_id):
+        location = self.locations.get(location_id)
+        return location.actions if location else ()
+
+    def get_action(self, location_id, action_name):
+        """장소에서 할 수 있는 행동이면 LocationAction, 아니면 None"""
+        return self._actions.get((location_id, action_name))
+
+    def destination_index(self, location_id):
+        return self._destination_indexes.get(location_id, _EMPTY_INDEX)
+
+    def travel_index(self, location_id):
+        return self._travel_indexes.get(location_id, _EMPTY_INDEX)
+
+    def action_index(self, location_id):
+        return self._action_indexes.get(location_id, _EMPTY_INDEX)
+
+_EMPTY_INDEX = HangulIndex(())